@@ -0,0 +1,102 @@
+"""Load/save/response throughput for large EmployeeData documents: dict + json vs direct bytes.
+
+    python bench/serialization.py [--points 8760] [--sessions 20000] [--switches 100000] [--repeat 5] [--json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from models import EmployeeData, Session, TimeWindowData
+from serialization import dump_model, dumps, load_model, orjson
+
+
+def build_employee(points: int, sessions: int, switches: int) -> EmployeeData:
+    rng = random.Random(42)
+    emp = EmployeeData(employeeId="BENCH001")
+    t = 1_700_000_000_000
+    for i in range(points):
+        emp.mlDataPoints.append(TimeWindowData(
+            employeeId="BENCH001", date=f"2026-{1 + i // 744 % 12:02d}-{1 + i // 24 % 28:02d}",
+            timeWindowStart=f"{i % 24:02d}:00", role="developer",
+            activeSeconds=rng.randint(0, 3600), idleSeconds=rng.randint(0, 600),
+            windowSwitchCount=rng.randint(0, 80), uniqueWindowCount=rng.randint(1, 12),
+            longestContinuousActiveSeconds=rng.randint(0, 3600), taskPresent=rng.random() < 0.5,
+            taskCompleted=rng.random() < 0.3, fragmentationScore=round(rng.uniform(0, 100), 2),
+            focusScore=round(rng.uniform(0, 100), 2), timestamp=t + i * 3_600_000,
+        ))
+    for i in range(sessions):
+        start = t + i * 60_000
+        emp.stats.todaySessions.append(Session(
+            category=rng.choice(["work", "communication", "distraction"]), date="2026-03-01",
+            domain=f"site{rng.randint(0, 50)}.com", duration=60_000, startTime=start,
+            endTime=start + 60_000, timestamp=start + 60_000, id=f"{start + 60_000}-{rng.random()}",
+        ))
+    for i in range(switches):
+        emp.windowSwitches.append(t + i * 5_000, f"{rng.getrandbits(32) % 40:08x}", rng.randint(1_000, 60_000))
+    return emp
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(points: int, sessions: int, switches: int, repeat: int) -> dict:
+    emp = build_employee(points, sessions, switches)
+    old_doc = json.dumps(emp.model_dump(by_alias=True), indent=2)
+    new_doc = dump_model(emp, by_alias=True)
+
+    cases = {
+        # Storage: what JsonFileStore used to do vs what it does now
+        "save_dict_json_indent": lambda: json.dumps(emp.model_dump(by_alias=True), indent=2),
+        "save_model_dump_json": lambda: dump_model(emp, by_alias=True),
+        "load_json_then_model": lambda: EmployeeData(**json.loads(old_doc)),
+        "load_bytes_to_model": lambda: load_model(EmployeeData, new_doc),
+        # Responses: FastAPI's default path vs a pre-built dict rendered by dumps()
+        "response_jsonable_encoder": lambda: json.dumps(jsonable_encoder(emp.model_dump())).encode(),
+        "response_fast_json": lambda: dumps(emp.model_dump()),
+    }
+    results = {}
+    for name, fn in cases.items():
+        ms = _best_ms(fn, repeat)
+        size = len(old_doc) if name.endswith("indent") or name == "load_json_then_model" else len(new_doc)
+        results[name] = {"ms": round(ms, 1), "mbPerSec": round(size / 1e6 / (ms / 1000), 1)}
+    return {
+        "points": points, "sessions": sessions, "switches": switches,
+        "orjson": orjson is not None,
+        "docBytes": {"indented": len(old_doc), "compact": len(new_doc)},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=8760, help="ML data points (8760 = one year hourly)")
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--switches", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    report = run(args.points, args.sessions, args.switches, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        docs = report["docBytes"]
+        print(f"{report['points']} ML points, {report['sessions']} sessions, {report['switches']} switches "
+              f"— {docs['indented'] / 1e6:.1f} MB indented, {docs['compact'] / 1e6:.1f} MB compact "
+              f"(orjson {'on' if report['orjson'] else 'off'})")
+        for name, r in report["results"].items():
+            print(f"  {name:<26} {r['ms']:>8} ms  {r['mbPerSec']:>7} MB/s")
@@ -0,0 +1,174 @@
+"""Hammer persistence from many threads and check that no writes are lost.
+
+For each backend (json, sqlite) with the cache on and off, writer threads
+append ML points to ONE employee while other threads flip its role and
+add sessions through update_employee, readers poll it and the cache is
+flushed continuously. Afterwards the data is reloaded from disk and every
+point and session must be there. A second phase compares throughput of
+the same threads spread over distinct employees vs. piled onto one.
+
+    python bench/stress_concurrency.py [--writers 8] [--points 200] [--updaters 4] [--updates 100] [--json]
+
+Exits non-zero if anything was lost.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import persistence
+from models import Session, TimeWindowData
+
+EMPLOYEE = "STRESS001"
+
+
+def _point(employee_id: str, writer: int, i: int) -> TimeWindowData:
+    return TimeWindowData(
+        employeeId=employee_id, date="2026-03-01", timeWindowStart=f"{i % 24:02d}:00", role="developer",
+        activeSeconds=i, idleSeconds=0, windowSwitchCount=writer, uniqueWindowCount=1,
+        longestContinuousActiveSeconds=i, taskPresent=False, taskCompleted=False,
+        fragmentationScore=0.0, focusScore=50.0, timestamp=writer * 1_000_000 + i,
+    )
+
+
+def _session(updater: int, i: int) -> Session:
+    start = 1_700_000_000_000 + updater * 1_000_000 + i * 1000
+    return Session(category="work", date="2026-03-01", domain="example.com", duration=1000,
+                   startTime=start, endTime=start + 1000, timestamp=start + 1000, id=f"{updater}-{i}")
+
+
+def _run_threads(targets) -> float:
+    threads = [threading.Thread(target=t) for t in targets]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def hammer_one(backend: str, cache_mb: float, writers: int, points: int, updaters: int, updates: int) -> dict:
+    """Concurrent appends + read-modify-writes on one employee; returns what survived a reload."""
+    data_dir = Path(tempfile.mkdtemp(prefix="stress-"))
+    persistence.EMPLOYEE_CACHE_MB = cache_mb
+    persistence.configure(backend, data_dir)
+    persistence.start_background_flush()
+    stop = threading.Event()
+    errors = []
+
+    def guarded(fn):
+        def run():
+            try:
+                fn()
+            except Exception as e:
+                errors.append(repr(e))
+        return run
+
+    def writer(w):
+        for i in range(points):
+            persistence.append_ml_point(_point(EMPLOYEE, w, i))
+
+    def updater(u):
+        for i in range(updates):
+            def mutate(emp, i=i):
+                emp.role = "manager" if i % 2 else "developer"
+                emp.add_session(_session(u, i))
+            persistence.update_employee(EMPLOYEE, mutate)
+
+    def reader():
+        while not stop.is_set():
+            persistence.load_employee(EMPLOYEE)
+            persistence.query_ml_points(EMPLOYEE, limit=24)
+
+    def flusher():
+        while not stop.is_set():
+            persistence.flush()
+            time.sleep(0.005)
+
+    background = [threading.Thread(target=guarded(reader)), threading.Thread(target=guarded(flusher))]
+    for t in background:
+        t.start()
+    elapsed = _run_threads(
+        [guarded(lambda w=w: writer(w)) for w in range(writers)]
+        + [guarded(lambda u=u: updater(u)) for u in range(updaters)]
+    )
+    stop.set()
+    for t in background:
+        t.join()
+    persistence.shutdown()
+
+    # Fresh store + cache: only what reached disk counts
+    persistence.configure(backend, data_dir)
+    emp = persistence.load_employee(EMPLOYEE)
+    stored_points = {p.timestamp for p in emp.mlDataPoints}
+    stored_sessions = {s.id for s in emp.stats.todaySessions}
+    persistence.shutdown()
+    expected_points, expected_sessions = writers * points, updaters * updates
+    return {
+        "backend": backend,
+        "cacheMb": cache_mb,
+        "seconds": round(elapsed, 3),
+        "points": {"expected": expected_points, "stored": len(stored_points),
+                   "duplicates": len(emp.mlDataPoints) - len(stored_points)},
+        "sessions": {"expected": expected_sessions, "stored": len(stored_sessions)},
+        "errors": errors[:5],
+        "ok": (len(stored_points) == len(emp.mlDataPoints) == expected_points
+               and len(stored_sessions) == expected_sessions and not errors),
+    }
+
+
+def throughput(backend: str, threads: int, ops: int) -> dict:
+    """Appends/sec with `threads` writers on distinct employees vs. all on one."""
+    results = {}
+    persistence.EMPLOYEE_CACHE_MB = 0  # Measure the store path, not the in-memory mirror
+    for label, ids in (("distinctEmployees", [f"TP{i:03d}" for i in range(threads)]),
+                       ("oneEmployee", [EMPLOYEE] * threads)):
+        persistence.configure(backend, Path(tempfile.mkdtemp(prefix="stress-tp-")))
+
+        def work(employee_id, w):
+            for i in range(ops):
+                persistence.append_ml_point(_point(employee_id, w, i))
+
+        elapsed = _run_threads([lambda e=e, w=w: work(e, w) for w, e in enumerate(ids)])
+        persistence.shutdown()
+        results[label] = round(threads * ops / elapsed)
+    return {"backend": backend, "threads": threads, "appendsPerSec": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--points", type=int, default=200, help="ML points appended per writer")
+    parser.add_argument("--updaters", type=int, default=4)
+    parser.add_argument("--updates", type=int, default=100, help="update_employee calls per updater")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    report = {"lostWrites": [], "throughput": []}
+    for backend in ("json", "sqlite"):
+        for cache_mb in (64, 0):
+            report["lostWrites"].append(
+                hammer_one(backend, cache_mb, args.writers, args.points, args.updaters, args.updates))
+        report["throughput"].append(throughput(backend, args.writers, args.points))
+    ok = all(r["ok"] for r in report["lostWrites"])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for r in report["lostWrites"]:
+            status = "OK  " if r["ok"] else "LOST"
+            print(f"{status} {r['backend']:<6} cache={r['cacheMb']:<4} "
+                  f"points {r['points']['stored']}/{r['points']['expected']} "
+                  f"(dup {r['points']['duplicates']}), sessions {r['sessions']['stored']}/{r['sessions']['expected']} "
+                  f"in {r['seconds']}s {' '.join(r['errors'])}")
+        for r in report["throughput"]:
+            tp = r["appendsPerSec"]
+            print(f"{r['backend']:<6} {r['threads']} threads: {tp['distinctEmployees']} appends/s across employees, "
+                  f"{tp['oneEmployee']} appends/s on one employee")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,330 @@
+"""Benchmark suite for the tracker, persistence and API hot paths.
+
+Builds (or reuses) a synthetic dataset, times each case and reports
+latency percentiles, throughput and peak RSS. Save a run with --out and
+pass it to a later run with --compare to see what regressed.
+
+    python bench/suite.py [--preset smoke|year|team|org] [--employees N --days D] [--backend json|sqlite]
+                          [--data-dir DIR] [--cases categorize,tracker,persistence,scan,api]
+                          [--out run.json] [--compare baseline.json] [--max-regression 1.25] [--json]
+
+Presets: smoke = 10 employees × 1 day, year = 10 × 365, team = 1,000 × 30,
+org = 10,000 × 1. Exits non-zero if --compare finds a case whose p50
+got slower than --max-regression × the baseline.
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import persistence
+import tracker as tracker_module
+from categorizer import categorize_domain, categorize_many
+from scheduler import SamplingScheduler
+from synthetic import DOMAINS, SimulatedClock, employee_ids, fake_source, populate
+from tracker import WindowTracker
+
+PRESETS = {"smoke": (10, 1), "year": (10, 365), "team": (1_000, 30), "org": (10_000, 1)}
+CASES = ("categorize", "tracker", "persistence", "scan", "api")
+
+
+class ManualScheduler(SamplingScheduler):
+    """Scheduler without its own thread: the benchmark calls tick() itself."""
+
+    def start(self):
+        pass
+
+
+# ── Measurement ─────────────────────────────────────────────
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(samples: List[float], wall_sec: float, ops_per_sample: int = 1, **extra) -> dict:
+    """Latency percentiles (ms per sample) and throughput (ops/s) for one case."""
+    ordered = sorted(samples)
+    to_ms = lambda sec: round(sec * 1000, 4)
+    return {
+        "samples": len(ordered),
+        "meanMs": to_ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        "p50Ms": to_ms(_percentile(ordered, 50)) if ordered else 0.0,
+        "p90Ms": to_ms(_percentile(ordered, 90)) if ordered else 0.0,
+        "p99Ms": to_ms(_percentile(ordered, 99)) if ordered else 0.0,
+        "maxMs": to_ms(ordered[-1]) if ordered else 0.0,
+        "opsPerSec": round(len(ordered) * ops_per_sample / wall_sec, 3) if wall_sec else 0.0,
+        "peakRssMb": peak_rss_mb(),
+        **extra,
+    }
+
+
+def time_each(fn: Callable, items: Iterable) -> tuple:
+    """Call fn(item) for every item; returns (per-call seconds, wall seconds)."""
+    samples = []
+    clock = time.perf_counter
+    wall_start = clock()
+    for item in items:
+        start = clock()
+        fn(item)
+        samples.append(clock() - start)
+    return samples, clock() - wall_start
+
+
+# ── Cases ───────────────────────────────────────────────────
+
+def bench_categorize(ctx: dict) -> Dict[str, dict]:
+    """categorize_domain on a mix of rule hits, subdomains and unknown hosts; categorize_many batches."""
+    rng = random.Random(7)
+    pool = list(DOMAINS) + [f"sub{i}.{rng.choice(DOMAINS)}" for i in range(2000)]
+    pool += [f"host{i}.unknown-{i % 97}.net" for i in range(2000)]
+    domains = [rng.choice(pool) for _ in range(ctx["ops"])]
+    samples, wall = time_each(categorize_domain, domains)
+    batches = [domains[i:i + 1000] for i in range(0, len(domains), 1000)]
+    batch_samples, batch_wall = time_each(categorize_many, batches)
+    return {
+        "categorize.domain": summarize(samples, wall),
+        "categorize.many_1000": summarize(batch_samples, batch_wall, ops_per_sample=1000),
+    }
+
+
+def bench_tracker(ctx: dict) -> Dict[str, dict]:
+    """One scheduler wake-up per simulated second across every tracker (scripted source), live_metrics and
+    hourly aggregation. Trackers only do work on a window change (every 20s) or a due deadline."""
+    clock = SimulatedClock(time.time())
+    scheduler = ManualScheduler(fake_source(clock, dwell_sec=20), clock=clock)
+    ids = ctx["ids"][:ctx["trackers"]]
+    trackers = [WindowTracker(employee_id, scheduler=scheduler) for employee_id in ids]
+    for t in trackers:
+        t.start()
+
+    def tick(_):
+        clock.advance(1)
+        scheduler.tick()
+
+    tick_samples, tick_wall = time_each(tick, range(ctx["ticks"]))
+    live_samples, live_wall = time_each(lambda t: t.live_metrics, trackers)
+    agg_samples, agg_wall = time_each(lambda t: t._generate_ml_data_point(), trackers)
+    for t in trackers:
+        t.stop()
+    return {
+        "tracker.tick": summarize(tick_samples, tick_wall, ops_per_sample=len(trackers), trackers=len(trackers)),
+        "tracker.live_metrics": summarize(live_samples, live_wall),
+        "tracker.aggregate": summarize(agg_samples, agg_wall),
+    }
+
+
+def bench_persistence(ctx: dict) -> Dict[str, dict]:
+    """load_employee/save_employee straight to storage, then load_employee through a warm cache."""
+    sample = random.Random(11).sample(ctx["ids"], min(ctx["samples"], len(ctx["ids"])))
+    results = {}
+
+    persistence.EMPLOYEE_CACHE_MB = 0
+    persistence.configure(ctx["backend"], ctx["data_dir"])
+    loaded = []
+    samples, wall = time_each(lambda e: loaded.append(persistence.load_employee(e)), sample)
+    results["persistence.load"] = summarize(samples, wall)
+    samples, wall = time_each(persistence.save_employee, loaded)
+    results["persistence.save"] = summarize(samples, wall)
+    del loaded
+
+    persistence.EMPLOYEE_CACHE_MB = 1024
+    persistence.configure(ctx["backend"], ctx["data_dir"])
+    for employee_id in sample:
+        persistence.load_employee(employee_id)
+    samples, wall = time_each(persistence.load_employee, sample)
+    results["persistence.load_cached"] = summarize(samples, wall, hitRate=persistence.cache_stats().get("hitRate"))
+    persistence.shutdown()
+    return results
+
+
+def bench_scan(ctx: dict) -> Dict[str, dict]:
+    """list_all_employees over the whole dataset (what uncached manager views pay)."""
+    persistence.EMPLOYEE_CACHE_MB = 0
+    persistence.configure(ctx["backend"], ctx["data_dir"])
+    counts = []
+    samples, wall = time_each(lambda _: counts.append(len(persistence.list_all_employees())), range(ctx["scans"]))
+    return {"persistence.list_all_employees": summarize(samples, wall, employees=counts[-1] if counts else 0)}
+
+
+def bench_api(ctx: dict) -> Dict[str, dict]:
+    """In-process HTTP round trips (TestClient) for the dashboard endpoints."""
+    clock = SimulatedClock()
+    # Trackers created by /live must not probe the real desktop
+    tracker_module._scheduler = ManualScheduler(fake_source(clock))
+    from fastapi.testclient import TestClient
+    import main
+
+    persistence.EMPLOYEE_CACHE_MB = 64
+    persistence.configure(ctx["backend"], ctx["data_dir"])
+    client = TestClient(main.app)
+    sample = random.Random(13).sample(ctx["ids"], min(ctx["samples"], len(ctx["ids"])))
+    routes = {
+        "api.live": "/api/employee/{id}/live",
+        "api.stats": "/api/employee/{id}/stats?limit=50",
+        "api.ml_data": "/api/employee/{id}/ml-data?limit=168",
+        "api.rollups_week": "/api/employee/{id}/rollups?period=week",
+    }
+    results = {}
+
+    def get(path: str):
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} → {response.status_code}")
+
+    for name, template in routes.items():
+        samples, wall = time_each(lambda e: get(template.format(id=e)), sample)
+        results[name] = summarize(samples, wall)
+    samples, wall = time_each(lambda _: get("/api/manager/team-stats"), range(len(sample)))
+    results["api.team_stats"] = summarize(samples, wall)
+    for t in list(main.trackers.values()):
+        t.stop()
+    main.trackers.clear()
+    persistence.shutdown()
+    return results
+
+
+BENCHES = {
+    "categorize": bench_categorize,
+    "tracker": bench_tracker,
+    "persistence": bench_persistence,
+    "scan": bench_scan,
+    "api": bench_api,
+}
+
+
+# ── Reporting ───────────────────────────────────────────────
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> dict:
+    """Per-case current/baseline ratios; p50 ratios above max_regression are regressions."""
+    rows, regressions = {}, []
+    for name, now in current["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if not before:
+            continue
+        ratio = lambda key: round(now[key] / before[key], 3) if before.get(key) else None
+        rows[name] = {"p50": ratio("p50Ms"), "p99": ratio("p99Ms"), "opsPerSec": ratio("opsPerSec")}
+        if rows[name]["p50"] is not None and rows[name]["p50"] > max_regression:
+            regressions.append(name)
+    return {"baseline": baseline.get("meta", {}), "ratios": rows, "regressions": regressions}
+
+
+def run(employees: int, days: int, backend: str = "json", data_dir: Optional[Path] = None,
+        cases: Iterable[str] = CASES, trackers: int = 1_000, ticks: int = 300, samples: int = 200,
+        scans: int = 3, ops: int = 100_000, seed: int = 42) -> dict:
+    keep = data_dir is not None
+    data_dir = Path(data_dir) if keep else Path(tempfile.mkdtemp(prefix="bench-suite-"))
+    try:
+        generate_start = time.perf_counter()
+        generated = populate(data_dir, employees, days, backend, seed)
+        ctx = {
+            "data_dir": data_dir, "backend": backend, "ids": employee_ids(employees), "trackers": trackers,
+            "ticks": ticks, "samples": samples, "scans": scans, "ops": ops,
+        }
+        results = {}
+        for case in cases:
+            results.update(BENCHES[case](ctx))
+    finally:
+        persistence.shutdown()
+        if not keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return {
+        "meta": {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {"employees": employees, "days": days, "backend": backend, "seed": seed,
+                        "generatedSec": round(time.perf_counter() - generate_start, 1) if generated else None},
+        },
+        "cases": results,
+        "peakRssMb": peak_rss_mb(),
+    }
+
+
+def _print_report(report: dict):
+    ds = report["meta"]["dataset"]
+    print(f"Dataset: {ds['employees']} employees × {ds['days']} day(s) ({ds['backend']}), "
+          f"commit {report['meta']['commit']}, peak RSS {report['peakRssMb']} MB")
+    print(f"{'case':<34}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'ops/s':>14}{'RSS MB':>9}")
+    for name, r in report["cases"].items():
+        print(f"{name:<34}{r['p50Ms']:>10.3f}{r['p90Ms']:>10.3f}{r['p99Ms']:>10.3f}{r['maxMs']:>10.3f}"
+              f"{r['opsPerSec']:>14,.1f}{r['peakRssMb'] or 0:>9.1f}")
+    comparison = report.get("comparison")
+    if comparison:
+        print(f"\nvs. baseline {comparison['baseline'].get('commit')} ({comparison['baseline'].get('time')}):")
+        for name, ratio in comparison["ratios"].items():
+            flag = "  ⚠️ regression" if name in comparison["regressions"] else ""
+            print(f"{name:<34} p50 ×{ratio['p50']}  p99 ×{ratio['p99']}  ops/s ×{ratio['opsPerSec']}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="smoke")
+    parser.add_argument("--employees", type=int, help="overrides the preset")
+    parser.add_argument("--days", type=int, help="days of history per employee (1–365), overrides the preset")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--data-dir", type=Path, help="keep and reuse the generated dataset here")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of: " + ", ".join(CASES))
+    parser.add_argument("--trackers", type=int, default=1_000, help="max trackers in the tick benchmark")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--samples", type=int, default=200, help="employees sampled for load/save/API cases")
+    parser.add_argument("--scans", type=int, default=3, help="list_all_employees repetitions")
+    parser.add_argument("--ops", type=int, default=100_000, help="categorize_domain calls")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="allowed p50 slowdown vs. baseline")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    employees, days = PRESETS[args.preset]
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    report = run(args.employees or employees, args.days or days, args.backend, args.data_dir, cases,
+                 args.trackers, args.ticks, args.samples, args.scans, args.ops, args.seed)
+    if args.compare:
+        report["comparison"] = compare(report, json.loads(args.compare.read_text()), args.max_regression)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    sys.exit(1 if report.get("comparison", {}).get("regressions") else 0)
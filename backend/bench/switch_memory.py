@@ -0,0 +1,74 @@
+"""Memory cost per window switch event: dicts vs Pydantic models vs SwitchLog.
+
+    python bench/switch_memory.py [--events 100000] [--windows 40] [--json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import WindowSwitch
+from switch_log import SwitchLog
+
+
+def _events(n: int, windows: int):
+    rng = random.Random(42)
+    hashes = [f"{rng.getrandbits(32):08x}" for _ in range(windows)]
+    t = 1_700_000_000_000
+    for _ in range(n):
+        duration = rng.randint(1_000, 600_000)
+        yield t, rng.choice(hashes), duration
+        t += duration
+
+
+def _measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def run(events: int, windows: int) -> dict:
+    data = list(_events(events, windows))
+
+    def as_dicts():
+        return [{"switchTime": t, "windowHash": h, "activeDuration": d} for t, h, d in data]
+
+    def as_models():
+        return [WindowSwitch(switchTime=t, windowHash=h, activeDuration=d) for t, h, d in data]
+
+    def as_switch_log():
+        log = SwitchLog()
+        for t, h, d in data:
+            log.append(t, h, d)
+        return log
+
+    results = {}
+    for name, build in (("dicts", as_dicts), ("pydantic", as_models), ("switch_log", as_switch_log)):
+        total = _measure(build)
+        results[name] = {"totalBytes": total, "bytesPerEvent": round(total / events, 1)}
+    return {"events": events, "windows": windows, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--windows", type=int, default=40)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    report = run(args.events, args.windows)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['events']} events over {report['windows']} windows")
+        for name, r in report["results"].items():
+            print(f"  {name:<11} {r['bytesPerEvent']:>8} bytes/event  ({r['totalBytes'] / 1e6:.1f} MB)")
@@ -0,0 +1,141 @@
+"""Synthetic employees, datasets and window sources for the benchmark suite.
+
+Deterministic for a given seed, so two runs of bench/suite.py measure the
+same data. Employees are generated and saved one at a time, so memory
+stays flat however large the dataset is.
+
+    python bench/synthetic.py --out /tmp/bench-data --employees 1000 --days 30 [--backend sqlite]
+"""
+
+import argparse
+import calendar
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import persistence
+from categorizer import categorize_many
+from models import EmployeeData, Session, TimeWindowData
+from window_sources import FakeWindowSource
+
+ROLES = ("developer", "designer", "manager", "support")
+DOMAINS = (
+    "github.com", "gist.github.com", "docs.google.com", "stackoverflow.com", "linear.app", "figma.com",
+    "mail.google.com", "slack.com", "app.slack.com", "zoom.us", "teams.microsoft.com",
+    "youtube.com", "m.youtube.com", "reddit.com", "old.reddit.com", "x.com",
+    "intranet.example.com", "wiki.example.com", "news.ycombinator.com", "localhost",
+)
+# Fixed start date so datasets (and their ML point keys) are identical across runs
+FIRST_DAY = date(2025, 1, 1)
+# Sampled activity per simulated day
+SESSIONS_PER_DAY = 30
+SWITCHES_PER_DAY = 150
+MANIFEST = "bench-dataset.json"
+
+
+def employee_ids(count: int) -> List[str]:
+    return [f"BENCH{i:05d}" for i in range(count)]
+
+
+def make_employee(employee_id: str, days: int, seed: int = 42) -> EmployeeData:
+    """`days` of hourly ML points, sessions and window switches for one employee."""
+    rng = random.Random(f"{seed}:{employee_id}")
+    role = rng.choice(ROLES)
+    emp = EmployeeData(employeeId=employee_id, role=role)
+    for d in range(days):
+        day = (FIRST_DAY + timedelta(days=d)).isoformat()
+        day_ms = calendar.timegm((FIRST_DAY + timedelta(days=d)).timetuple()) * 1000
+        for hour in range(24):
+            working = 9 <= hour < 18
+            active = rng.randint(1800, 3600) if working else rng.randint(0, 300)
+            switches = rng.randint(5, 60) if working else rng.randint(0, 3)
+            fragmentation = round(min(100.0, switches / max(active / 60, 1) * 10), 2)
+            emp.mlDataPoints.append(TimeWindowData(
+                employeeId=employee_id, date=day, timeWindowStart=f"{hour:02d}:00", role=role,
+                activeSeconds=active, idleSeconds=3600 - active, windowSwitchCount=switches,
+                uniqueWindowCount=min(switches, rng.randint(1, 12)), longestContinuousActiveSeconds=active // 3,
+                taskPresent=working, taskCompleted=working and rng.random() < 0.3,
+                fragmentationScore=fragmentation, focusScore=round(100 - fragmentation, 2),
+                timestamp=day_ms + (hour + 1) * 3_600_000,
+            ))
+        domains = [rng.choice(DOMAINS) for _ in range(SESSIONS_PER_DAY)]
+        start = day_ms + 9 * 3_600_000
+        for domain, category in zip(domains, categorize_many(domains)):
+            duration = rng.randint(60_000, 1_800_000)
+            emp.add_session(Session(category=category, date=day, domain=domain, duration=duration,
+                                    startTime=start, endTime=start + duration, timestamp=start + duration,
+                                    id=f"{start + duration}-{employee_id}"))
+            start += duration
+        t = day_ms + 9 * 3_600_000
+        for _ in range(SWITCHES_PER_DAY):
+            duration = rng.randint(1_000, 300_000)
+            emp.windowSwitches.append(t, f"{rng.getrandbits(32) % 40:08x}", duration)
+            t += duration
+    return emp
+
+
+def iter_employees(count: int, days: int, seed: int = 42) -> Iterator[EmployeeData]:
+    for employee_id in employee_ids(count):
+        yield make_employee(employee_id, days, seed)
+
+
+def populate(data_dir: Path, employees: int, days: int, backend: str = "json", seed: int = 42,
+             quiet: bool = False) -> bool:
+    """Write a dataset into data_dir through the storage backend; False if it is already there."""
+    data_dir = Path(data_dir)
+    spec = {"employees": employees, "days": days, "backend": backend, "seed": seed}
+    manifest = data_dir / MANIFEST
+    if manifest.exists():
+        if json.loads(manifest.read_text()) == spec:
+            return False
+        raise ValueError(f"{data_dir} holds a different dataset ({manifest.read_text()}); use a fresh directory")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    persistence.configure(backend, data_dir)
+    store = persistence.get_store()
+    start = time.perf_counter()
+    for i, emp in enumerate(iter_employees(employees, days, seed), 1):
+        store.save_employee(emp)
+        if not quiet and (i % 500 == 0 or i == employees):
+            print(f"   generated {i}/{employees} employees ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+    manifest.write_text(json.dumps(spec))
+    return True
+
+
+def fake_source(clock, titles: Optional[List[str]] = None, dwell_sec: float = 20) -> FakeWindowSource:
+    """Window source cycling through browser-like titles on a (simulated) clock."""
+    titles = titles or [f"{domain} - Browser" for domain in DOMAINS]
+    return FakeWindowSource.cycling(titles, dwell_sec, clock=clock)
+
+
+class SimulatedClock:
+    """Manually advanced clock for FakeWindowSource."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def __call__(self) -> float:
+        return self.now
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, required=True, help="data directory to populate")
+    parser.add_argument("--employees", type=int, default=10)
+    parser.add_argument("--days", type=int, default=1, help="days of history per employee (1–365)")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if populate(args.out, args.employees, args.days, args.backend, args.seed):
+        print(f"✅ {args.employees} employees × {args.days} days written to {args.out}")
+    else:
+        print(f"✅ {args.out} already holds this dataset")
+    persistence.shutdown()
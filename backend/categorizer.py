@@ -1,6 +1,28 @@
-"""Rule-based domain categorization engine."""
+"""Rule-based domain categorization engine.
 
-# Extensible category rules: domain substring → category
+Rules map a domain to a category and match that domain and any of its
+subdomains ("github.com" matches "gist.github.com" but "x.com" no longer
+matches "dropbox.com"). They are compiled into a reversed-label trie, so a
+lookup costs O(labels in the domain) regardless of how many rules exist,
+and recent lookups are memoized.
+
+Extra rules can be loaded from a JSON file ({"domain": "category", ...})
+named by CATEGORY_RULES_FILE; it is re-read automatically when it changes.
+"""
+
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_CATEGORY = "work"  # Unknown domains default to work
+# How often (seconds) to stat the rules file for changes
+RULES_CHECK_INTERVAL_SEC = 5.0
+MEMO_SIZE = 4096
+
+# Extensible category rules: domain (and its subdomains) → category
 DOMAIN_RULES: dict[str, str] = {
     # Work
     "docs.google.com": "work",
@@ -46,10 +68,112 @@ DOMAIN_RULES: dict[str, str] = {
 }
 
 
+def normalize_domain(domain: str) -> str:
+    """Reduce a domain or URL to a bare lowercase host name."""
+    domain = domain.strip().lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = domain.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+    domain = domain.rsplit("@", 1)[-1].split(":", 1)[0]
+    return domain.strip(".")
+
+
+class DomainMatcher:
+    """Reversed-label trie: com → github → gist. Deepest matching rule wins."""
+
+    _CATEGORY = None  # Key holding a node's category (labels are always strings)
+
+    def __init__(self, rules: Dict[str, str]):
+        self.root: dict = {}
+        for domain, category in rules.items():
+            node = self.root
+            for label in reversed(normalize_domain(domain).split(".")):
+                node = node.setdefault(label, {})
+            node[self._CATEGORY] = category
+
+    def match(self, domain: str) -> Optional[str]:
+        node = self.root
+        found = None
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(self._CATEGORY, found)
+        return found
+
+
+_matcher = DomainMatcher(DOMAIN_RULES)
+_rules_lock = threading.Lock()
+_rules_file = os.environ.get("CATEGORY_RULES_FILE")
+_rules_mtime: Optional[float] = None
+_last_check = 0.0
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _categorize(host: str) -> str:
+    return _matcher.match(host) or DEFAULT_CATEGORY
+
+
+def load_rules(path: Optional[str] = None) -> Dict[str, str]:
+    """Built-in DOMAIN_RULES overlaid with the rules file, if any."""
+    rules = dict(DOMAIN_RULES)
+    path = path or _rules_file
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            rules.update({str(k): str(v) for k, v in json.load(f).items()})
+    return rules
+
+
+def reload_rules(path: Optional[str] = None):
+    """Recompile the matcher from DOMAIN_RULES plus the rules file, without a restart."""
+    global _matcher, _rules_file, _rules_mtime
+    with _rules_lock:
+        if path is not None:
+            _rules_file = path
+        try:
+            _rules_mtime = os.path.getmtime(_rules_file) if _rules_file else None
+            matcher = DomainMatcher(load_rules())
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️ Keeping previous category rules: {e}")
+            return
+        _matcher = matcher
+        _categorize.cache_clear()
+
+
+def _maybe_reload():
+    global _last_check
+    if not _rules_file:
+        return
+    now = time.monotonic()
+    if now - _last_check < RULES_CHECK_INTERVAL_SEC:
+        return
+    _last_check = now
+    try:
+        mtime = os.path.getmtime(_rules_file)
+    except OSError:
+        return
+    if mtime != _rules_mtime:
+        reload_rules()
+
+
 def categorize_domain(domain: str) -> str:
     """Categorize a domain. Unknown domains default to 'work'."""
-    domain_lower = domain.lower()
-    for rule_domain, category in DOMAIN_RULES.items():
-        if rule_domain in domain_lower:
-            return category
-    return "work"  # Unknown domains default to work
+    _maybe_reload()
+    return _categorize(normalize_domain(domain))
+
+
+def categorize_many(domains: Iterable[str]) -> List[str]:
+    """Categorize a batch in one pass, resolving each distinct domain once."""
+    _maybe_reload()
+    resolved: Dict[str, str] = {}
+    out = []
+    for domain in domains:
+        category = resolved.get(domain)
+        if category is None:
+            category = resolved[domain] = _categorize(normalize_domain(domain))
+        out.append(category)
+    return out
+
+
+if _rules_file:
+    reload_rules()
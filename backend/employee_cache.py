@@ -0,0 +1,191 @@
+"""Bounded LRU cache of EmployeeData with write-behind flushing.
+
+Repeated dashboard polls are served from memory instead of re-reading and
+re-validating employee files. Saves only mark an entry dirty; a background
+timer flushes all dirty entries in one batch (and again at shutdown), so
+several saves of the same employee within an interval cost one disk write.
+
+The cache lock only guards the LRU bookkeeping. Disk writes happen
+outside it, under the employee's own lock (see employee_locks.py), so a
+flush never blocks reads or writes of other employees.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, Optional
+
+from models import EmployeeData, TimeWindowData
+
+# Rough in-memory cost of each model, used to enforce the memory budget
+BASE_BYTES = 2048
+ML_POINT_BYTES = 1200
+SWITCH_BYTES = 450
+SESSION_BYTES = 900
+
+
+def estimate_size(emp: EmployeeData) -> int:
+    return (
+        BASE_BYTES
+        + ML_POINT_BYTES * len(emp.mlDataPoints)
+        + SWITCH_BYTES * len(emp.windowSwitches)
+        + SESSION_BYTES * len(emp.stats.todaySessions)
+    )
+
+
+class EmployeeCache:
+    """LRU of EmployeeData objects bounded by an estimated byte budget."""
+
+    def __init__(self, max_bytes: int, flush_interval_sec: float, save: Callable[[EmployeeData], None],
+                 employee_lock: Callable[[str], ContextManager] = lambda employee_id: nullcontext()):
+        self.max_bytes = max_bytes
+        self.flush_interval_sec = flush_interval_sec
+        self._save = save
+        # Held around each entry's save so appends/updates of that employee can't slip in mid-write
+        self._employee_lock = employee_lock
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, EmployeeData]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._dirty: set = set()
+        self._bytes = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flushes = 0
+        self.flushed_entries = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, employee_id: str) -> Optional[EmployeeData]:
+        with self._lock:
+            emp = self._entries.get(employee_id)
+            if emp is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(employee_id)
+            self.hits += 1
+            return emp
+
+    def put(self, emp: EmployeeData, dirty: bool = False):
+        """Insert or replace an entry; dirty entries are written on the next flush."""
+        employee_id = emp.employeeId
+        with self._lock:
+            self._bytes -= self._sizes.get(employee_id, 0)
+            self._entries[employee_id] = emp
+            self._entries.move_to_end(employee_id)
+            self._sizes[employee_id] = estimate_size(emp)
+            self._bytes += self._sizes[employee_id]
+            if dirty:
+                self._dirty.add(employee_id)
+            self._evict()
+
+    def append_ml_point(self, point: TimeWindowData):
+        """Mirror an already-persisted ML point into the cached copy, if any.
+
+        Call with the employee lock held (together with the persist), so a
+        concurrent flush can't write the entry between the two and drop the point.
+        """
+        with self._lock:
+            emp = self._entries.get(point.employeeId)
+            if emp is not None:
+                emp.mlDataPoints.append(point)
+                self._sizes[point.employeeId] += ML_POINT_BYTES
+                self._bytes += ML_POINT_BYTES
+                self._evict()
+
+    def _evict(self):
+        """Drop clean LRU entries until under budget; dirty ones wait for the next flush."""
+        # Always keep the most recently used entry, even if it alone exceeds the budget
+        for employee_id in list(self._entries)[:-1]:
+            if self._bytes <= self.max_bytes:
+                break
+            if employee_id in self._dirty:
+                continue
+            del self._entries[employee_id]
+            self._bytes -= self._sizes.pop(employee_id)
+            self.evictions += 1
+
+    def _flush_one(self, employee_id: str):
+        with self._employee_lock(employee_id):
+            with self._lock:
+                emp = self._entries.get(employee_id)
+                if emp is None or employee_id not in self._dirty:
+                    return
+                self._dirty.discard(employee_id)
+            try:
+                self._save(emp)
+            except Exception:
+                with self._lock:
+                    self._dirty.add(employee_id)
+                raise
+        with self._lock:
+            self.flushed_entries += 1
+
+    def flush(self):
+        """Write every dirty entry to the backing store, one employee lock at a time."""
+        start = time.perf_counter()
+        with self._lock:
+            dirty = list(self._dirty)
+        if not dirty:
+            return
+        for employee_id in dirty:
+            try:
+                self._flush_one(employee_id)
+            except Exception as e:
+                print(f"⚠️ Failed to flush {employee_id}: {e}")
+        with self._lock:
+            self._evict()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval_sec):
+            self.flush()
+
+    def start(self):
+        """Start the background flush timer."""
+        if self._thread or not self.enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the timer and flush whatever is still dirty."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "dirty": len(self._dirty),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "flushes": self.flushes,
+                "flushedEntries": self.flushed_entries,
+                "lastFlushMs": round(self.last_flush_ms, 3),
+                "avgFlushMs": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+                "maxFlushMs": round(self.max_flush_ms, 3),
+            }
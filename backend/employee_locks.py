@@ -0,0 +1,94 @@
+"""Per-employee locks.
+
+Writers for different employees never wait on each other; writers for
+the same employee (tracker thread, API handlers, cache flush) take that
+employee's lock around their read-modify-write.
+
+Lock order: an employee lock may be taken before a cache or store lock,
+never while holding one.
+
+With several API worker processes on one data directory (MULTI_WORKER=1)
+FileKeyedLocks also holds an OS file lock per employee, so the
+read-modify-write is atomic across processes too.
+"""
+
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class KeyedLocks:
+    """Lazily created re-entrant lock per key (one small lock per employee, kept for the process lifetime)."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: Dict[str, threading.RLock] = {}
+
+    def get(self, key: str) -> threading.RLock:
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        with self.get(key):
+            yield
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+def lock_file(f: IO):
+    """Block until this process holds an exclusive OS lock on the open file."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def unlock_file(f: IO):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileKeyedLocks(KeyedLocks):
+    """KeyedLocks that also exclude other processes via a locked file per key."""
+
+    def __init__(self, lock_dir: Path):
+        super().__init__()
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        # Re-entrancy depth and open lock file per key (touched only by the thread holding the key's RLock)
+        self._depth: Dict[str, int] = {}
+        self._files: Dict[str, IO] = {}
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        with self.get(key):
+            depth = self._depth.get(key, 0)
+            if depth == 0:
+                f = open(self.lock_dir / f"{key}.lock", "a+b")
+                lock_file(f)
+                self._files[key] = f
+            self._depth[key] = depth + 1
+            try:
+                yield
+            finally:
+                self._depth[key] -= 1
+                if self._depth[key] == 0:
+                    f = self._files.pop(key)
+                    unlock_file(f)
+                    f.close()
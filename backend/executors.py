@@ -0,0 +1,93 @@
+"""Bounded thread pools for blocking work behind the async API.
+
+Handlers are `async def`; anything that can touch disk runs on one of
+two dedicated pools instead of Starlette's shared threadpool:
+
+  io         per-employee loads/saves/appends — short, many
+  aggregate  whole-dataset scans (team seed, peak hours, ML export) — long, few
+
+Keeping scans on their own small pool means a burst of dashboard
+aggregate requests queues behind itself, while /live and /health (pure
+memory) never leave the event loop.
+
+Tuning (environment):
+  IO_WORKERS         threads for per-employee persistence (default 8)
+  AGGREGATE_WORKERS  threads for full scans (default 2)
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from metrics import register_collector
+
+IO_WORKERS = int(os.environ.get("IO_WORKERS", "8"))
+AGGREGATE_WORKERS = int(os.environ.get("AGGREGATE_WORKERS", "2"))
+
+
+class BoundedPool:
+    """ThreadPoolExecutor with in-flight/queued counters, awaitable from the event loop."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": self.workers, "pending": self.pending, "completed": self.completed}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+io_pool = BoundedPool("io", IO_WORKERS)
+aggregate_pool = BoundedPool("aggregate", AGGREGATE_WORKERS)
+
+
+async def run_io(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking per-employee persistence call off the event loop."""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+async def run_aggregate(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking whole-dataset scan off the event loop."""
+    return await aggregate_pool.run(fn, *args, **kwargs)
+
+
+def executor_stats() -> dict:
+    return {"io": io_pool.stats(), "aggregate": aggregate_pool.stats()}
+
+
+def _collect_executor_metrics():
+    pools = [(pool.name, pool.stats()) for pool in (io_pool, aggregate_pool)]
+    yield ("signalpulse_executor_pending", "gauge", "Calls queued or running on each pool",
+           [({"pool": name}, stats["pending"]) for name, stats in pools])
+    yield ("signalpulse_executor_completed_total", "counter", "Calls finished on each pool",
+           [({"pool": name}, stats["completed"]) for name, stats in pools])
+
+
+register_collector(_collect_executor_metrics)
+
+
+def shutdown():
+    """Wait for queued work to finish (call at app shutdown, before flushing storage)."""
+    aggregate_pool.shutdown()
+    io_pool.shutdown()
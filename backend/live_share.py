@@ -0,0 +1,170 @@
+"""Live tracker state shared between API worker processes through mmap'd files.
+
+Each employee gets one fixed-size slot file. The worker that owns the
+employee's tracker (see ownership.py) writes the tracker's live_state()
+into it whenever it changes; every other worker maps the same file and
+rebuilds LiveMetrics at read time, so /live is answered locally on any
+worker without a per-tick write.
+
+Slots use a seqlock: the writer bumps the sequence to odd, writes the
+payload, then bumps it to even. Readers retry if they saw an odd or
+changed sequence, so they never return a torn write.
+
+LIVE_SHARE_DIR picks the directory (default /dev/shm/signalpulse-live
+when available, else data/live).
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from models import LiveMetrics
+from serialization import dumps, loads
+from tracker import live_metrics_from_state
+
+SLOT_BYTES = 8192
+_HEADER = struct.Struct("<QI")  # sequence, payload length
+# Poll interval for streaming changes made by other workers
+WATCH_INTERVAL_SEC = 0.25
+
+
+def default_share_dir(data_dir: Path) -> Path:
+    configured = os.environ.get("LIVE_SHARE_DIR")
+    if configured:
+        return Path(configured)
+    if os.path.isdir("/dev/shm"):
+        return Path("/dev/shm/signalpulse-live")
+    return Path(data_dir) / "live"
+
+
+class SharedLiveTable:
+    """One mmap'd seqlock slot per employee."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    def _map(self, employee_id: str, create: bool) -> Optional[mmap.mmap]:
+        with self._lock:
+            m = self._maps.get(employee_id)
+            if m is not None:
+                return m
+            path = self.directory / f"{employee_id}.live"
+            if not create and not path.exists():
+                return None
+            with open(path, "a+b") as f:
+                if os.fstat(f.fileno()).st_size < SLOT_BYTES:
+                    f.truncate(SLOT_BYTES)
+                m = mmap.mmap(f.fileno(), SLOT_BYTES)
+            self._maps[employee_id] = m
+            return m
+
+    def write(self, employee_id: str, state: dict):
+        """Publish a tracker's live_state() (single writer per employee: the lease owner)."""
+        payload = dumps(state)
+        while len(payload) > SLOT_BYTES - _HEADER.size and state.get("recentSwitches"):
+            state = {**state, "recentSwitches": state["recentSwitches"][1:]}
+            payload = dumps(state)
+        m = self._map(employee_id, create=True)
+        seq, _ = _HEADER.unpack_from(m, 0)
+        _HEADER.pack_into(m, 0, seq + 1, 0)
+        m[_HEADER.size:_HEADER.size + len(payload)] = payload
+        _HEADER.pack_into(m, 0, seq + 2, len(payload))
+
+    def version(self, employee_id: str) -> int:
+        m = self._map(employee_id, create=False)
+        return _HEADER.unpack_from(m, 0)[0] if m is not None else 0
+
+    def read(self, employee_id: str) -> Optional[dict]:
+        """Latest published state, or None if no worker has published one."""
+        m = self._map(employee_id, create=False)
+        if m is None:
+            return None
+        for _ in range(100):
+            seq, length = _HEADER.unpack_from(m, 0)
+            if seq == 0:
+                return None
+            if seq % 2:
+                continue
+            payload = m[_HEADER.size:_HEADER.size + length]
+            if _HEADER.unpack_from(m, 0)[0] == seq:
+                return loads(payload)
+        return None
+
+    def close(self):
+        with self._lock:
+            for m in self._maps.values():
+                m.close()
+            self._maps.clear()
+
+
+class SharedTrackerView:
+    """Read-only stand-in for a tracker owned by another worker (employee_id + live_metrics)."""
+
+    def __init__(self, employee_id: str, table: SharedLiveTable):
+        self.employee_id = employee_id
+        self.table = table
+
+    @property
+    def live_metrics(self) -> LiveMetrics:
+        state = self.table.read(self.employee_id)
+        if state is None:
+            return LiveMetrics(employeeId=self.employee_id)
+        return live_metrics_from_state(state, int(time.time() * 1000))
+
+
+class SharedLiveWatcher:
+    """Polls slot versions of watched views and reports changes (feeds SSE on non-owner workers)."""
+
+    def __init__(self, table: SharedLiveTable, on_change: Callable[[SharedTrackerView], None],
+                 interval_sec: float = WATCH_INTERVAL_SEC):
+        self.table = table
+        self.on_change = on_change
+        self.interval_sec = interval_sec
+        self._lock = threading.Lock()
+        # employee_id → (view, watcher count, last seen version)
+        self._watched: Dict[str, list] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def watch(self, view: SharedTrackerView):
+        with self._lock:
+            entry = self._watched.setdefault(view.employee_id, [view, 0, self.table.version(view.employee_id)])
+            entry[1] += 1
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="live-share-watcher", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, employee_id: str):
+        with self._lock:
+            entry = self._watched.get(employee_id)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._watched[employee_id]
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            with self._lock:
+                entries = list(self._watched.values())
+            for entry in entries:
+                version = self.table.version(entry[0].employee_id)
+                if version != entry[2] and version % 2 == 0:
+                    entry[2] = version
+                    try:
+                        self.on_change(entry[0])
+                    except Exception as e:
+                        print(f"⚠️ Live share watcher failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
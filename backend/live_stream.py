@@ -0,0 +1,100 @@
+"""Server-Sent Events fan-out of live tracker metrics.
+
+Trackers call publish() when their state actually changes (window switch,
+idle transition, aggregation). The new LiveMetrics is diffed against the
+last published one and the delta is serialized once, then queued to every
+subscriber of that employee. New subscribers get a full snapshot first,
+built fresh at subscribe time: session duration and active time keep
+growing between publishes, so the last published state would be stale.
+"""
+
+import asyncio
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from serialization import dumps
+
+# Per-subscriber backlog; a slow client that falls this far behind is resynced with a snapshot
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+class LiveBroadcaster:
+    """Per-employee subscriber lists of (event loop, asyncio.Queue)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        # Base for deltas: the state last published to this employee's subscribers
+        self._last: Dict[str, dict] = {}
+        # Keys where a snapshot handed out since then differs from _last; the next delta always carries them
+        self._resync: Dict[str, Set[str]] = {}
+
+    def subscriber_count(self, employee_id: Optional[str] = None) -> int:
+        with self._lock:
+            if employee_id is not None:
+                return len(self._subscribers.get(employee_id, []))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, tracker) -> asyncio.Queue:
+        """Register a subscriber (from inside the event loop) and queue its initial snapshot."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        loop = asyncio.get_running_loop()
+        employee_id = tracker.employee_id
+        with self._lock:
+            snapshot = tracker.live_metrics.model_dump()
+            previous = self._last.setdefault(employee_id, snapshot)
+            # This subscriber starts from `snapshot`, not `previous`: resend whatever differs next time
+            self._resync.setdefault(employee_id, set()).update(
+                k for k, v in snapshot.items() if previous.get(k) != v)
+            queue.put_nowait(_sse("snapshot", snapshot))
+            self._subscribers.setdefault(employee_id, []).append((loop, queue))
+        return queue
+
+    def unsubscribe(self, employee_id: str, queue: asyncio.Queue):
+        with self._lock:
+            subs = self._subscribers.get(employee_id, [])
+            self._subscribers[employee_id] = [s for s in subs if s[1] is not queue]
+            if not self._subscribers[employee_id]:
+                del self._subscribers[employee_id]
+                self._last.pop(employee_id, None)
+                self._resync.pop(employee_id, None)
+
+    def publish(self, tracker):
+        """Push what changed since the last publish; free when nobody is listening."""
+        employee_id = tracker.employee_id
+        with self._lock:
+            subs = list(self._subscribers.get(employee_id, []))
+            if not subs:
+                return
+            current = tracker.live_metrics.model_dump()
+            previous = self._last.get(employee_id, {})
+            resync = self._resync.pop(employee_id, set())
+            delta = {k: v for k, v in current.items() if k in resync or previous.get(k) != v}
+            if not delta:
+                return
+            self._last[employee_id] = current
+            payload = _sse("delta", delta)
+            snapshot = _sse("snapshot", current)
+
+        for loop, queue in subs:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, payload, snapshot)
+            except RuntimeError:
+                pass  # Subscriber's loop already closed
+
+
+def _offer(queue: asyncio.Queue, payload: str, snapshot: str):
+    if queue.full():
+        # Client fell behind: drop its backlog and resync with the full state
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(snapshot)
+        return
+    queue.put_nowait(payload)
+
+
+broadcaster = LiveBroadcaster()
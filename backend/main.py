@@ -2,23 +2,59 @@
 
 Exposes REST APIs for employee live metrics, stats, and manager team aggregation.
 Runs the tab tracker in background threads.
+
+Handlers are async; blocking persistence work runs on the bounded pools in
+executors.py so slow scans never stall /live or /health.
+
+Multi-worker mode (WEB_WORKERS=N, or MULTI_WORKER=1 under uvicorn --workers):
+each employee's tracker runs in exactly one worker, chosen by lease files
+(ownership.py); the others serve its live metrics from shared memory
+(live_share.py).
 """
 
 import os
+import asyncio
+import tempfile
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict
-
-from models import EmployeeData, LiveMetrics, TeamStats, Session, Stats, TimeWindowData
-from persistence import load_employee, save_employee, list_all_employees
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from models import EmployeeData, LiveMetrics, TeamStats, Session, SessionInput, Stats, TimeWindowData
+import persistence
+from employee_locks import KeyedLocks
+from persistence import (
+    MULTI_WORKER, load_employee, update_employee, append_ml_point, query_ml_points, get_team_aggregate,
+    start_background_flush, shutdown as shutdown_persistence, cache_stats, team_aggregate_seeded,
+)
 from tracker import WindowTracker
+from live_stream import broadcaster
+from live_share import SharedLiveTable, SharedLiveWatcher, SharedTrackerView, default_share_dir
+from ownership import TrackerLeases
+from ml_export import export_ml_data
+from ml_sink import ml_sink
+from executors import executor_stats, run_aggregate, run_io, shutdown as shutdown_executors
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, register_collector, render as render_metrics,
+)
+from pagination import (
+    check_dates, check_ml_cursor, check_stats_cursor, decode_cursor, employee_stats_page, encode_cursor,
+    ml_point_key, model_include, parse_fields,
+)
 from peak_hours_api import router as peak_hours_router
+from retention import RetentionJob
+from rollups import router as rollups_router
+from response_cache import versioned_response
+from serialization import FastJSONResponse, dump_model, dumps
+from session_ingest import SESSION_BATCH_MAX, ingest_sessions
 
 app = FastAPI(
     title="Signal Pulse API",
     description="Ethical, privacy-first workplace intelligence backend",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # CORS — allow React dev server and Lovable preview
@@ -36,117 +72,300 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(peak_hours_router)
+app.include_router(rollups_router)
 
 # Active window trackers (one per employee)
 trackers: Dict[str, WindowTracker] = {}
+# Serializes tracker create/replace per employee so two requests can't start duplicates
+_tracker_locks = KeyedLocks()
+# Compacts cold history into daily summaries (idempotent, so every worker may run it)
+retention_job = RetentionJob()
+
+# Multi-worker only (set up at startup): who runs which tracker, and the shared live state
+leases: Optional[TrackerLeases] = None
+live_table: Optional[SharedLiveTable] = None
+live_watcher: Optional[SharedLiveWatcher] = None
 
 
-def get_or_create_tracker(employee_id: str) -> WindowTracker:
-    """Get existing tracker or start a new one for the employee."""
+def _on_tracker_change(tracker: WindowTracker):
+    broadcaster.publish(tracker)
+    if live_table is not None:
+        live_table.write(tracker.employee_id, tracker.live_state())
+
+
+def get_or_create_tracker(employee_id: str) -> Optional[WindowTracker]:
+    """Get existing tracker or start a new one for the employee (None if another worker owns it)."""
+    tracker = trackers.get(employee_id)
+    if tracker is not None:
+        return tracker
+    if leases is not None and employee_id in leases.wanted:
+        return None
+    with _tracker_locks.hold(employee_id):
+        return _create_tracker(employee_id)
+
+
+def _create_tracker(employee_id: str) -> Optional[WindowTracker]:
     if employee_id not in trackers:
+        if leases is not None and not leases.try_acquire(employee_id):
+            return None
         emp = load_employee(employee_id)
         role = emp.role  # Get stored role
 
-        def on_ml_data(ml_point: TimeWindowData):
-            """Handler when ML data is generated hourly."""
-            emp = load_employee(employee_id)
-            emp.mlDataPoints.append(ml_point)
-            save_employee(emp)
-
+        # Hourly ML points are stored by the sink's writer thread, off the scheduler thread
         tracker = WindowTracker(
             employee_id=employee_id,
             role=role,
-            on_ml_data_complete=on_ml_data
+            on_ml_data_complete=ml_sink.submit,
+            on_change=_on_tracker_change,
         )
         tracker.start()
         trackers[employee_id] = tracker
+        if live_table is not None:
+            live_table.write(employee_id, tracker.live_state())
     return trackers[employee_id]
 
 
+def _refresh_role(ml_point: TimeWindowData):
+    """Multi-worker: set-role may have been handled by another worker (runs on the ML sink thread)."""
+    role = load_employee(ml_point.employeeId).role
+    ml_point.role = role
+    tracker = trackers.get(ml_point.employeeId)
+    if tracker is not None:
+        tracker.role = role
+
+
+def _drop_tracker(employee_id: str):
+    """Stop our tracker after its lease moved to another worker."""
+    with _tracker_locks.hold(employee_id):
+        tracker = trackers.pop(employee_id, None)
+        if tracker is not None:
+            tracker.stop()
+
+
+async def get_tracker(employee_id: str) -> Union[WindowTracker, SharedTrackerView]:
+    """Running tracker without blocking the event loop (first use loads the employee off-loop).
+
+    In multi-worker mode, employees owned by another worker get a read-only shared view.
+    """
+    tracker = trackers.get(employee_id)
+    if tracker is None and not (leases is not None and employee_id in leases.wanted):
+        tracker = await run_io(get_or_create_tracker, employee_id)
+    if tracker is None:
+        return SharedTrackerView(employee_id, live_table)
+    return tracker
+
+
 # ── Health ──────────────────────────────────────────────────
 
 @app.get("/api/health")
-def health():
-    return {"status": "ok", "activeTrackers": len(trackers)}
+async def health():
+    return {
+        "status": "ok",
+        "activeTrackers": len(trackers),
+        "liveSubscribers": broadcaster.subscriber_count(),
+        "cache": cache_stats(),
+        "executors": executor_stats(),
+        "mlSink": ml_sink.stats(),
+        "ownership": leases.stats() if leases is not None else None,
+        "mlJournal": persistence.ml_journal_stats(),
+    }
+
+
+def _collect_app_metrics():
+    yield "signalpulse_active_trackers", "gauge", "Trackers running in this worker", [({}, len(trackers))]
+    yield ("signalpulse_live_subscribers", "gauge", "Open live metric streams",
+           [({}, broadcaster.subscriber_count())])
+    if leases is not None:
+        ownership = leases.stats()
+        yield ("signalpulse_leases", "gauge", "Tracker leases owned by / wanted by this worker",
+               [({"state": "owned"}, ownership["owned"]), ({"state": "wanted"}, ownership["wanted"])])
+
+
+register_collector(_collect_app_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (text format 0.0.4)."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 
 # ── Employee: Live Metrics ──────────────────────────────────
 
 @app.get("/api/employee/{employee_id}/live", response_model=LiveMetrics)
-def get_employee_live(employee_id: str):
+async def get_employee_live(employee_id: str):
     """Real-time metrics: window switches, active/idle time (anonymous)."""
-    tracker = get_or_create_tracker(employee_id)
+    tracker = await get_tracker(employee_id)
     metrics = tracker.live_metrics
     return metrics
 
 
+# Comment line sent when idle so proxies keep the stream open
+SSE_KEEPALIVE_SEC = 15
+
+
+@app.get("/api/employee/{employee_id}/live/stream")
+async def stream_employee_live(employee_id: str, request: Request):
+    """Server-Sent Events: a `snapshot` event, then a `delta` on every tracker state change."""
+    tracker = await get_tracker(employee_id)
+    queue = broadcaster.subscribe(tracker)
+    # Another worker runs this tracker: turn its shared-memory updates into publishes here
+    shared = isinstance(tracker, SharedTrackerView)
+    if shared:
+        live_watcher.watch(tracker)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(employee_id, queue)
+            if shared:
+                live_watcher.unwatch(employee_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ── Employee: Full Stats ────────────────────────────────────
 
+# Default page size for each history (sessions, ML points, switches) in /stats
+STATS_PAGE_LIMIT = 500
+
+
+def _check_page_query(date_from: Optional[str], date_to: Optional[str], cursor: Optional[str],
+                      check_cursor: Callable[[Any], None]):
+    """Validate from/to and decode the cursor; 400 instead of a 500 (or a silent string compare)."""
+    try:
+        check_dates(date_from, date_to)
+        position = decode_cursor(cursor) if cursor is not None else None
+        check_cursor(position)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return position
+
+
 @app.get("/api/employee/{employee_id}/stats")
-def get_employee_stats(employee_id: str):
-    """Full stats and session history from persisted JSON."""
-    emp = load_employee(employee_id)
-    return emp.model_dump()
+async def get_employee_stats(
+    request: Request,
+    employee_id: str,
+    fields: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    limit: int = STATS_PAGE_LIMIT,
+    cursor: Optional[str] = None,
+):
+    """Stats plus a page of session, ML point and window switch history.
+
+    - fields: comma-separated dotted paths to return (e.g. stats.focusScore,windowSwitches)
+    - from/to: YYYY-MM-DD bounds applied to every history
+    - limit/cursor: newest `limit` entries per history; pass nextCursor for older ones
+    """
+    position = _check_page_query(date_from, date_to, cursor, check_stats_cursor)
+
+    def build_page() -> bytes:
+        history = persistence.employee_history(employee_id)
+        return dumps(employee_stats_page(history, parse_fields(fields), date_from, date_to, limit, position))
+
+    async def build() -> bytes:
+        return await run_io(build_page)
+
+    # Served from cached bytes until the employee's data changes; If-None-Match gets a 304
+    key = ("stats", employee_id, fields, date_from, date_to, limit, cursor)
+    return await versioned_response(request, "stats", key, persistence.employee_version(employee_id), build)
 
 
 # ── Employee: Add Session Manually ──────────────────────────
 
+@app.post("/api/employee/{employee_id}/session")
+async def add_employee_session(employee_id: str, session: SessionInput):
+    """Add one session (category and date derived if omitted); re-posting the same session is a no-op."""
+    return {"employeeId": employee_id, **await run_io(ingest_sessions, employee_id, [session])}
+
+
+@app.post("/api/employee/{employee_id}/sessions")
+async def add_employee_sessions(employee_id: str, sessions: List[SessionInput]):
+    """Bulk upload: categorized in one pass and saved with one write; already-stored sessions are skipped."""
+    if len(sessions) > SESSION_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"at most {SESSION_BATCH_MAX} sessions per request")
+    return {"employeeId": employee_id, **await run_io(ingest_sessions, employee_id, sessions)}
+
+
+# ── Employee: ML Training Data ──────────────────────────────
+
 @app.get("/api/employee/{employee_id}/ml-data")
-def get_employee_ml_data(employee_id: str, limit: int = 168):
+async def get_employee_ml_data(
+    employee_id: str,
+    limit: int = 168,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """Retrieve ML-ready aggregated data for model training.
     
-    Returns TimeWindowData points (up to 'limit' most recent).
+    Returns TimeWindowData points (up to 'limit' most recent, optionally within from/to).
     Each point represents hourly aggregated metrics:
     - activeSeconds, idleSeconds, windowSwitchCount
     - fragmentationScore, focusScore, uniqueWindowCount
     - longestContinuousActiveSeconds
     - taskPresent, taskCompleted flags
+
+    Pass the returned nextCursor to page further back; `fields` picks point keys.
     """
-    emp = load_employee(employee_id)
-    ml_data = emp.mlDataPoints[-limit:] if emp.mlDataPoints else []
-    return {"employeeId": employee_id, "dataPoints": ml_data}
+    position = _check_page_query(date_from, date_to, cursor, check_ml_cursor)
+    limit = max(limit, 0)
+    # One extra point tells us whether an older page exists
+    points = await run_io(query_ml_points, employee_id, date_from, date_to, limit + 1,
+                          tuple(position) if position is not None else None)
+    has_more = len(points) > limit
+    if has_more:
+        points = points[1:]
+    include = model_include(TimeWindowData, parse_fields(fields))
+    return FastJSONResponse({
+        "employeeId": employee_id,
+        "dataPoints": [p.model_dump(by_alias=True, include=include) for p in points],
+        "nextCursor": encode_cursor(list(ml_point_key(points[0]))) if has_more and points else None,
+    })
+
+
+def _set_role(employee_id: str, role: str):
+    with _tracker_locks.hold(employee_id):
+        update_employee(employee_id, lambda emp: setattr(emp, "role", role))
+        # Recreate tracker with new role
+        old = trackers.pop(employee_id, None)
+        if old is not None:
+            old.stop()
+        _create_tracker(employee_id)
 
 
 @app.post("/api/employee/{employee_id}/set-role")
-def set_employee_role(employee_id: str, role: str):
+async def set_employee_role(employee_id: str, role: str):
     """Set or update employee role for ML context."""
-    emp = load_employee(employee_id)
-    emp.role = role
-    save_employee(emp)
-    # Recreate tracker with new role
-    if employee_id in trackers:
-        trackers[employee_id].stop()
-        del trackers[employee_id]
-    get_or_create_tracker(employee_id)
+    await run_io(_set_role, employee_id, role)
     return {"status": "ok", "employeeId": employee_id, "role": role}
 
 
 # ── Manager: Aggregated Team Stats ──────────────────────────
 
-@app.get("/api/manager/team-stats", response_model=TeamStats)
-def get_team_stats():
-    """Privacy-safe aggregated team statistics (anonymous window data only)."""
-    employees = list_all_employees()
-
-    if not employees:
+def _team_stats(team: dict) -> TeamStats:
+    if not team["totalEmployees"]:
         return TeamStats()
 
-    # Aggregate from most recent ML data points
-    total_switches = 0
-    total_fragmentation = 0
-    focus_scores = []
-    
-    for emp in employees:
-        if emp.mlDataPoints:
-            # Use most recent data point
-            latest = emp.mlDataPoints[-1]
-            total_switches += latest.windowSwitchCount
-            total_fragmentation += latest.fragmentationScore
-            focus_scores.append(latest.focusScore)
-    
-    avg_focus = sum(focus_scores) / len(focus_scores) if focus_scores else 0
-    avg_fragmentation = total_fragmentation / len(employees) if employees else 0
+    # Aggregate from each employee's most recent ML data point
+    total_switches = team["totalSwitches"]
+    avg_focus = team["focusSum"] / team["focusCount"] if team["focusCount"] else 0
+    avg_fragmentation = team["totalFragmentation"] / team["totalEmployees"]
 
     suggestions = []
     if avg_fragmentation > 40:
@@ -155,7 +374,7 @@ def get_team_stats():
         suggestions.append("Overall focus declining — implement restoration breaks")
 
     return TeamStats(
-        totalEmployees=len(employees),
+        totalEmployees=team["totalEmployees"],
         avgFocusScore=round(avg_focus, 1),
         totalSwitches=total_switches,
         avgFragmentation=round(avg_fragmentation, 1),
@@ -165,18 +384,78 @@ def get_team_stats():
     )
 
 
+@app.get("/api/manager/team-stats", response_model=TeamStats)
+async def get_team_stats(request: Request):
+    """Privacy-safe aggregated team statistics (anonymous window data only).
+
+    ETag follows the team aggregate's version; If-None-Match gets a 304.
+    With MULTI_WORKER=1 each worker keeps its own aggregate, so the ETag is
+    hashed from the body instead and stays the same whichever worker answers.
+    """
+    # Only the first request scans storage to seed the aggregate; after that it's in memory
+    if team_aggregate_seeded():
+        aggregate = get_team_aggregate()
+    else:
+        aggregate = await run_aggregate(get_team_aggregate)
+
+    async def build() -> bytes:
+        return dump_model(_team_stats(aggregate.snapshot()))
+
+    version = None if MULTI_WORKER else (aggregate.seeded_at, aggregate.version)
+    return await versioned_response(request, "team-stats", "team-stats", version, build)
+
+
+# ── Manager: Bulk ML Training Data Export ───────────────────
+
+def _export_to_tempfile(fmt: str, date_from: Optional[str], date_to: Optional[str], role: Optional[str]):
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+    os.close(fd)
+    try:
+        return path, export_ml_data(path, fmt, date_from, date_to, role)
+    except Exception:
+        os.unlink(path)
+        raise
+
+
+@app.get("/api/manager/ml-export")
+async def export_ml_training_data(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    role: Optional[str] = None,
+    format: str = "npz",
+):
+    """All employees' TimeWindowData as one columnar file (npz of .npy columns, or parquet)."""
+    if format not in ("npz", "parquet"):
+        raise HTTPException(status_code=400, detail="format must be 'npz' or 'parquet'")
+    try:
+        check_dates(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        path, rows = await run_aggregate(_export_to_tempfile, format, date_from, date_to, role)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="parquet export requires pyarrow")
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=f"ml-export.{format}",
+        headers={"X-Row-Count": str(rows)},
+        background=BackgroundTask(os.unlink, path),
+    )
+
+
 # ── Test/Debug: Manual Aggregation Trigger ──────────────────
 
 @app.post("/api/employee/{employee_id}/trigger-aggregation")
-def trigger_aggregation(employee_id: str):
+async def trigger_aggregation(employee_id: str):
     """Manually trigger ML data aggregation (for testing/debugging)."""
-    tracker = get_or_create_tracker(employee_id)
+    tracker = await get_tracker(employee_id)
+    if isinstance(tracker, SharedTrackerView):
+        raise HTTPException(status_code=409, detail=f"tracker for {employee_id} runs in another worker")
     ml_point = tracker._generate_ml_data_point()
     
     if ml_point:
-        emp = load_employee(employee_id)
-        emp.mlDataPoints.append(ml_point)
-        save_employee(emp)
+        await run_io(append_ml_point, ml_point)
         
         print(f"✅ ML data aggregated and saved for {employee_id}")
         print(f"   Switches: {ml_point.windowSwitchCount}, Active: {ml_point.activeSeconds}s, Focus: {ml_point.focusScore}%")
@@ -196,12 +475,48 @@ def trigger_aggregation(employee_id: str):
 @app.on_event("startup")
 def startup():
     """Auto-start tracker for default employee on boot."""
+    global leases, live_table, live_watcher
     default_id = os.environ.get("EMPLOYEE_ID", "EMP001")
+    start_background_flush()
+    if MULTI_WORKER:
+        ml_sink.prepare = _refresh_role
+    ml_sink.start()
+    retention_job.start()
+    if MULTI_WORKER:
+        live_table = SharedLiveTable(default_share_dir(persistence.DATA_DIR))
+        live_watcher = SharedLiveWatcher(live_table, broadcaster.publish)
+        leases = TrackerLeases(persistence.DATA_DIR / "leases", on_acquired=get_or_create_tracker,
+                               on_lost=_drop_tracker)
+        leases.start()
+        persistence.start_ml_journal(leases.worker_id)
+        print(f"🔀 Multi-worker mode: worker {leases.worker_id}")
     get_or_create_tracker(default_id)
     print(f"✅ Signal Pulse API running — anonymous window tracking for {default_id}")
     print(f"📊 ML data will be aggregated every 60 seconds and saved to backend/data/{default_id}.json")
     print(f"🧪 For manual testing: POST /api/employee/{default_id}/trigger-aggregation")
 
 
+@app.on_event("shutdown")
+def shutdown():
+    """Stop trackers, store queued ML points, drain queued I/O, and flush cached employee writes to disk."""
+    for tracker in trackers.values():
+        tracker.stop()
+    retention_job.stop()
+    ml_sink.stop()
+    persistence.stop_ml_journal()
+    if leases is not None:
+        leases.stop()
+        live_watcher.stop()
+        live_table.close()
+    shutdown_executors()
+    shutdown_persistence()
+
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    workers = int(os.environ.get("WEB_WORKERS", "1"))
+    if workers > 1:
+        # Inherited by the worker processes, before they import persistence
+        os.environ["MULTI_WORKER"] = "1"
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,293 @@
+"""In-process metrics with a Prometheus text exposition (/metrics).
+
+Counters, gauges and fixed-bucket histograms, optionally labelled. An
+observation is a bisect plus two additions under the metric's lock, so
+the hot paths (scheduler tick, window probe, load/save, every request)
+stay instrumented in production. Values that already live elsewhere
+(cache hit rates, executor queues) are read at scrape time through
+collectors instead of being mirrored on every change.
+
+Each API worker process keeps its own numbers; with several workers
+every scrape sees the worker that answered it (labelled `pid`).
+"""
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Default latency buckets (seconds): 100µs … 10s
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# A collector returns (name, type, help, [(labels, value), ...]) families at scrape time
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Named metric with one child per label combination; subclasses say what a child is."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """The child for one label combination (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """A fresh child (value holder) for a new label combination."""
+
+    def _label_dict(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.label_names, values))
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield from child.render(self.name, self._label_dict(values))
+
+
+class _Value:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def render(self, name: str, labels: Dict[str, str]) -> Iterator[str]:
+        yield f"{name}{_format_labels(labels)} {_format_value(self.value)}"
+
+
+class Counter(_Metric):
+    """Monotonic total."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self, name: str, labels: Dict[str, str]) -> Iterator[str]:
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, n in zip(self.bounds + (float("inf"),), counts):
+            cumulative += n
+            yield f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}"
+        yield f"{name}_sum{_format_labels(labels)} {_format_value(total)}"
+        yield f"{name}_count{_format_labels(labels)} {count}"
+
+
+class Histogram(_Metric):
+    """Distribution over fixed upper bounds (cumulative `le` buckets, plus _sum and _count)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+
+# ── Registry ────────────────────────────────────────────────
+
+_metrics: List[_Metric] = []
+_collectors: List[Callable[[], Iterable[Family]]] = []
+_registry_lock = threading.Lock()
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        _metrics.append(metric)
+    return metric
+
+
+def counter(name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, help_text, labels))
+
+
+def gauge(name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+    return _register(Gauge(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, labels, buckets))
+
+
+def register_collector(collect: Callable[[], Iterable[Family]]):
+    """Add a callback that reports metric families at scrape time."""
+    with _registry_lock:
+        _collectors.append(collect)
+
+
+def render() -> str:
+    """Every metric in Prometheus text format 0.0.4."""
+    with _registry_lock:
+        metrics, collectors = list(_metrics), list(_collectors)
+    lines = [
+        "# HELP signalpulse_process_info Worker process answering this scrape",
+        "# TYPE signalpulse_process_info gauge",
+        f'signalpulse_process_info{{pid="{os.getpid()}"}} 1',
+    ]
+    for metric in metrics:
+        lines.extend(metric.render())
+    for collect in collectors:
+        try:
+            families = list(collect())
+        except Exception as e:
+            print(f"⚠️ Metrics collector failed: {e}")
+            continue
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ── Hot-path metrics ────────────────────────────────────────
+
+TICK_DURATION = histogram("signalpulse_tick_duration_seconds",
+                          "Scheduler wake-up: probe, window-change events and due tracker deadlines")
+TICK_DRIFT = histogram("signalpulse_tick_drift_seconds", "How late each polling probe started versus its schedule")
+TICKS_SKIPPED = counter("signalpulse_ticks_skipped_total", "Polling probes dropped because the previous one overran")
+SCHEDULER_WAKEUPS = counter("signalpulse_scheduler_wakeups_total",
+                            "Times the scheduler thread woke (probe slot, pushed event or deadline)")
+WINDOW_PROBE = histogram("signalpulse_window_probe_seconds", "Active-window probe latency", ["source"])
+AGGREGATION = histogram("signalpulse_aggregation_seconds", "Per-tracker ML data point aggregation, including queueing the point for storage")
+STORE_LATENCY = histogram("signalpulse_store_seconds", "Storage backend call latency", ["op", "backend"])
+STORE_BYTES = counter("signalpulse_store_bytes_total", "Employee document and ML log bytes read/written",
+                      ["op", "backend"])
+REQUEST_LATENCY = histogram("signalpulse_http_request_seconds",
+                            "Time to response start per route", ["method", "route", "status"])
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request until its response starts.
+
+    Labelled by route template (/api/employee/{employee_id}/live), so
+    per-employee paths don't explode the label set. Streams (SSE) count
+    once their headers are sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        recorded = False
+
+        def record(status: int):
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(scope["method"], path, str(status)).observe(time.perf_counter() - start)
+
+        async def timed_send(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        except Exception:
+            if not recorded:
+                record(500)
+            raise
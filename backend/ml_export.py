@@ -0,0 +1,248 @@
+"""Columnar export of ML training data (TimeWindowData) for all employees.
+
+Points are streamed out of storage in batches and written column by
+column, so memory stays flat however much history is exported.
+
+Formats:
+  npy      directory with one .npy file per column plus manifest.json;
+           open_export() memory-maps it, so training jobs can scan months
+           of data without building Python objects
+  npz      the same columns zipped into one file (for HTTP download)
+  parquet  single Parquet file, one row group per batch (needs pyarrow)
+
+CLI:
+    python ml_export.py --out export/ [--from 2026-01-01] [--to 2026-03-31] [--role developer] [--format npy]
+"""
+
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+import persistence
+from models import TimeWindowData
+
+BATCH_SIZE = 10_000
+
+# Column name → dtype. employee/role are codes into the manifest's lookup lists.
+COLUMNS: Dict[str, np.dtype] = {
+    "employee": np.dtype("<i4"),
+    "role": np.dtype("<i4"),
+    "date": np.dtype("<M8[D]"),
+    "hour": np.dtype("<i1"),
+    "activeSeconds": np.dtype("<i4"),
+    "idleSeconds": np.dtype("<i4"),
+    "windowSwitchCount": np.dtype("<i4"),
+    "uniqueWindowCount": np.dtype("<i4"),
+    "longestContinuousActiveSeconds": np.dtype("<i4"),
+    "taskPresent": np.dtype("?"),
+    "taskCompleted": np.dtype("?"),
+    "fragmentationScore": np.dtype("<f4"),
+    "focusScore": np.dtype("<f4"),
+    "timestamp": np.dtype("<i8"),
+}
+
+_EPOCH = date(1970, 1, 1)
+
+
+class _Codes:
+    """Interns strings to dense int codes."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        c = self._index.get(value)
+        if c is None:
+            c = self._index[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+
+class NpyExportWriter:
+    """Appends batches to raw per-column files, then finalizes them as .npy."""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.rows = 0
+        self.employees = _Codes()
+        self.roles = _Codes()
+        self._raw = {name: open(self.out_dir / f"{name}.raw", "wb") for name in COLUMNS}
+
+    def write_batch(self, points: List[TimeWindowData]):
+        if not points:
+            return
+        columns = {
+            "employee": [self.employees.code(p.employeeId) for p in points],
+            "role": [self.roles.code(p.role) for p in points],
+            "date": [(date.fromisoformat(p.date) - _EPOCH).days for p in points],
+            "hour": [int(p.timeWindowStart[:2]) for p in points],
+            "activeSeconds": [p.activeSeconds for p in points],
+            "idleSeconds": [p.idleSeconds for p in points],
+            "windowSwitchCount": [p.windowSwitchCount for p in points],
+            "uniqueWindowCount": [p.uniqueWindowCount for p in points],
+            "longestContinuousActiveSeconds": [p.longestContinuousActiveSeconds for p in points],
+            "taskPresent": [p.taskPresent for p in points],
+            "taskCompleted": [p.taskCompleted for p in points],
+            "fragmentationScore": [p.fragmentationScore for p in points],
+            "focusScore": [p.focusScore for p in points],
+            "timestamp": [p.timestamp for p in points],
+        }
+        for name, values in columns.items():
+            dtype = COLUMNS[name]
+            if dtype.kind == "M":
+                arr = np.array(values, dtype="<i8").astype(dtype)
+            else:
+                arr = np.array(values, dtype=dtype)
+            arr.tofile(self._raw[name])
+        self.rows += len(points)
+
+    def close(self, filters: Optional[dict] = None):
+        """Turn each raw column into a real .npy (header + streamed copy) and write the manifest."""
+        for name, raw in self._raw.items():
+            raw.close()
+            raw_path = self.out_dir / f"{name}.raw"
+            header = {
+                "descr": np.lib.format.dtype_to_descr(COLUMNS[name]),
+                "fortran_order": False,
+                "shape": (self.rows,),
+            }
+            with open(self.out_dir / f"{name}.npy", "wb") as out, open(raw_path, "rb") as src:
+                np.lib.format.write_array_header_1_0(out, header)
+                shutil.copyfileobj(src, out, length=1 << 20)
+            raw_path.unlink()
+        manifest = {
+            "format": "signalpulse-ml-npy",
+            "rows": self.rows,
+            "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+            "employees": self.employees.values,
+            "roles": self.roles.values,
+            "filters": filters or {},
+        }
+        with open(self.out_dir / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+
+class ParquetExportWriter:
+    """Streams batches into one Parquet file as row groups."""
+
+    def __init__(self, out_path: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.out_path = Path(out_path)
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self.rows = 0
+        self._writer = None
+        self._pq = pq
+
+    def write_batch(self, points: List[TimeWindowData]):
+        if not points:
+            return
+        table = self._pa.Table.from_pylist([p.model_dump() for p in points])
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(str(self.out_path), table.schema)
+        self._writer.write_table(table)
+        self.rows += len(points)
+
+    def close(self, filters: Optional[dict] = None):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _batches(points: Iterable[TimeWindowData], size: int) -> Iterator[List[TimeWindowData]]:
+    batch: List[TimeWindowData] = []
+    for point in points:
+        batch.append(point)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_ml_data(out: Path, fmt: str = "npy", date_from: Optional[str] = None, date_to: Optional[str] = None,
+                   role: Optional[str] = None, batch_size: int = BATCH_SIZE) -> int:
+    """Stream every employee's ML points matching the filters into `out`. Returns rows written."""
+    filters = {"from": date_from, "to": date_to, "role": role}
+    points = persistence.iter_all_ml_points(date_from=date_from, date_to=date_to, role=role)
+
+    if fmt == "parquet":
+        writer = ParquetExportWriter(out)
+    elif fmt in ("npy", "npz"):
+        writer = NpyExportWriter(out if fmt == "npy" else Path(tempfile.mkdtemp(prefix="mlexport-")))
+    else:
+        raise ValueError(f"unknown export format: {fmt}")
+
+    try:
+        try:
+            for batch in _batches(points, batch_size):
+                writer.write_batch(batch)
+        finally:
+            writer.close(filters)
+        if fmt == "npz":
+            # .npy members stored uncompressed so np.load(...) reads them directly
+            with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+                for path in sorted(writer.out_dir.iterdir()):
+                    zf.write(path, path.name)
+    except BaseException:
+        # No half-written file left behind
+        if fmt != "npy":
+            Path(out).unlink(missing_ok=True)
+        raise
+    finally:
+        if fmt == "npz":
+            shutil.rmtree(writer.out_dir, ignore_errors=True)
+    return writer.rows
+
+
+class MLExport:
+    """Memory-mapped view of an `npy` export directory."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / "manifest.json", "r") as f:
+            self.manifest = json.load(f)
+        self.employees: List[str] = self.manifest["employees"]
+        self.roles: List[str] = self.manifest["roles"]
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in self.manifest["columns"]
+        }
+
+    def __len__(self) -> int:
+        return self.manifest["rows"]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def iter_batches(self, size: int = BATCH_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+        """Column slices of `size` rows — views into the mapped files, no copies."""
+        for start in range(0, len(self), size):
+            yield {name: col[start:start + size] for name, col in self.columns.items()}
+
+
+def open_export(path: Path) -> MLExport:
+    return MLExport(path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export ML training data in a columnar format")
+    parser.add_argument("--out", type=Path, required=True, help="output directory (npy) or file (npz/parquet)")
+    parser.add_argument("--format", choices=["npy", "npz", "parquet"], default="npy")
+    parser.add_argument("--from", dest="date_from", help="first date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--to", dest="date_to", help="last date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--role", help="only export points recorded for this role")
+    args = parser.parse_args()
+
+    rows = export_ml_data(args.out, args.format, args.date_from, args.date_to, args.role)
+    print(f"✅ Exported {rows} ML data points to {args.out} ({args.format})")
@@ -0,0 +1,178 @@
+"""Shared journal of appended ML points for multi-worker mode.
+
+Each worker keeps its own team aggregate, rollups and peak-hours profiles
+in memory, fed by the ML points it stores itself. To hear about the
+points other workers store without rescanning the whole dataset, every
+append is also written to an append-only journal in DATA_DIR/journal,
+one JSON line per point tagged with the writing worker. A follower thread
+in each worker reads whatever was added since its high-water mark
+(segment, byte offset) every ML_JOURNAL_POLL_SEC and hands the other
+workers' points to persistence, which applies them exactly like local
+ones. A storage scan is then only needed once per worker, at seed time.
+
+The journal is a ring of segment files: a writer starts a new segment
+once the newest reaches ML_JOURNAL_SEGMENT_BYTES and deletes all but the
+newest ML_JOURNAL_SEGMENTS. A follower that falls so far behind that its
+segment is gone counts a gap (`gaps`); consumers seeded before the gap
+rebuild from storage on their next read.
+
+Tuning (environment):
+  ML_JOURNAL_SEGMENT_BYTES  segment size before rotation (default 4 MiB, ~10k points)
+  ML_JOURNAL_SEGMENTS       segments kept (default 4)
+  ML_JOURNAL_POLL_SEC       follower poll interval (default 1)
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from employee_locks import lock_file, unlock_file
+from models import TimeWindowData
+from serialization import dump_model, dumps, loads
+
+ML_JOURNAL_SEGMENT_BYTES = int(os.environ.get("ML_JOURNAL_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+ML_JOURNAL_SEGMENTS = int(os.environ.get("ML_JOURNAL_SEGMENTS", "4"))
+ML_JOURNAL_POLL_SEC = float(os.environ.get("ML_JOURNAL_POLL_SEC", "1"))
+
+_SUFFIX = ".jsonl"
+
+
+class MLJournal:
+    """Append side and follower of the shared ML point journal, for one worker."""
+
+    def __init__(self, directory: Path, worker_id: str,
+                 apply: Callable[[str, List[TimeWindowData]], None],
+                 segment_bytes: int = ML_JOURNAL_SEGMENT_BYTES, keep_segments: int = ML_JOURNAL_SEGMENTS,
+                 poll_sec: float = ML_JOURNAL_POLL_SEC):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.worker_id = worker_id
+        # Called with (employeeId, points) for each run of another worker's points
+        self.apply = apply
+        self.segment_bytes = segment_bytes
+        self.keep_segments = max(2, keep_segments)
+        self.poll_sec = poll_sec
+        self.gaps = 0
+        self.applied = 0
+        self._read_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # High-water mark: everything before (segment, offset) has been read.
+        # Start at the end: points stored before now are found by the seed scans.
+        self._segment = self._newest_segment() or 1
+        path = self._path(self._segment)
+        self._offset = path.stat().st_size if path.exists() else 0
+
+    # ── Segments ────────────────────────────────────────────────
+
+    def _path(self, segment: int) -> Path:
+        return self.directory / f"{segment:012d}{_SUFFIX}"
+
+    def _segments(self) -> List[int]:
+        return sorted(int(p.stem) for p in self.directory.glob(f"*{_SUFFIX}") if p.stem.isdigit())
+
+    def _newest_segment(self) -> int:
+        segments = self._segments()
+        return segments[-1] if segments else 0
+
+    # ── Append (any thread, any worker) ─────────────────────────
+
+    def append(self, points: List[TimeWindowData]):
+        """Add points to the newest segment, rotating first if it is full."""
+        if not points:
+            return
+        prefix = b'{"w":' + dumps(self.worker_id) + b',"p":'
+        data = b"".join(prefix + dump_model(point) + b"}\n" for point in points)
+        with open(self.directory / ".lock", "a+b") as lock:
+            lock_file(lock)
+            try:
+                segment = self._newest_segment() or 1
+                path = self._path(segment)
+                if path.exists() and path.stat().st_size >= self.segment_bytes:
+                    segment += 1
+                    path = self._path(segment)
+                    for old in self._segments():
+                        if old <= segment - self.keep_segments:
+                            self._path(old).unlink(missing_ok=True)
+                with open(path, "ab") as f:
+                    f.write(data)
+            finally:
+                unlock_file(lock)
+
+    # ── Follow ──────────────────────────────────────────────────
+
+    def poll(self) -> int:
+        """Apply other workers' points added since the last poll; returns how many."""
+        with self._read_lock:
+            applied = 0
+            while True:
+                path = self._path(self._segment)
+                # Once a newer segment exists, this one is never appended to again
+                final = self._path(self._segment + 1).exists()
+                try:
+                    with open(path, "rb") as f:
+                        f.seek(self._offset)
+                        chunk = f.read()
+                except FileNotFoundError:
+                    segments = self._segments()
+                    newer = [s for s in segments if s > self._segment]
+                    if not newer:
+                        return applied  # Not written yet
+                    # Rotated away before we read it: the points in between are lost to us
+                    self.gaps += 1
+                    print(f"⚠️ ML journal: fell behind (segment {self._segment} is gone) — consumers will rescan")
+                    self._segment, self._offset = newer[0], 0
+                    continue
+                # A line still being written is read on the next poll
+                end = chunk.rfind(b"\n") + 1
+                applied += self._apply_lines(chunk[:end])
+                self._offset += end
+                if not final or end < len(chunk):
+                    return applied
+                self._segment, self._offset = self._segment + 1, 0
+
+    def _apply_lines(self, data: bytes) -> int:
+        runs: Dict[str, List[TimeWindowData]] = {}
+        for line in data.splitlines():
+            try:
+                entry = loads(line)
+                if entry["w"] == self.worker_id:
+                    continue
+                point = TimeWindowData.model_validate(entry["p"])
+            except Exception as e:
+                print(f"⚠️ ML journal: skipped unreadable entry: {e}")
+                continue
+            runs.setdefault(point.employeeId, []).append(point)
+        count = 0
+        for employee_id, points in runs.items():
+            try:
+                self.apply(employee_id, points)
+            except Exception as e:
+                print(f"⚠️ ML journal: applying {len(points)} points for {employee_id} failed: {e}")
+            count += len(points)
+        self.applied += count
+        return count
+
+    def _run(self):
+        while not self._stop.wait(self.poll_sec):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ ML journal poll failed: {e}")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ml-journal", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"segment": self._segment, "offset": self._offset, "applied": self.applied, "gaps": self.gaps}
@@ -0,0 +1,247 @@
+"""Off-thread writer for hourly ML data points.
+
+Trackers finish an aggregation window on the scheduler thread; handing
+the point straight to storage would put a disk read-modify-write (and
+any slow-storage stall) on the thread that timestamps window changes.
+MLSink instead queues points from every tracker and a dedicated writer
+thread stores them in batches: whatever is queued (up to
+ML_SINK_BATCH_MAX) is grouped by employee and written with one
+persistence.append_ml_points call per employee.
+
+Backpressure: the queue holds ML_SINK_QUEUE points. When storage falls
+that far behind, submit() waits up to ML_SINK_BLOCK_SEC for room and
+then drops the point (counted and logged) rather than stalling
+sampling.
+
+Failed writes never hold up the writer: an employee whose write raises
+has its points parked in a per-employee buffer (ML_SINK_PARKED_MAX
+points, oldest dropped first) and retried with backoff on later passes,
+while every other employee keeps being stored. New points for a parked
+employee join the buffer so they are written in order once storage
+recovers. At shutdown each parked employee gets one last attempt.
+
+Tuning (environment):
+  ML_SINK_QUEUE      queued points before backpressure (default 10000)
+  ML_SINK_BATCH_MAX  points per writer pass (default 500)
+  ML_SINK_BLOCK_SEC  how long submit() may wait for room (default 0.05)
+  ML_SINK_PARKED_MAX points kept per employee while its writes fail (default 1000)
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import persistence
+from metrics import counter, histogram, register_collector
+from models import TimeWindowData
+
+ML_SINK_QUEUE = int(os.environ.get("ML_SINK_QUEUE", "10000"))
+ML_SINK_BATCH_MAX = int(os.environ.get("ML_SINK_BATCH_MAX", "500"))
+ML_SINK_BLOCK_SEC = float(os.environ.get("ML_SINK_BLOCK_SEC", "0.05"))
+ML_SINK_PARKED_MAX = int(os.environ.get("ML_SINK_PARKED_MAX", "1000"))
+# Retry delays after a failed write (seconds), capped at the last value
+RETRY_BACKOFF_SEC = (0.1, 0.5, 2.0, 10.0)
+
+SINK_POINTS = counter("signalpulse_ml_sink_points_total", "ML points by fate in the sink",
+                      ["outcome"])
+SINK_BATCH = histogram("signalpulse_ml_sink_batch_points", "Points per writer pass",
+                       buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000))
+SINK_LAG = histogram("signalpulse_ml_sink_lag_seconds", "Time from submit() until the point is stored")
+SINK_RETRIES = counter("signalpulse_ml_sink_retries_total", "Failed batch writes that will be retried")
+
+_submitted = SINK_POINTS.labels("submitted")
+_written = SINK_POINTS.labels("written")
+_dropped = SINK_POINTS.labels("dropped")
+
+_Item = Tuple[float, TimeWindowData]  # (time.monotonic() at submit, point)
+
+
+class _Parked:
+    """One employee's points waiting out a failed write."""
+
+    __slots__ = ("items", "attempts", "retry_at")
+
+    def __init__(self, max_points: int):
+        self.items: Deque[_Item] = deque(maxlen=max_points)
+        self.attempts = 0
+        self.retry_at = 0.0
+
+
+class MLSink:
+    """Bounded queue of ML points drained by one writer thread."""
+
+    def __init__(self, write: Optional[Callable[[str, List[TimeWindowData]], None]] = None,
+                 prepare: Optional[Callable[[TimeWindowData], None]] = None,
+                 max_queue: int = ML_SINK_QUEUE, batch_max: int = ML_SINK_BATCH_MAX,
+                 block_sec: float = ML_SINK_BLOCK_SEC, parked_max: int = ML_SINK_PARKED_MAX,
+                 retry_backoff: Sequence[float] = RETRY_BACKOFF_SEC):
+        self.write = write or persistence.append_ml_points
+        # Runs on the writer thread before each point is stored (e.g. refresh its role)
+        self.prepare = prepare
+        self.batch_max = batch_max
+        self.block_sec = block_sec
+        self.parked_max = max(1, parked_max)
+        self.retry_backoff = tuple(retry_backoff) or (0.0,)
+        self._queue: "queue.Queue[_Item]" = queue.Queue(maxsize=max_queue)
+        # Employees whose last write failed; touched only by the writer (or stop() after it)
+        self._parked: Dict[str, _Parked] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.submitted = self.written = self.dropped = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="ml-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Store everything queued so far, then stop the writer."""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        # Anything submitted after the writer exited (or with no writer at all)
+        while self._write_batch(self._take(block=False)):
+            pass
+        # One last attempt for parked employees, then count what's left as lost
+        self._retry_parked(force=True)
+        for employee_id, parked in self._parked.items():
+            print(f"❌ ML sink gave up on {len(parked.items)} points for {employee_id} at shutdown")
+            self._drop(len(parked.items))
+        self._parked.clear()
+
+    def submit(self, point: TimeWindowData) -> bool:
+        """Queue a point for storage; False if it was dropped because the queue stayed full."""
+        try:
+            self._queue.put((time.monotonic(), point), timeout=self.block_sec)
+        except queue.Full:
+            self.dropped += 1
+            _dropped.inc()
+            print(f"⚠️ ML sink full ({self._queue.maxsize} points) — dropped point for {point.employeeId}")
+            return False
+        self.submitted += 1
+        _submitted.inc()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "parked": self.parked_points(),
+        }
+
+    def parked_points(self) -> int:
+        return sum(len(parked.items) for parked in list(self._parked.values()))
+
+    def _take(self, block: bool) -> List[_Item]:
+        """Everything queued (up to batch_max), waiting briefly for the first item if `block`."""
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=0.5) if block else self._queue.get_nowait())
+            while len(batch) < self.batch_max:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write_batch(self, batch: List[_Item]) -> bool:
+        """Store one batch, one write per employee, parking employees whose write fails; False if empty."""
+        if not batch:
+            return False
+        SINK_BATCH.observe(len(batch))
+        groups: "OrderedDict[str, List[_Item]]" = OrderedDict()
+        for item in batch:
+            groups.setdefault(item[1].employeeId, []).append(item)
+        now = time.monotonic()
+        for employee_id, items in groups.items():
+            if self.prepare:
+                for _, point in items:
+                    try:
+                        self.prepare(point)
+                    except Exception as e:
+                        print(f"⚠️ ML sink prepare failed for {employee_id}: {e}")
+            parked = self._parked.get(employee_id)
+            if parked is not None:
+                self._park(parked, items)
+                if parked.retry_at <= now or self._stopping.is_set():
+                    self._flush(employee_id, parked)
+            else:
+                self._store(employee_id, items)
+        for _ in batch:
+            self._queue.task_done()
+        return True
+
+    def _store(self, employee_id: str, items: List[_Item]) -> bool:
+        """One write attempt; on failure the items are parked for a later retry."""
+        try:
+            self.write(employee_id, [point for _, point in items])
+        except Exception as e:
+            parked = self._parked.get(employee_id)
+            if parked is None:
+                parked = self._parked[employee_id] = _Parked(self.parked_max)
+                self._park(parked, items)
+            delay = self.retry_backoff[min(parked.attempts, len(self.retry_backoff) - 1)]
+            parked.attempts += 1
+            parked.retry_at = time.monotonic() + delay
+            SINK_RETRIES.inc()
+            print(f"⚠️ ML sink write failed for {employee_id} ({e}) — "
+                  f"{len(parked.items)} points parked, retrying in {delay}s")
+            return False
+        self._parked.pop(employee_id, None)
+        done = time.monotonic()
+        for queued_at, _ in items:
+            SINK_LAG.observe(done - queued_at)
+        self.written += len(items)
+        _written.inc(len(items))
+        return True
+
+    def _flush(self, employee_id: str, parked: _Parked) -> bool:
+        return self._store(employee_id, list(parked.items))
+
+    def _park(self, parked: _Parked, items: List[_Item]):
+        """Add to an employee's parked points; the buffer drops its oldest when full."""
+        overflow = len(parked.items) + len(items) - self.parked_max
+        if overflow > 0:
+            self._drop(overflow)
+            print(f"⚠️ ML sink parked buffer full — dropped {overflow} oldest points for "
+                  f"{items[0][1].employeeId}")
+        parked.items.extend(items)
+
+    def _retry_parked(self, force: bool = False):
+        """Retry every parked employee whose backoff has run out (all of them if `force`)."""
+        now = time.monotonic()
+        for employee_id, parked in list(self._parked.items()):
+            if force or parked.retry_at <= now:
+                self._flush(employee_id, parked)
+
+    def _drop(self, count: int):
+        self.dropped += count
+        _dropped.inc(count)
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            self._write_batch(self._take(block=True))
+            self._retry_parked()
+
+
+ml_sink = MLSink()
+
+
+def _collect_sink_metrics():
+    yield ("signalpulse_ml_sink_queued", "gauge", "ML points waiting for the writer thread",
+           [({}, ml_sink._queue.qsize())])
+    yield ("signalpulse_ml_sink_capacity", "gauge", "ML sink queue capacity",
+           [({}, ml_sink._queue.maxsize)])
+    yield ("signalpulse_ml_sink_parked", "gauge", "ML points parked after a failed write",
+           [({}, ml_sink.parked_points())])
+
+
+register_collector(_collect_sink_metrics)
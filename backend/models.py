@@ -1,9 +1,11 @@
 """Pydantic models matching the strict JSON storage format."""
 
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import Dict, List, Optional
+import hashlib
 import time
-import random
+
+from switch_log import SwitchLog
 
 
 class WindowSwitch(BaseModel):
@@ -33,6 +35,12 @@ class TimeWindowData(BaseModel):
     timestamp: int  # when this record was created
 
 
+def session_id(domain: str, start_time: int, end_time: int) -> str:
+    """Deterministic session id: the same session always gets the same id, so retried uploads dedupe."""
+    digest = hashlib.blake2b(f"{domain}|{start_time}|{end_time}".encode(), digest_size=8).hexdigest()
+    return f"{end_time}-{digest}"
+
+
 class Session(BaseModel):
     category: str
     date: str
@@ -46,7 +54,6 @@ class Session(BaseModel):
     @classmethod
     def create(cls, domain: str, category: str, start_time: int, end_time: int, date: str):
         duration = end_time - start_time
-        session_id = f"{end_time}-{random.random()}"
         return cls(
             category=category,
             date=date,
@@ -55,10 +62,25 @@ class Session(BaseModel):
             startTime=start_time,
             endTime=end_time,
             timestamp=end_time,
-            id=session_id,
+            id=session_id(domain, start_time, end_time),
         )
 
 
+class SessionInput(BaseModel):
+    """One browsing session as uploaded by the extension (category and date are derived if omitted)."""
+    domain: str
+    startTime: int  # epoch ms
+    endTime: int  # epoch ms
+    category: Optional[str] = None
+    date: Optional[str] = None  # YYYY-MM-DD, defaults to startTime's UTC date
+
+    @model_validator(mode="after")
+    def _check_times(self):
+        if self.endTime < self.startTime:
+            raise ValueError("endTime must not be before startTime")
+        return self
+
+
 class Stats(BaseModel):
     totalTime: int = 0
     workTime: int = 0
@@ -76,12 +98,21 @@ class Stats(BaseModel):
     todaySessions: List[Session] = Field(default_factory=list)
 
 
+class DailySummary(BaseModel):
+    """One day of raw history after retention compaction (see retention.py)."""
+    kind: str  # "ml", "sessions" or "switches"
+    date: str  # YYYY-MM-DD
+    role: str = ""  # role of the ML points summarized ("ml" only)
+    values: Dict[str, float] = Field(default_factory=dict)  # sums/counts; see retention.py for keys
+
+
 class EmployeeData(BaseModel):
     employeeId: str
     role: str = "developer"  # store role for ML data
     stats: Stats = Field(default_factory=Stats)
     mlDataPoints: List[TimeWindowData] = Field(default_factory=list)  # ML training data
-    windowSwitches: List[WindowSwitch] = Field(default_factory=list)  # Anonymous switches
+    windowSwitches: SwitchLog = Field(default_factory=SwitchLog)  # Anonymous switches (columnar, WindowSwitch JSON shape)
+    summaries: List[DailySummary] = Field(default_factory=list)  # Compacted history older than the retention windows
 
     def add_session(self, session: Session):
         self.stats.todaySessions.append(session)
@@ -0,0 +1,155 @@
+"""Tracker ownership leases for multi-worker deployments.
+
+With `uvicorn main:app --workers N` (MULTI_WORKER=1) every worker can
+serve every request, but each employee's WindowTracker must run in
+exactly one of them. Ownership is a lease file per employee
+(data/leases/{employeeId}.lease: owner id + expiry). The owner renews
+its leases every LEASE_TTL_SEC / 3; a worker that dies stops renewing
+and its employees are picked up by the next worker that asks for them.
+Lease reads and writes happen under one OS file lock, so two workers
+can never both take the same free lease.
+
+Tuning (environment):
+  LEASE_TTL_SEC  seconds a lease stays valid without renewal (default 15)
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Set
+
+from employee_locks import lock_file, unlock_file
+
+LEASE_TTL_SEC = float(os.environ.get("LEASE_TTL_SEC", "15"))
+
+
+class TrackerLeases:
+    """Lease files granting one worker the right to run an employee's tracker."""
+
+    def __init__(self, lease_dir: Path, ttl_sec: float = LEASE_TTL_SEC, worker_id: Optional[str] = None,
+                 on_acquired: Optional[Callable[[str], None]] = None,
+                 on_lost: Optional[Callable[[str], None]] = None):
+        self.lease_dir = Path(lease_dir)
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_sec = ttl_sec
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        # Called (from the heartbeat thread) when a wanted lease is taken over / an owned one is lost
+        self.on_acquired = on_acquired
+        self.on_lost = on_lost
+        self._lock = threading.Lock()
+        self.owned: Set[str] = set()
+        # Employees this worker was asked about but another worker owns; retried on each heartbeat
+        self.wanted: Set[str] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _path(self, employee_id: str) -> Path:
+        return self.lease_dir / f"{employee_id}.lease"
+
+    @contextmanager
+    def _guard(self) -> Iterator[None]:
+        with open(self.lease_dir / ".guard", "a+b") as f:
+            lock_file(f)
+            try:
+                yield
+            finally:
+                unlock_file(f)
+
+    def _read(self, employee_id: str) -> Optional[dict]:
+        try:
+            with open(self._path(employee_id), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, employee_id: str):
+        lease = {"owner": self.worker_id, "pid": os.getpid(), "expires": time.time() + self.ttl_sec}
+        tmp = self._path(employee_id).with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(lease, f)
+        os.replace(tmp, self._path(employee_id))
+
+    def owner(self, employee_id: str) -> Optional[str]:
+        """Worker id holding a live lease, or None if free/expired."""
+        lease = self._read(employee_id)
+        if lease is None or lease["expires"] < time.time():
+            return None
+        return lease["owner"]
+
+    def try_acquire(self, employee_id: str) -> bool:
+        """Take (or keep) the lease if it is free, expired, or already ours."""
+        with self._lock:
+            if employee_id in self.owned:
+                return True
+        with self._guard():
+            current = self.owner(employee_id)
+            if current is not None and current != self.worker_id:
+                with self._lock:
+                    self.wanted.add(employee_id)
+                return False
+            self._write(employee_id)
+        with self._lock:
+            self.owned.add(employee_id)
+            self.wanted.discard(employee_id)
+        return True
+
+    def release(self, employee_id: str):
+        with self._lock:
+            if employee_id not in self.owned:
+                return
+            self.owned.discard(employee_id)
+        with self._guard():
+            if self.owner(employee_id) == self.worker_id:
+                self._path(employee_id).unlink(missing_ok=True)
+
+    def heartbeat(self):
+        """Renew owned leases, drop ones another worker took, and retry wanted ones."""
+        with self._lock:
+            owned, wanted = list(self.owned), list(self.wanted)
+        lost = []
+        with self._guard():
+            for employee_id in owned:
+                lease = self._read(employee_id)
+                if lease is not None and lease["owner"] != self.worker_id and lease["expires"] >= time.time():
+                    lost.append(employee_id)
+                else:
+                    self._write(employee_id)
+        for employee_id in lost:
+            with self._lock:
+                self.owned.discard(employee_id)
+            if self.on_lost:
+                self.on_lost(employee_id)
+        for employee_id in wanted:
+            if self.try_acquire(employee_id) and self.on_acquired:
+                self.on_acquired(employee_id)
+
+    def _loop(self):
+        while not self._stop.wait(self.ttl_sec / 3):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"⚠️ Lease heartbeat failed: {e}")
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="tracker-leases", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop renewing and hand every lease back so other workers take over immediately."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
+        for employee_id in list(self.owned):
+            self.release(employee_id)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"workerId": self.worker_id, "owned": len(self.owned), "wanted": len(self.wanted)}
@@ -0,0 +1,309 @@
+"""Cursor pagination, date-range slicing and field projection for API responses.
+
+Time-ordered lists (ML points, sessions, window switches) are appended in
+key order, so a page is found by binary search on the sort key instead
+of filtering the whole history. Pages walk backwards from the newest
+item; each page is returned oldest first, like the unpaginated lists.
+
+Cursors are opaque base64url tokens wrapping the sort key of the oldest
+item already returned, so they stay valid while new items are appended.
+Window switches are keyed by switchTime alone, which several switches in
+the same millisecond can share, so their position is (switchTime, k):
+everything before that millisecond plus its first k switches.
+"""
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models import Session, TimeWindowData
+
+# Appended to a date, sorts after that date and before the next one
+_MAX = "\uffff"
+
+
+def ml_point_key(point: TimeWindowData) -> tuple:
+    return (point.date, point.timeWindowStart, point.timestamp)
+
+
+def session_key(session: Session) -> tuple:
+    return (session.date, session.startTime, session.id)
+
+
+def date_bounds(date_from: Optional[str], date_to: Optional[str]) -> Tuple[Optional[tuple], Optional[tuple]]:
+    """[lo, hi) keys selecting every (date, ...) key with date_from <= date <= date_to."""
+    return (date_from,) if date_from else None, (date_to + _MAX,) if date_to else None
+
+
+def date_to_epoch_ms(day: str, end: bool = False) -> int:
+    """UTC midnight of `day` in epoch ms (the following midnight if `end`), like every stored date."""
+    d = date.fromisoformat(day)
+    ts = datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp()
+    return int((ts + 86400 if end else ts) * 1000)
+
+
+def check_dates(*days: Optional[str]):
+    """Raise ValueError unless each given day is YYYY-MM-DD (None is allowed)."""
+    for day in days:
+        if day is not None:
+            try:
+                date.fromisoformat(day)
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid date: {day}")
+
+
+# Element types of each history's cursor position (see ml_point_key, session_key, switch_position)
+_ML_CURSOR = (str, str, int)
+_SESSION_CURSOR = (str, int, str)
+_SWITCH_CURSOR = (int, int)
+
+
+def _is_key(value: Any, types: tuple) -> bool:
+    # bool is an int subclass but never a valid key
+    return (isinstance(value, list) and len(value) == len(types)
+            and all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(value, types)))
+
+
+def check_ml_cursor(position: Any):
+    """Raise ValueError unless `position` is a decoded /ml-data cursor."""
+    if position is not None and not _is_key(position, _ML_CURSOR):
+        raise ValueError("invalid cursor for /ml-data")
+
+
+def check_stats_cursor(position: Any):
+    """Raise ValueError unless `position` is a decoded /stats cursor ({"s", "m", "w"} positions)."""
+    if position is None:
+        return
+    valid = isinstance(position, dict) and set(position) <= {"s", "m", "w"} and \
+        ("s" not in position or _is_key(position["s"], _SESSION_CURSOR)) and \
+        ("m" not in position or _is_key(position["m"], _ML_CURSOR)) and \
+        ("w" not in position or _is_key(position["w"], _SWITCH_CURSOR) or _is_key([position["w"]], (int,)))
+    if not valid:
+        raise ValueError("invalid cursor for /stats")
+
+
+def encode_cursor(value: Any) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    """Inverse of encode_cursor; raises ValueError on a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+def key_range(items: Sequence, key: Callable[[Any], Any], lo=None, hi=None, before=None,
+              limit: Optional[int] = None) -> Tuple[int, int, bool]:
+    """Index range of the newest `limit` items with lo <= key < min(hi, before).
+
+    `items` must already be in key order. Returns (start, end, has_more).
+    O(log n) regardless of history length.
+    """
+    start = bisect_left(items, lo, key=key) if lo is not None else 0
+    end = bisect_left(items, hi, key=key) if hi is not None else len(items)
+    if before is not None:
+        end = min(end, bisect_left(items, before, key=key))
+    end = max(start, end)
+    if limit is None:
+        return start, end, False
+    page_start = max(start, end - max(limit, 0))
+    return page_start, end, page_start > start
+
+
+def key_page(items: Sequence, key: Callable[[Any], Any], lo=None, hi=None, before=None,
+             limit: Optional[int] = None) -> Tuple[List, bool]:
+    """The items selected by key_range, oldest first, plus whether older ones remain."""
+    start, end, has_more = key_range(items, key, lo, hi, before, limit)
+    return list(items[start:end]), has_more
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """"a,b.c" → ["a", "b.c"]; None/empty means everything."""
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
+def _set_path(target: dict, source: dict, path: List[str]):
+    head = path[0]
+    if head not in source:
+        return
+    if len(path) == 1 or not isinstance(source[head], dict):
+        target[head] = source[head]
+        return
+    _set_path(target.setdefault(head, {}), source[head], path[1:])
+
+
+def project(doc: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Keep only the given dotted paths (e.g. "stats.focusScore"); unknown paths are ignored."""
+    if fields is None:
+        return doc
+    out: Dict[str, Any] = {}
+    for field in fields:
+        _set_path(out, doc, field.split("."))
+    return out
+
+
+def model_include(model_cls, fields: Optional[Iterable[str]]) -> Optional[set]:
+    """Map requested names (field names or aliases) to a model_dump include set."""
+    if fields is None:
+        return None
+    by_alias = {info.alias: name for name, info in model_cls.model_fields.items() if info.alias}
+    include = set()
+    for field in fields:
+        if field in model_cls.model_fields:
+            include.add(field)
+        elif field in by_alias:
+            include.add(by_alias[field])
+    return include
+
+
+def switch_position(before) -> Optional[Tuple[int, int]]:
+    """A /stats "w" cursor value as (switchTime, k); a bare switchTime (older cursors) means k = 0."""
+    if before is None:
+        return None
+    if isinstance(before, int):
+        return before, 0
+    return before[0], max(before[1], 0)
+
+
+def switch_dict(row: Tuple[int, str, int]) -> Dict[str, int]:
+    """(switchTime, windowHash, activeDuration) → the WindowSwitch JSON shape."""
+    return {"switchTime": row[0], "windowHash": row[1], "activeDuration": row[2]}
+
+
+class EmployeeHistory:
+    """Paged reads of an already loaded EmployeeData, with the store query signatures.
+
+    Each query returns the newest `limit` matching entries keyed before
+    `before`, oldest first (all of them if `limit` is None).
+    """
+
+    def __init__(self, emp):
+        self.employee = emp
+
+    def query_ml_points(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                        limit: Optional[int] = None, before: Optional[tuple] = None) -> List[TimeWindowData]:
+        lo, hi = date_bounds(date_from, date_to)
+        return key_page(self.employee.mlDataPoints, ml_point_key, lo, hi, before, limit)[0]
+
+    def query_sessions(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       limit: Optional[int] = None, before: Optional[tuple] = None) -> List[Session]:
+        lo, hi = date_bounds(date_from, date_to)
+        return key_page(self.employee.stats.todaySessions, session_key, lo, hi, before, limit)[0]
+
+    def query_switches(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       limit: Optional[int] = None, before: Optional[tuple] = None) -> List[Tuple[int, str, int]]:
+        """(switchTime, windowHash, activeDuration) rows; `before` is a switch_position."""
+        switches = self.employee.windowSwitches
+        times = switches.switch_times
+        start, end, _ = key_range(
+            times, None,
+            date_to_epoch_ms(date_from) if date_from else None,
+            date_to_epoch_ms(date_to, end=True) if date_to else None,
+        )
+        if before is not None:
+            t, k = switch_position(before)
+            end = max(start, min(end, bisect_left(times, t) + k, bisect_right(times, t)))
+        if limit is not None:
+            start = max(start, end - max(limit, 0))
+        return list(switches.rows(start, end))
+
+    def count_switches_at(self, switch_time: int) -> int:
+        times = self.employee.windowSwitches.switch_times
+        return bisect_right(times, switch_time) - bisect_left(times, switch_time)
+
+
+def _newest(query: Callable[..., list], date_from: Optional[str], date_to: Optional[str],
+            limit: Optional[int], before) -> Tuple[list, bool]:
+    """query()'s newest `limit` entries plus whether older ones remain (one extra entry tells)."""
+    if limit is None:
+        return query(date_from, date_to, None, before), False
+    limit = max(limit, 0)
+    items = query(date_from, date_to, limit + 1, before)
+    if len(items) > limit:
+        # An empty page (limit 0) has no position to continue from
+        return items[len(items) - limit:], limit > 0
+    return items, False
+
+
+def _oldest_switch_position(history, rows: List[Tuple[int, str, int]],
+                            before: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """switch_position of rows[0]: how many switches in its millisecond come before it."""
+    t = rows[0][0]
+    on_page = 1
+    while on_page < len(rows) and rows[on_page][0] == t:
+        on_page += 1
+    # The page ends with the last switches at t that sort before `before`
+    ahead = history.count_switches_at(t)
+    if before is not None and before[0] == t:
+        ahead = min(ahead, before[1])
+    return t, ahead - on_page
+
+
+def employee_stats_page(history, fields: Optional[List[str]] = None, date_from: Optional[str] = None,
+                        date_to: Optional[str] = None, limit: Optional[int] = None,
+                        cursor: Optional[dict] = None) -> Dict[str, Any]:
+    """EmployeeData as a dict with its three histories paged and date-filtered.
+
+    `history` is an EmployeeHistory or a store-backed equivalent
+    (persistence.employee_history): `.employee` supplies role and stats and
+    only the requested pages are read. Sessions, ML points and window
+    switches each return their newest `limit` entries. `cursor` holds one
+    position per history ("s", "m", "w"); a history missing from a
+    non-empty cursor was exhausted on an earlier page. Sections not named
+    in `fields` are never serialized.
+    """
+    sections = {f.split(".")[0] for f in fields} if fields is not None else None
+    cursor = cursor or {}
+    next_cursor: Dict[str, Any] = {}
+    emp = history.employee
+
+    def wants(section: str, history_key: str) -> bool:
+        if sections is not None and section not in sections:
+            return False
+        return not cursor or history_key in cursor
+
+    def before(history_key: str):
+        value = cursor.get(history_key)
+        return tuple(value) if isinstance(value, list) else value
+
+    doc: Dict[str, Any] = {"employeeId": emp.employeeId, "role": emp.role}
+
+    if sections is None or "stats" in sections:
+        stats = emp.stats.model_dump(exclude={"todaySessions"})
+        sessions: List[Session] = []
+        if wants("stats", "s") and (fields is None or any(
+                f == "stats" or f.startswith("stats.todaySessions") for f in fields)):
+            sessions, more = _newest(history.query_sessions, date_from, date_to, limit, before("s"))
+            if more:
+                next_cursor["s"] = list(session_key(sessions[0]))
+        stats["todaySessions"] = [s.model_dump() for s in sessions]
+        doc["stats"] = stats
+
+    if sections is None or "mlDataPoints" in sections:
+        points: List[TimeWindowData] = []
+        if wants("mlDataPoints", "m"):
+            points, more = _newest(history.query_ml_points, date_from, date_to, limit, before("m"))
+            if more:
+                next_cursor["m"] = list(ml_point_key(points[0]))
+        doc["mlDataPoints"] = [p.model_dump() for p in points]
+
+    if sections is None or "windowSwitches" in sections:
+        doc["windowSwitches"] = []
+        if wants("windowSwitches", "w"):
+            position = switch_position(before("w"))
+            rows, more = _newest(history.query_switches, date_from, date_to, limit, position)
+            doc["windowSwitches"] = [switch_dict(row) for row in rows]
+            if more:
+                next_cursor["w"] = list(_oldest_switch_position(history, rows, position))
+
+    doc = project(doc, fields)
+    doc["nextCursor"] = encode_cursor(next_cursor) if next_cursor else None
+    return doc
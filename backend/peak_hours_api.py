@@ -1,72 +1,299 @@
 """Peak Hours AI Insights — FastAPI router.
 
-Loads peak_hours.csv at import time, aggregates per-employee
-and team-level focus data, and exposes a single GET endpoint.
+Per-employee hourly focus profiles live in NumPy arrays of shape
+(employees × 24): running sums and sample counts. They are seeded from
+every persisted ML data point plus the per-hour totals retention.py keeps
+for compacted days, then updated as the trackers append new points. peak_hours.csv is only a sample baseline for a store without ML
+data; it is dropped as soon as the first real point arrives, so sample
+employees never skew the team profile. The response is recomputed lazily (only
+when a dirty flag is set) and cached as serialized JSON, so the endpoint
+is a byte copy between changes. `version` counts changes and is the
+response's ETag, so an unchanged dashboard gets a bodiless 304.
+
+Like the rollups, in multi-worker mode the profiles hear other workers'
+points through the shared ML journal and are only rebuilt after the
+follower fell behind (or every PEAK_HOURS_MAX_AGE_SEC seconds if set;
+default: TEAM_AGGREGATE_MAX_AGE_SEC), and the ETag is hashed from the
+body so every worker answers the same data with the same tag.
 """
 
-import csv
 import os
-from collections import defaultdict
-from fastapi import APIRouter
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import APIRouter, Request
+
+import persistence
+from executors import run_aggregate
+from models import TimeWindowData
+from response_cache import versioned_response
+from serialization import dumps
 
 router = APIRouter()
 
 CSV_PATH = os.path.join(os.path.dirname(__file__), "peak_hours.csv")
 
-# ── Load & aggregate on startup ────────────────────────────
+HOURS = 24
+# Peak hours reported per employee and for the team
+TOP_HOURS = 2
+PEAK_HOURS_MAX_AGE_SEC = float(os.environ.get("PEAK_HOURS_MAX_AGE_SEC", str(persistence.TEAM_AGGREGATE_MAX_AGE_SEC)))
 
-_team_hourly: dict[int, float] = {}
-_employees: dict[str, dict] = {}
-_team_peak: list[int] = []
+# Per-hour keys in retention's "ml" DailySummary values: focus sum (0–100 scale) and point count
+_HOUR_FOCUS_KEYS = [f"focusSumH{h:02d}" for h in range(HOURS)]
+_HOUR_COUNT_KEYS = [f"hoursH{h:02d}" for h in range(HOURS)]
+HOURLY_FOCUS_KEYS = frozenset(_HOUR_FOCUS_KEYS + _HOUR_COUNT_KEYS)
 
 
-def _load():
-    global _team_hourly, _employees, _team_peak
+def _hour(point: TimeWindowData) -> int:
+    return int(point.timeWindowStart[:2]) % HOURS
 
-    if not os.path.exists(CSV_PATH):
-        return
 
-    rows: list[dict] = []
-    with open(CSV_PATH, newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
+def add_hourly_focus(values: Dict[str, float], point: TimeWindowData):
+    """Count one ML point into a compacted day's per-hour focus totals."""
+    hour = _hour(point)
+    values[_HOUR_FOCUS_KEYS[hour]] = values.get(_HOUR_FOCUS_KEYS[hour], 0.0) + point.focusScore
+    values[_HOUR_COUNT_KEYS[hour]] = values.get(_HOUR_COUNT_KEYS[hour], 0) + 1
+
+
+def merge_hourly_focus(into: Dict[str, float], values: Dict[str, float]):
+    """Add the per-hour focus totals found in `values` to `into`."""
+    for key, value in values.items():
+        if key in HOURLY_FOCUS_KEYS:
+            into[key] = into.get(key, 0) + value
+
+
+class _Profiles:
+    """(employees × 24) running focus sums and sample counts, one row per employee."""
+
+    def __init__(self, capacity: int = 64):
+        self.index: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.sums = np.zeros((capacity, HOURS), dtype=np.float64)
+        self.counts = np.zeros((capacity, HOURS), dtype=np.int64)
+
+    def row(self, employee_id: str) -> int:
+        row = self.index.get(employee_id)
+        if row is None:
+            row = len(self.ids)
+            if row == self.sums.shape[0]:
+                self.sums = np.vstack([self.sums, np.zeros_like(self.sums)])
+                self.counts = np.vstack([self.counts, np.zeros_like(self.counts)])
+            self.index[employee_id] = row
+            self.ids.append(employee_id)
+        return row
+
+    def add_samples(self, employee_ids, hours: np.ndarray, scores: np.ndarray):
+        """Vectorized bulk add; scores are on the 0–1 scale."""
+        rows = np.fromiter((self.row(e) for e in employee_ids), dtype=np.int64, count=len(hours))
+        np.add.at(self.sums, (rows, hours), scores)
+        np.add.at(self.counts, (rows, hours), 1)
+
+    def same_as(self, other: "_Profiles") -> bool:
+        n = len(self.ids)
+        return (self.ids == other.ids and np.array_equal(self.counts[:n], other.counts[:n])
+                and np.array_equal(self.sums[:n], other.sums[:n]))
+
+    def add_point(self, point: TimeWindowData):
+        """One ML point (focusScore 0–100 → 0–1 like the CSV)."""
+        row = self.row(point.employeeId)
+        hour = _hour(point)
+        self.sums[row, hour] += point.focusScore / 100
+        self.counts[row, hour] += 1
+
+    def add_summary(self, employee_id: str, values: Dict[str, float]):
+        """A retention-compacted day's per-hour totals (see add_hourly_focus)."""
+        hours = [h for h in range(HOURS) if values.get(_HOUR_COUNT_KEYS[h])]
+        if not hours:
+            return  # Compacted before per-hour totals were kept
+        row = self.row(employee_id)
+        for h in hours:
+            self.sums[row, h] += values.get(_HOUR_FOCUS_KEYS[h], 0.0) / 100
+            self.counts[row, h] += int(values[_HOUR_COUNT_KEYS[h]])
+
 
-    by_emp: dict[str, dict[int, float]] = defaultdict(dict)
-    hour_sums: dict[int, list[float]] = defaultdict(list)
+class PeakHoursEngine:
+    """Incremental (employees × 24) focus profiles with lazy recompute."""
 
-    for r in rows:
-        emp = r["employee_id"]
-        hour = int(r["hour"])
-        score = float(r["avg_focus_score"])
-        by_emp[emp][hour] = score
-        hour_sums[hour].append(score)
+    def __init__(self, max_age_sec: float = PEAK_HOURS_MAX_AGE_SEC):
+        self.max_age_sec = max_age_sec
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._profiles = _Profiles()
+        # True while the profiles are only the peak_hours.csv sample baseline
+        self.sample_only = False
+        self.seeded = False
+        self.seeded_at = 0.0
+        self._seeding = False
+        # Points appended while the seed scan runs; applied afterwards if the scan missed them
+        self._pending: List[TimeWindowData] = []
+        # persistence.ml_journal_gaps() at the last seed
+        self._journal_gaps = 0
+        self.version = 0
+        self._dirty = True
+        self._payload: Optional[bytes] = None
 
-    # Team average per hour
-    _team_hourly = {h: round(sum(v) / len(v), 4) for h, v in hour_sums.items()}
+    def fresh(self) -> bool:
+        """True while requests don't need a storage scan."""
+        if not self.seeded or self._journal_gaps != persistence.ml_journal_gaps():
+            return False
+        return not self.max_age_sec or time.monotonic() - self.seeded_at <= self.max_age_sec
 
-    # Top 2 team peak hours
-    sorted_hours = sorted(_team_hourly.items(), key=lambda x: x[1], reverse=True)
-    _team_peak = [h for h, _ in sorted_hours[:2]]
+    def _changed(self):
+        self._dirty = True
+        self.version += 1
 
-    # Per employee peak hours
-    for emp, hours_map in by_emp.items():
-        emp_sorted = sorted(hours_map.items(), key=lambda x: x[1], reverse=True)
-        _employees[emp] = {
-            "peakHours": [h for h, _ in emp_sorted[:2]],
-            "hourlyScores": {h: round(s, 4) for h, s in hours_map.items()},
-        }
+    def add_point(self, point: TimeWindowData):
+        """Fold one new ML point in (persistence listener)."""
+        with self._lock:
+            if self._seeding:
+                self._pending.append(point)
+                return
+            if not self.seeded:
+                return  # The seed scan will read it from storage
+            if self.sample_only:
+                # Real data has arrived: the sample employees would skew the team profile
+                self._profiles = _Profiles()
+                self.sample_only = False
+            self._profiles.add_point(point)
+            self._changed()
 
+    def seed(self):
+        """(Re)build every profile from stored ML points and summaries; peak_hours.csv only if there are none."""
+        with self._seed_lock:
+            if self.fresh():
+                return  # Another request seeded while we waited
+            journal_gaps = persistence.ml_journal_gaps()
+            # Other workers' points journaled so far are in storage: deliver them before the scan
+            persistence.catch_up_ml_journal()
+            with self._lock:
+                self._seeding = True
+            profiles = _Profiles()
+            # Newest timestamp the scan saw per employee
+            seen: Dict[str, int] = {}
+            try:
+                # Days compacted by retention.py, then the raw points still stored
+                for employee_id, summary in persistence.iter_daily_summaries("ml"):
+                    profiles.add_summary(employee_id, summary.values)
+                ids, hours, scores = [], [], []
+                for point in persistence.iter_all_ml_points():
+                    ids.append(point.employeeId)
+                    hours.append(_hour(point))
+                    scores.append(point.focusScore / 100)
+                    if point.timestamp > seen.get(point.employeeId, 0):
+                        seen[point.employeeId] = point.timestamp
+                if ids:
+                    profiles.add_samples(ids, np.array(hours, dtype=np.int64), np.array(scores))
+            except Exception:
+                with self._lock:
+                    # Keep serving the previous profiles plus what arrived meanwhile
+                    if self.seeded and not self.sample_only:
+                        for point in self._pending:
+                            self._profiles.add_point(point)
+                    self._pending.clear()
+                    self._seeding = False
+                raise
+            # Points other workers journaled during the scan land in _pending like local ones
+            persistence.catch_up_ml_journal()
+            with self._lock:
+                # Points appended during the scan that it did not already read
+                pending = [p for p in self._pending if p.timestamp > seen.get(p.employeeId, 0)]
+                self._pending.clear()
+                for point in pending:
+                    profiles.add_point(point)
+                self.sample_only = not profiles.ids and _load_csv(profiles)
+                # A periodic reseed that found nothing new keeps the version (and the ETag)
+                if not (self.seeded and profiles.same_as(self._profiles)):
+                    self._changed()
+                self._profiles = profiles
+                self._seeding = False
+                self.seeded_at = time.monotonic()
+                self.seeded = True
+                self._journal_gaps = journal_gaps
 
-_load()
+    def _recompute(self) -> bytes:
+        profiles = self._profiles
+        n = len(profiles.ids)
+        sums, counts = profiles.sums[:n], profiles.counts[:n]
+        has_data = counts > 0
+        means = np.divide(sums, counts, out=np.zeros_like(sums), where=has_data)
+
+        # Team average per hour over the employees who have data for that hour
+        emp_per_hour = has_data.sum(axis=0)
+        team_means = np.divide(means.sum(axis=0), emp_per_hour, out=np.zeros(HOURS), where=emp_per_hour > 0)
+        team_hours = np.flatnonzero(emp_per_hour)
+        team_rounded = np.round(team_means[team_hours], 4)
+        team_order = team_hours[np.argsort(-team_rounded, kind="stable")]
+
+        # Per-employee top hours: rank hours without data last
+        ranked = np.argsort(np.where(has_data, -np.round(means, 4), np.inf), axis=1, kind="stable")[:, :TOP_HOURS]
+
+        # Plain lists are much faster than per-row NumPy indexing for building the response
+        has_rows = has_data.tolist()
+        score_rows = np.round(means, 4).tolist()
+        employees = {}
+        for employee_id, has, scores, top in zip(profiles.ids, has_rows, score_rows, ranked.tolist()):
+            employees[employee_id] = {
+                "peakHours": [h for h in top if has[h]],
+                "hourlyScores": {h: scores[h] for h in range(HOURS) if has[h]},
+            }
+
+        return dumps({
+            "teamPeakHours": team_order[:TOP_HOURS].tolist(),
+            "teamHourlyScores": dict(zip(team_hours.tolist(), team_rounded.tolist())),
+            "employees": employees,
+        })
+
+    def cached_payload(self) -> Optional[bytes]:
+        """Serialized response if it is up to date, else None (without recomputing)."""
+        with self._lock:
+            return None if self._dirty else self._payload
+
+    def payload(self) -> bytes:
+        """Serialized response, recomputed only if something changed."""
+        with self._lock:
+            if self._dirty or self._payload is None:
+                self._payload = self._recompute()
+                self._dirty = False
+            return self._payload
+
+
+def _load_csv(profiles: _Profiles) -> bool:
+    """Sample profiles from peak_hours.csv (employee_id, hour, avg_focus_score); False if there are none."""
+    if not os.path.exists(CSV_PATH):
+        return False
+    table = np.genfromtxt(CSV_PATH, delimiter=",", names=True, dtype=None, encoding="utf-8")
+    table = np.atleast_1d(table)
+    if not table.size:
+        return False
+    profiles.add_samples(table["employee_id"].tolist(), table["hour"].astype(np.int64) % HOURS,
+                         table["avg_focus_score"].astype(np.float64))
+    return True
+
+
+engine = PeakHoursEngine()
+persistence.add_ml_point_listener(engine.add_point)
 
 
 # ── Endpoint ────────────────────────────────────────────────
 
+def _payload() -> bytes:
+    if not engine.fresh():
+        engine.seed()
+    return engine.payload()
+
+
 @router.get("/api/manager/ai-insights/peak-hours")
-def get_peak_hours():
-    return {
-        "teamPeakHours": _team_peak,
-        "teamHourlyScores": _team_hourly,
-        "employees": _employees,
-    }
+async def get_peak_hours(request: Request):
+    if not engine.fresh():
+        await run_aggregate(engine.seed)
+
+    async def build() -> bytes:
+        # Seeding and recompute are CPU/disk heavy; the cached bytes are not
+        payload = engine.cached_payload()
+        return payload if payload is not None else await run_aggregate(_payload)
+
+    # Worker-local versions differ between processes; a body-hash ETag is the same in every worker
+    version = None if persistence.MULTI_WORKER else engine.version
+    return await versioned_response(request, "peak-hours", "peak-hours", version, build)
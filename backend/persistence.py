@@ -1,65 +1,597 @@
-"""Atomic JSON file persistence — one file per employee."""
+"""Employee persistence with a pluggable storage backend.
 
-import json
+The default backend is atomic JSON files — one per employee. Hourly ML
+data points are appended to a per-employee JSON Lines log
+(data/mllog/{employeeId}.jsonl) instead of rewriting the whole document.
+load_employee merges the log back in, and the log is folded into the
+document on every full save or once it reaches ML_LOG_COMPACT_EVERY lines.
+
+Set STORAGE_BACKEND=sqlite to use the embedded SQLite store instead
+(see sqlite_store.py). Callers only use the module-level functions.
+
+Both backends sit behind an LRU EmployeeCache (EMPLOYEE_CACHE_MB, 0 to
+disable) that flushes saves every CACHE_FLUSH_INTERVAL_SEC seconds.
+
+Every write path takes the employee's lock, and update_employee() runs a
+whole load → mutate → save under it, so concurrent writers to one
+employee can't drop each other's changes while different employees
+proceed in parallel.
+
+MULTI_WORKER=1 is for several API processes sharing DATA_DIR: employee
+locks become file locks, the per-process cache is turned off, and every
+ML append is also written to the shared journal (ml_journal.py), whose
+follower applies other workers' points to the team aggregate and the
+ML point listeners as if they had been appended here. A worker scans
+storage only to seed, or again after its follower fell behind the
+journal. TEAM_AGGREGATE_MAX_AGE_SEC > 0 adds a periodic rescan on top.
+"""
+
+import functools
+import itertools
 import os
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 
-from models import EmployeeData
+from employee_cache import EmployeeCache
+from employee_locks import FileKeyedLocks, KeyedLocks
+from metrics import STORE_BYTES, STORE_LATENCY, register_collector
+from ml_journal import MLJournal
+from models import DailySummary, EmployeeData, Session, TimeWindowData
+from pagination import EmployeeHistory, date_bounds, key_page, ml_point_key
+from serialization import dump_model, load_model, loads
+from team_aggregate import TeamAggregate
 
 DATA_DIR = Path(__file__).parent / "data"
 
+# Fold the append log into the employee document after this many points (~1 week hourly)
+ML_LOG_COMPACT_EVERY = 168
+
+EMPLOYEE_CACHE_MB = float(os.environ.get("EMPLOYEE_CACHE_MB", "64"))
+CACHE_FLUSH_INTERVAL_SEC = float(os.environ.get("CACHE_FLUSH_INTERVAL_SEC", "5"))
+
+# Several processes share DATA_DIR (uvicorn --workers, see ownership.py)
+MULTI_WORKER = os.environ.get("MULTI_WORKER", "0") == "1"
+# Rescan the store for team stats after this long (0 = seed once; other workers' points come from the journal)
+TEAM_AGGREGATE_MAX_AGE_SEC = float(os.environ.get("TEAM_AGGREGATE_MAX_AGE_SEC", "0"))
+
+# Latest-point summary per employee, kept current by save_employee
+team_aggregate = TeamAggregate()
+
+# Called with every newly appended ML point (peak hours, rollups, ...)
+_ml_point_listeners: List[Callable[[TimeWindowData], None]] = []
+
+
+
+def _create_locks(data_dir: Path) -> KeyedLocks:
+    return FileKeyedLocks(Path(data_dir) / "locks") if MULTI_WORKER else KeyedLocks()
+
+
+# One lock per employee, shared by every write path and the cache flush
+employee_locks = _create_locks(DATA_DIR)
+
+T = TypeVar("T")
+
+
+def _filter_ml_points(points: List[TimeWindowData], date_from: Optional[str], date_to: Optional[str],
+                      limit: Optional[int], before: Optional[tuple] = None) -> List[TimeWindowData]:
+    """Binary-search slice of a chronological point list (see pagination.key_page)."""
+    lo, hi = date_bounds(date_from, date_to)
+    page, _ = key_page(points, ml_point_key, lo, hi, before, limit)
+    return page
+
+
+class JsonFileStore:
+    """One JSON document per employee plus an append-only ML point log."""
+
+    name = "json"
+    # Any history read parses the whole document, so page from one load instead
+    indexed_history = False
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        # Per employee: guards log appends against compaction truncating them
+        self._log_locks = KeyedLocks()
+        self._log_lines: Dict[str, int] = {}
+
+    def ensure_data_dir(self):
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_employee_path(self, employee_id: str) -> Path:
+        return self.data_dir / f"{employee_id}.json"
+
+    def get_ml_log_path(self, employee_id: str) -> Path:
+        return self.data_dir / "mllog" / f"{employee_id}.jsonl"
+
+    def _read_ml_log(self, employee_id: str) -> List[TimeWindowData]:
+        """Read appended ML points; a torn last line from a crash is skipped."""
+        path = self.get_ml_log_path(employee_id)
+        points = []
+        if path.exists():
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        points.append(load_model(TimeWindowData, line))
+                    except Exception:
+                        continue
+                STORE_BYTES.labels("read", self.name).inc(f.tell())
+        return points
+
+    def _read_employee_file(self, path: Path) -> EmployeeData:
+        with open(path, "rb") as f:
+            raw = f.read()
+        STORE_BYTES.labels("read", self.name).inc(len(raw))
+        # Bytes → model in one pass; accepts both alias (snake_case) and field names (camelCase)
+        emp = load_model(EmployeeData, raw)
+        emp.mlDataPoints.extend(self._read_ml_log(emp.employeeId))
+        return emp
+
+    def load_employee(self, employee_id: str) -> EmployeeData:
+        """Load employee data from JSON file, or create new if not found."""
+        self.ensure_data_dir()
+        path = self.get_employee_path(employee_id)
+        if path.exists():
+            try:
+                return self._read_employee_file(path)
+            except Exception:
+                pass
+        emp = EmployeeData(employeeId=employee_id)
+        emp.mlDataPoints.extend(self._read_ml_log(employee_id))
+        return emp
+
+    def save_employee(self, data: EmployeeData):
+        """Atomically save employee data — write to temp then rename to prevent corruption.
+
+        The saved document carries every ML point, so the append log is dropped.
+        """
+        self.ensure_data_dir()
+        path = self.get_employee_path(data.employeeId)
+        with self._log_locks.hold(data.employeeId):
+            # Write to temp file first, then atomic rename
+            fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    # Compact, straight from pydantic-core; aliases (snake_case) for ML data fields
+                    payload = dump_model(data, by_alias=True)
+                    f.write(payload)
+                STORE_BYTES.labels("write", self.name).inc(len(payload))
+                os.replace(tmp_path, path)  # Atomic on POSIX and Windows
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            log_path = self.get_ml_log_path(data.employeeId)
+            if log_path.exists():
+                log_path.unlink()
+            self._log_lines[data.employeeId] = 0
+
+    def append_ml_point(self, point: TimeWindowData):
+        """Append one ML data point to the employee's log — O(1), no document rewrite."""
+        self.append_ml_points(point.employeeId, [point])
+
+    def append_ml_points(self, employee_id: str, points: List[TimeWindowData]):
+        """Append a batch of one employee's ML points with a single log write."""
+        log_path = self.get_ml_log_path(employee_id)
+        with self._log_locks.hold(employee_id):
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            if employee_id not in self._log_lines:
+                self._log_lines[employee_id] = len(self._read_ml_log(employee_id))
+            payload = b"".join(dump_model(point, by_alias=True) + b"\n" for point in points)
+            with open(log_path, "ab") as f:
+                f.write(payload)
+            STORE_BYTES.labels("write", self.name).inc(len(payload))
+            self._log_lines[employee_id] += len(points)
+
+            if (self._log_lines[employee_id] >= ML_LOG_COMPACT_EVERY
+                    or not self.get_employee_path(employee_id).exists()):
+                self.compact_ml_log(employee_id)
+
+    def compact_ml_log(self, employee_id: str):
+        """Fold the append log into the employee document."""
+        with self._log_locks.hold(employee_id):
+            self.save_employee(self.load_employee(employee_id))
+
+    def list_all_employees(self) -> list[EmployeeData]:
+        """Load all employee JSON files for manager aggregation."""
+        self.ensure_data_dir()
+        employees = []
+        for path in self.data_dir.glob("*.json"):
+            try:
+                employees.append(self._read_employee_file(path))
+            except Exception:
+                continue
+        return employees
+
+    def list_employee_ids(self) -> List[str]:
+        self.ensure_data_dir()
+        return [path.stem for path in self.data_dir.glob("*.json")]
+
+    def iter_daily_summaries(self, kind: str) -> Iterator[Tuple[str, DailySummary]]:
+        """(employeeId, summary) for every compacted day of the given kind."""
+        self.ensure_data_dir()
+        for path in self.data_dir.glob("*.json"):
+            try:
+                with open(path, "rb") as f:
+                    doc = loads(f.read())
+            except Exception:
+                continue
+            for summary in doc.get("summaries", ()):
+                if summary["kind"] == kind:
+                    yield doc["employeeId"], DailySummary.model_validate(summary)
+
+    def query_ml_points(self, employee_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                        limit: Optional[int] = None, before: Optional[tuple] = None) -> List[TimeWindowData]:
+        """Most recent `limit` ML points in [date_from, date_to] keyed before `before`, oldest first."""
+        emp = self.load_employee(employee_id)
+        return _filter_ml_points(emp.mlDataPoints, date_from, date_to, limit, before)
+
+    def query_sessions(self, employee_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       limit: Optional[int] = None, before: Optional[tuple] = None) -> List[Session]:
+        """Most recent `limit` sessions in [date_from, date_to] keyed before `before`, oldest first."""
+        return EmployeeHistory(self.load_employee(employee_id)).query_sessions(date_from, date_to, limit, before)
+
+    def query_switches(self, employee_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       limit: Optional[int] = None, before: Optional[tuple] = None) -> List[Tuple[int, str, int]]:
+        """Most recent `limit` (switchTime, windowHash, activeDuration) rows, oldest first."""
+        return EmployeeHistory(self.load_employee(employee_id)).query_switches(date_from, date_to, limit, before)
+
+    def count_switches_at(self, employee_id: str, switch_time: int) -> int:
+        return EmployeeHistory(self.load_employee(employee_id)).count_switches_at(switch_time)
+
+    def latest_ml_points(self) -> Dict[str, Optional[TimeWindowData]]:
+        """Each stored employee's most recent ML point (None if they have none)."""
+        return {
+            emp.employeeId: emp.mlDataPoints[-1] if emp.mlDataPoints else None
+            for emp in self.list_all_employees()
+        }
+
+    def iter_all_ml_points(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                           role: Optional[str] = None) -> Iterator[TimeWindowData]:
+        """Every stored ML point matching the filters, one employee at a time."""
+        self.ensure_data_dir()
+        for path in self.data_dir.glob("*.json"):
+            try:
+                emp = self._read_employee_file(path)
+            except Exception:
+                continue
+            for point in _filter_ml_points(emp.mlDataPoints, date_from, date_to, None):
+                if role is None or point.role == role:
+                    yield point
+
+
+def _timed(store, op: str, fn: Callable[..., T], *args) -> T:
+    """Call a store method, recording its latency as signalpulse_store_seconds{op}."""
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        STORE_LATENCY.labels(op, store.name).observe(time.perf_counter() - start)
+
+
+def _create_store(backend: str, data_dir: Path):
+    if backend == "sqlite":
+        from sqlite_store import SQLiteStore
+        return SQLiteStore(Path(data_dir) / "signalpulse.db")
+    return JsonFileStore(data_dir)
+
+
+def _create_cache(store) -> EmployeeCache:
+    # A per-process cache would serve (and flush) stale copies when other workers write
+    cache_mb = 0 if MULTI_WORKER else EMPLOYEE_CACHE_MB
+    return EmployeeCache(int(cache_mb * 1024 * 1024), CACHE_FLUSH_INTERVAL_SEC,
+                         functools.partial(_timed, store, "save", store.save_employee), employee_locks.hold)
+
+
+_store = _create_store(os.environ.get("STORAGE_BACKEND", "json"), DATA_DIR)
+_cache = _create_cache(_store)
+
+
+def configure(backend: str = "json", data_dir: Optional[Path] = None):
+    """Switch storage backend ("json" or "sqlite") and/or data directory."""
+    global _store, _cache, DATA_DIR, team_aggregate, employee_locks
+    _cache.stop()
+    if data_dir is not None:
+        DATA_DIR = Path(data_dir)
+        employee_locks = _create_locks(DATA_DIR)
+    _store = _create_store(backend, DATA_DIR)
+    _cache = _create_cache(_store)
+    team_aggregate = TeamAggregate()
+    _reset_versions()
+
+
+def get_store():
+    return _store
+
+
+def start_background_flush():
+    """Start the write-behind flush timer (call once at app startup)."""
+    _cache.start()
+
+
+def flush():
+    """Write every dirty cached employee now."""
+    _cache.flush()
+
+
+def shutdown():
+    """Flush all pending writes (call at app shutdown)."""
+    _cache.stop()
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
 
-def ensure_data_dir():
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+def _collect_cache_metrics():
+    stats = _cache.stats()
+    yield "signalpulse_cache_hits_total", "counter", "Employee cache hits", [({}, stats["hits"])]
+    yield "signalpulse_cache_misses_total", "counter", "Employee cache misses", [({}, stats["misses"])]
+    yield "signalpulse_cache_hit_ratio", "gauge", "Employee cache hit rate since start", [({}, stats["hitRate"])]
+    yield "signalpulse_cache_evictions_total", "counter", "Employees evicted from the cache", [({}, stats["evictions"])]
+    yield "signalpulse_cache_entries", "gauge", "Employees held in the cache", [({}, stats["entries"])]
+    yield "signalpulse_cache_bytes", "gauge", "Estimated cache size in bytes", [({}, stats["bytes"])]
+    yield "signalpulse_cache_dirty", "gauge", "Cached employees waiting to be flushed", [({}, stats["dirty"])]
 
-def get_employee_path(employee_id: str) -> Path:
-    return DATA_DIR / f"{employee_id}.json"
+
+register_collector(_collect_cache_metrics)
+
+
+# ── Version stamps ──────────────────────────────────────────
+# Every save and ML append moves the employee to a new, never reused
+# stamp (under its lock, after the write is visible). response_cache keys
+# cached bodies and ETags on them. Stamps are per process, so with
+# MULTI_WORKER=1 (other workers write too) employee_version returns None.
+
+_version_lock = threading.Lock()
+_version_counter = itertools.count(1)
+_versions: Dict[str, int] = {}
+_base_version = 0
+
+
+def _bump_version(employee_id: str):
+    with _version_lock:
+        _versions[employee_id] = next(_version_counter)
+
+
+def _reset_versions():
+    global _base_version
+    with _version_lock:
+        _versions.clear()
+        _base_version = next(_version_counter)
+
+
+def employee_version(employee_id: str) -> Optional[int]:
+    """Stamp that changes exactly when the employee's stored data does (None if untrackable)."""
+    if MULTI_WORKER:
+        return None
+    return _versions.get(employee_id, _base_version)
 
 
 def load_employee(employee_id: str) -> EmployeeData:
-    """Load employee data from JSON file, or create new if not found."""
-    ensure_data_dir()
-    path = get_employee_path(employee_id)
-    if path.exists():
-        try:
-            with open(path, "r") as f:
-                data = json.load(f)
-            # parse_obj handles both alias (snake_case) and field names (camelCase)
-            return EmployeeData(**data)
-        except (json.JSONDecodeError, Exception):
-            pass
-    return EmployeeData(employeeId=employee_id)
+    """Load employee data, or create new if not found.
+
+    With the cache on, every caller shares the cached object — mutate it
+    only through update_employee().
+    """
+    if _cache.enabled:
+        emp = _cache.get(employee_id)
+        if emp is None:
+            with employee_locks.hold(employee_id):
+                # Another thread may have loaded it while we waited
+                emp = _cache.get(employee_id)
+                if emp is None:
+                    emp = _timed(_store, "load", _store.load_employee, employee_id)
+                    _cache.put(emp)
+        return emp
+    return _timed(_store, "load", _store.load_employee, employee_id)
 
 
 def save_employee(data: EmployeeData):
-    """Atomically save employee data — write to temp then rename to prevent corruption."""
-    ensure_data_dir()
-    path = get_employee_path(data.employeeId)
-    # Write to temp file first, then atomic rename
-    fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, suffix=".tmp")
-    try:
-        with os.fdopen(fd, "w") as f:
-            # Serialize with aliases (snake_case) for ML data fields
-            json.dump(data.model_dump(by_alias=True), f, indent=2)
-        os.replace(tmp_path, path)  # Atomic on POSIX and Windows
-    except Exception:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        raise
+    """Persist the full employee document (write-behind when the cache is on)."""
+    with employee_locks.hold(data.employeeId):
+        if _cache.enabled:
+            _cache.put(data, dirty=True)
+        else:
+            _timed(_store, "save", _store.save_employee, data)
+        _bump_version(data.employeeId)
+        team_aggregate.record(data.employeeId, data.mlDataPoints[-1] if data.mlDataPoints else None)
+
+
+def update_employee(employee_id: str, mutate: Callable[[EmployeeData], T]) -> T:
+    """Atomic read-modify-write: load, mutate(emp), save — all under the employee's lock.
+
+    Returns whatever mutate returns.
+    """
+    with employee_locks.hold(employee_id):
+        emp = load_employee(employee_id)
+        result = mutate(emp)
+        save_employee(emp)
+        return result
+
+
+def add_ml_point_listener(callback: Callable[[TimeWindowData], None]):
+    """Register a callback for every ML point appended from now on."""
+    _ml_point_listeners.append(callback)
+
+
+def append_ml_point(point: TimeWindowData):
+    """Append one hourly ML data point without rewriting the employee document."""
+    append_ml_points(point.employeeId, [point])
+
+
+def append_ml_points(employee_id: str, points: List[TimeWindowData]):
+    """Append a batch of one employee's ML points in one store write (see ml_sink)."""
+    if not points:
+        return
+    with employee_locks.hold(employee_id):
+        _timed(_store, "append", _store.append_ml_points, employee_id, points)
+        for point in points:
+            _cache.append_ml_point(point)
+        _bump_version(employee_id)
+        team_aggregate.record(employee_id, points[-1])
+        if _journal is not None:
+            try:
+                _journal.append(points)
+            except Exception as e:
+                # Stored all the same; other workers pick the points up at their next rescan
+                print(f"⚠️ ML journal append failed for {employee_id}: {e}")
+    _notify_ml_points(points)
+
+
+def _notify_ml_points(points: List[TimeWindowData]):
+    for point in points:
+        for callback in _ml_point_listeners:
+            try:
+                callback(point)
+            except Exception as e:
+                print(f"⚠️ ML point listener failed: {e}")
 
 
 def list_all_employees() -> list[EmployeeData]:
-    """Load all employee JSON files for manager aggregation."""
-    ensure_data_dir()
-    employees = []
-    for path in DATA_DIR.glob("*.json"):
-        try:
-            with open(path, "r") as f:
-                data = json.load(f)
-            employees.append(EmployeeData(**data))
-        except Exception:
-            continue
-    return employees
+    """Load every stored employee."""
+    _cache.flush()
+    return _timed(_store, "list_all", _store.list_all_employees)
+
+
+def list_employee_ids() -> List[str]:
+    """Ids of every stored employee (without loading them)."""
+    _cache.flush()
+    return _store.list_employee_ids()
+
+
+def iter_daily_summaries(kind: str) -> Iterator[Tuple[str, DailySummary]]:
+    """Stream (employeeId, DailySummary) for every compacted day of `kind` ("ml", "sessions", "switches")."""
+    _cache.flush()
+    return _store.iter_daily_summaries(kind)
+
+
+def query_ml_points(employee_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                    limit: Optional[int] = None, before: Optional[tuple] = None) -> List[TimeWindowData]:
+    """Most recent `limit` ML points for an employee within an optional date range, oldest first.
+
+    `before` is a pagination.ml_point_key; only points sorting strictly before it are returned.
+    """
+    emp = _cache.get(employee_id) if _cache.enabled else None
+    if emp is not None:
+        return _filter_ml_points(emp.mlDataPoints, date_from, date_to, limit, before)
+    return _store.query_ml_points(employee_id, date_from, date_to, limit, before)
+
+
+class StoreHistory:
+    """EmployeeHistory's paged reads served by an indexed store, without loading the document."""
+
+    def __init__(self, store, employee_id: str):
+        self._store = store
+        self._employee_id = employee_id
+        self.employee = _timed(store, "load", store.load_employee_header, employee_id)
+
+    def query_ml_points(self, *args) -> List[TimeWindowData]:
+        return self._store.query_ml_points(self._employee_id, *args)
+
+    def query_sessions(self, *args) -> List[Session]:
+        return self._store.query_sessions(self._employee_id, *args)
+
+    def query_switches(self, *args) -> List[Tuple[int, str, int]]:
+        return self._store.query_switches(self._employee_id, *args)
+
+    def count_switches_at(self, switch_time: int) -> int:
+        return self._store.count_switches_at(self._employee_id, switch_time)
+
+
+def employee_history(employee_id: str):
+    """Paged history reads for /stats (see pagination.employee_stats_page).
+
+    A cached employee is paged in memory; otherwise an indexed store
+    (SQLite) answers each page with a query, so the cost follows the page,
+    not the history. The JSON store parses the document either way, so it
+    is loaded once.
+    """
+    emp = _cache.get(employee_id) if _cache.enabled else None
+    if emp is not None:
+        return EmployeeHistory(emp)
+    if _store.indexed_history:
+        return StoreHistory(_store, employee_id)
+    return EmployeeHistory(load_employee(employee_id))
+
+
+def iter_all_ml_points(date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       role: Optional[str] = None) -> Iterator[TimeWindowData]:
+    """Stream every stored ML point, optionally filtered by date range and role."""
+    _cache.flush()
+    return _store.iter_all_ml_points(date_from, date_to, role)
+
+
+def _team_aggregate_stale(aggregate: TeamAggregate) -> bool:
+    if _team_aggregate_gaps != ml_journal_gaps():
+        return True
+    return bool(TEAM_AGGREGATE_MAX_AGE_SEC) and time.monotonic() - aggregate.seeded_at > TEAM_AGGREGATE_MAX_AGE_SEC
+
+
+def team_aggregate_seeded() -> bool:
+    """True while get_team_aggregate doesn't need a storage scan."""
+    return team_aggregate.seeded and not _team_aggregate_stale(team_aggregate)
+
+
+def get_team_aggregate() -> TeamAggregate:
+    """Team aggregate, seeded from the store's latest points on first use (and when stale)."""
+    global team_aggregate, _team_aggregate_gaps
+    aggregate = team_aggregate
+    if aggregate.seeded and _team_aggregate_stale(aggregate):
+        aggregate = TeamAggregate()
+    if not aggregate.seeded:
+        _team_aggregate_gaps = ml_journal_gaps()
+        # What other workers journaled so far is already in storage; the follower
+        # delivers anything later through record(), newest point last
+        catch_up_ml_journal()
+        _cache.flush()
+        for employee_id, latest in _store.latest_ml_points().items():
+            aggregate.seed(employee_id, latest)
+        aggregate.seeded_at = time.monotonic()
+        aggregate.seeded = True
+        team_aggregate = aggregate
+    return aggregate
+
+
+# ── Shared ML journal (MULTI_WORKER) ────────────────────────
+
+_journal: Optional[MLJournal] = None
+# ml_journal_gaps() when the team aggregate was last seeded
+_team_aggregate_gaps = 0
+
+
+def start_ml_journal(worker_id: str):
+    """Share appended ML points with the other workers and follow theirs (once, at startup)."""
+    global _journal
+    if _journal is None:
+        _journal = MLJournal(DATA_DIR / "journal", worker_id, _apply_journaled_points)
+        _journal.start()
+
+
+def stop_ml_journal():
+    global _journal
+    if _journal is not None:
+        _journal.stop()
+        _journal = None
+
+
+def catch_up_ml_journal():
+    """Apply every point other workers have journaled so far (seed scans call this first)."""
+    if _journal is not None:
+        _journal.poll()
+
+
+def ml_journal_gaps() -> int:
+    """Times the follower fell behind; anything seeded at a lower count must rescan."""
+    return _journal.gaps if _journal is not None else 0
+
+
+def ml_journal_stats() -> Optional[dict]:
+    return _journal.stats() if _journal is not None else None
+
+
+def _apply_journaled_points(employee_id: str, points: List[TimeWindowData]):
+    """Another worker stored these points: update what a local append would, minus the write."""
+    team_aggregate.record(employee_id, points[-1])
+    _notify_ml_points(points)
@@ -0,0 +1,140 @@
+"""Version-stamped response cache with ETag / conditional GET.
+
+Dashboards re-fetch team stats, peak hours and employee stats far more
+often than the data behind them changes. Each of those routes names a
+version stamp that changes exactly when its data does (a TeamAggregate
+or PeakHoursEngine version, persistence.employee_version); the ETag is
+derived from the cache key and that stamp alone. So:
+
+  * If-None-Match with the current ETag → 304 before anything is built;
+  * otherwise the body is served from pre-serialized bytes cached for
+    (key, version), and rebuilt only after the stamp moves on.
+
+A route without a usable stamp (version None, e.g. employee stats with
+MULTI_WORKER=1) is built every time and gets an ETag hashed from its
+body: it still answers 304, but saves only the transfer.
+
+Tuning (environment):
+  RESPONSE_CACHE_ENTRIES  cached bodies kept, least recently used first out (default 1024)
+"""
+
+import hashlib
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response
+
+from metrics import counter
+
+RESPONSE_CACHE_ENTRIES = int(os.environ.get("RESPONSE_CACHE_ENTRIES", "1024"))
+
+# Per process: a restart (or another worker) never reuses an ETag for different data
+_EPOCH = secrets.token_hex(4)
+
+RESPONSES = counter("signalpulse_response_cache_total", "Versioned responses by outcome",
+                    ["route", "outcome"])
+
+
+def etag_for(key: Hashable, version: Hashable) -> str:
+    digest = hashlib.blake2b(repr((key, version)).encode(), digest_size=8).hexdigest()
+    return f'"{_EPOCH}-{digest}"'
+
+
+def _body_etag(body: bytes) -> str:
+    return f'"b-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 §13.1.2): proxies may have added W/
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+class CachedBody:
+    __slots__ = ("version", "etag", "body")
+
+    def __init__(self, version: Hashable, etag: str, body: bytes):
+        self.version = version
+        self.etag = etag
+        self.body = body
+
+
+class ResponseCache:
+    """LRU of serialized bodies, each valid for one (key, version)."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, version: Hashable, body: bytes) -> CachedBody:
+        entry = CachedBody(version, etag_for(key, version), body)
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache()
+
+
+def _headers(etag: str) -> dict:
+    # Clients may keep the body but must revalidate before reusing it.
+    # No Last-Modified: a version stamp has no wall-clock change time that
+    # holds across rebuilds and workers, so only If-None-Match is honored.
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _not_modified(route: str, etag: str) -> Response:
+    RESPONSES.labels(route, "not_modified").inc()
+    return Response(status_code=304, headers=_headers(etag))
+
+
+async def versioned_response(request: Request, route: str, key: Hashable, version: Optional[Hashable],
+                             build: Callable[[], Awaitable[bytes]]) -> Response:
+    """JSON response for `key` at `version`, built by `await build()` only on a cache miss.
+
+    Read the version *before* building: a change that lands mid-build then
+    only costs one extra rebuild instead of pinning stale bytes to the new stamp.
+    """
+    if version is None:
+        body = await build()
+        etag = _body_etag(body)
+        if _matches(request, etag):
+            return _not_modified(route, etag)
+        RESPONSES.labels(route, "uncached").inc()
+        return Response(content=body, media_type="application/json", headers=_headers(etag))
+
+    etag = etag_for(key, version)
+    entry = response_cache.get(key, version)
+    if _matches(request, etag):
+        return _not_modified(route, etag)
+    if entry is None:
+        RESPONSES.labels(route, "miss").inc()
+        entry = response_cache.put(key, version, await build())
+    else:
+        RESPONSES.labels(route, "hit").inc()
+    return Response(content=entry.body, media_type="application/json",
+                    headers=_headers(entry.etag))
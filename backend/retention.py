@@ -0,0 +1,210 @@
+"""Bounded retention: compacts cold history into per-day summaries.
+
+Raw window switches, sessions and hourly ML points older than their
+retention window are removed from the employee document and folded into
+EmployeeData.summaries (one DailySummary per kind and day, plus role for
+ML points). Trimming and summarizing happen in the same save, so a crash
+can't lose or double-count a day. Rollups read the ML summaries, so
+daily/weekly history is kept forever while documents stay bounded; ML
+summaries also keep per-hour focus totals for the peak-hours profiles. Days
+are UTC, like every stored date.
+
+Policies (environment, in days; 0 keeps raw data forever):
+  RETENTION_SWITCH_DAYS    raw window switches (default 14)
+  RETENTION_SESSION_DAYS   raw sessions in stats.todaySessions (default 90)
+  RETENTION_ML_POINT_DAYS  hourly ML data points (default 180)
+  RETENTION_INTERVAL_SEC   seconds between background passes (default 3600, 0 = off)
+
+Run one pass by hand with:
+
+    python retention.py
+"""
+
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import persistence
+from metrics import counter, histogram
+from models import DailySummary, EmployeeData
+from pagination import date_to_epoch_ms, ml_point_key, session_key
+from peak_hours_api import add_hourly_focus, merge_hourly_focus
+from rollups import RollupBucket
+
+RETENTION_SWITCH_DAYS = int(os.environ.get("RETENTION_SWITCH_DAYS", "14"))
+RETENTION_SESSION_DAYS = int(os.environ.get("RETENTION_SESSION_DAYS", "90"))
+RETENTION_ML_POINT_DAYS = int(os.environ.get("RETENTION_ML_POINT_DAYS", "180"))
+RETENTION_INTERVAL_SEC = float(os.environ.get("RETENTION_INTERVAL_SEC", "3600"))
+
+COMPACTED = counter("signalpulse_retention_compacted_total", "Raw history entries folded into daily summaries",
+                    ["kind"])
+RUN_DURATION = histogram("signalpulse_retention_run_seconds", "Duration of one retention pass over all employees",
+                         buckets=(0.1, 1.0, 10.0, 60.0, 300.0, 1800.0))
+
+
+class RetentionPolicy:
+    """How many days of each raw history to keep (0 = forever)."""
+
+    def __init__(self, switch_days: int = RETENTION_SWITCH_DAYS, session_days: int = RETENTION_SESSION_DAYS,
+                 ml_point_days: int = RETENTION_ML_POINT_DAYS):
+        self.switch_days = switch_days
+        self.session_days = session_days
+        self.ml_point_days = ml_point_days
+
+    @staticmethod
+    def cutoff(days: int, today: date) -> Optional[str]:
+        """First day still kept raw (YYYY-MM-DD), or None to keep everything."""
+        return (today - timedelta(days=days)).isoformat() if days > 0 else None
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _bisect_cold(items, key, cutoff: str) -> int:
+    """Number of leading items whose key sorts before the cutoff day."""
+    lo, hi = 0, len(items)
+    target = (cutoff,)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key(items[mid]) < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def compact_employee(emp: EmployeeData, policy: RetentionPolicy, today: Optional[date] = None) -> Dict[str, int]:
+    """Fold history older than the policy into emp.summaries; returns entries compacted per kind."""
+    today = today or utc_today()
+    summaries: Dict[Tuple[str, str, str], DailySummary] = {(s.kind, s.date, s.role): s for s in emp.summaries}
+
+    def summary(kind: str, day: str, role: str = "") -> DailySummary:
+        s = summaries.get((kind, day, role))
+        if s is None:
+            s = summaries[(kind, day, role)] = DailySummary(kind=kind, date=day, role=role)
+        return s
+
+    compacted = {"ml": 0, "sessions": 0, "switches": 0}
+
+    cutoff = RetentionPolicy.cutoff(policy.ml_point_days, today)
+    if cutoff:
+        n = _bisect_cold(emp.mlDataPoints, ml_point_key, cutoff)
+        buckets: Dict[Tuple[str, str], RollupBucket] = {}
+        hourly: Dict[Tuple[str, str], Dict[str, float]] = {}
+        for point in emp.mlDataPoints[:n]:
+            buckets.setdefault((point.date, point.role), RollupBucket()).add(point)
+            add_hourly_focus(hourly.setdefault((point.date, point.role), {}), point)
+        for (day, role), bucket in buckets.items():
+            s = summary("ml", day, role)
+            merged = RollupBucket()
+            merged.add_values(s.values)
+            merged.add_values(bucket.values())
+            values = merged.values()
+            merge_hourly_focus(values, s.values)
+            merge_hourly_focus(values, hourly[(day, role)])
+            s.values = values
+        del emp.mlDataPoints[:n]
+        compacted["ml"] = n
+
+    cutoff = RetentionPolicy.cutoff(policy.session_days, today)
+    if cutoff:
+        sessions = emp.stats.todaySessions
+        n = _bisect_cold(sessions, session_key, cutoff)
+        for session in sessions[:n]:
+            values = summary("sessions", session.date).values
+            values["count"] = values.get("count", 0) + 1
+            values[session.category] = values.get(session.category, 0) + session.duration
+        del sessions[:n]
+        compacted["sessions"] = n
+
+    cutoff = RetentionPolicy.cutoff(policy.switch_days, today)
+    if cutoff:
+        log = emp.windowSwitches
+        cutoff_ms = date_to_epoch_ms(cutoff)
+        n = _bisect_cold(log.switch_times, lambda t: (t,), cutoff_ms)
+        windows: Dict[str, set] = {}
+        for switch_time, window_hash, duration in log.rows(0, n):
+            day = datetime.fromtimestamp(switch_time / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+            values = summary("switches", day).values
+            values["count"] = values.get("count", 0) + 1
+            values["activeMs"] = values.get("activeMs", 0) + duration
+            windows.setdefault(day, set()).add(window_hash)
+        for day, hashes in windows.items():
+            values = summary("switches", day).values
+            # Distinct windows seen in this compaction; a day compacted twice keeps the larger count
+            values["uniqueWindows"] = max(values.get("uniqueWindows", 0), len(hashes))
+        log.drop_first(n)
+        compacted["switches"] = n
+
+    if any(compacted.values()):
+        emp.summaries = sorted(summaries.values(), key=lambda s: (s.kind, s.date, s.role))
+    return compacted
+
+
+def compact_all(policy: Optional[RetentionPolicy] = None, today: Optional[date] = None) -> Dict[str, int]:
+    """One pass over every stored employee; only employees with cold data are rewritten."""
+    policy = policy or RetentionPolicy()
+    start = time.perf_counter()
+    totals = {"employees": 0, "ml": 0, "sessions": 0, "switches": 0}
+    for employee_id in persistence.list_employee_ids():
+        try:
+            with persistence.employee_locks.hold(employee_id):
+                emp = persistence.load_employee(employee_id)
+                compacted = compact_employee(emp, policy, today)
+                if any(compacted.values()):
+                    persistence.save_employee(emp)
+        except Exception as e:
+            print(f"⚠️ Retention failed for {employee_id}: {e}")
+            continue
+        if any(compacted.values()):
+            totals["employees"] += 1
+            for kind, n in compacted.items():
+                totals[kind] += n
+                COMPACTED.labels(kind).inc(n)
+    RUN_DURATION.observe(time.perf_counter() - start)
+    return totals
+
+
+class RetentionJob:
+    """Background thread running compact_all every interval_sec."""
+
+    def __init__(self, policy: Optional[RetentionPolicy] = None, interval_sec: float = RETENTION_INTERVAL_SEC):
+        self.policy = policy or RetentionPolicy()
+        self.interval_sec = interval_sec
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            try:
+                totals = compact_all(self.policy)
+                if totals["employees"]:
+                    print(f"🧹 Retention: compacted {totals['employees']} employees "
+                          f"({totals['ml']} ML points, {totals['sessions']} sessions, "
+                          f"{totals['switches']} switches)")
+            except Exception as e:
+                print(f"⚠️ Retention pass failed: {e}")
+
+    def start(self):
+        if self._thread or self.interval_sec <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+if __name__ == "__main__":
+    persistence.configure(os.environ.get("STORAGE_BACKEND", "json"))
+    totals = compact_all()
+    persistence.shutdown()
+    print(f"✅ Compacted {totals['employees']} employees: {totals['ml']} ML points, "
+          f"{totals['sessions']} sessions, {totals['switches']} switches")
@@ -0,0 +1,300 @@
+"""Materialized daily and weekly rollups of hourly TimeWindowData.
+
+Per employee and per role, each day and each ISO week (keyed by its
+Monday) keeps running sums — hours, active/idle seconds, switches, focus
+and fragmentation — plus the longest active stretch. The view is seeded
+by one streaming scan of storage and then updated in O(1) from every new
+ML point, so a year-long dashboard reads ~52 weekly rows instead of
+~8,760 hourly points. Days whose hourly points were compacted away by
+retention.py are seeded from their stored daily summaries.
+
+In multi-worker mode other workers' points arrive through the shared ML
+journal (ml_journal.py) like local ones; the rollups are only rebuilt if
+this worker's follower fell behind the journal, or every
+ROLLUP_MAX_AGE_SEC seconds if set (default: TEAM_AGGREGATE_MAX_AGE_SEC, 0).
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+
+import persistence
+from executors import run_aggregate
+from models import TimeWindowData
+
+router = APIRouter()
+
+PERIODS = ("day", "week")
+ROLLUP_MAX_AGE_SEC = float(os.environ.get("ROLLUP_MAX_AGE_SEC", str(persistence.TEAM_AGGREGATE_MAX_AGE_SEC)))
+
+
+def period_start(day: str, period: str) -> str:
+    """The day itself, or the Monday of its ISO week (both YYYY-MM-DD)."""
+    if period == "day":
+        return day
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+class RollupBucket:
+    """Running totals for one (scope, key, period) row."""
+
+    __slots__ = ("hours", "active_seconds", "idle_seconds", "window_switches", "longest_active_seconds",
+                 "focus_sum", "fragmentation_sum", "task_completed_hours")
+
+    def __init__(self):
+        self.hours = 0
+        self.active_seconds = 0
+        self.idle_seconds = 0
+        self.window_switches = 0
+        self.longest_active_seconds = 0
+        self.focus_sum = 0.0
+        self.fragmentation_sum = 0.0
+        self.task_completed_hours = 0
+
+    def add(self, point: TimeWindowData):
+        self.hours += 1
+        self.active_seconds += point.activeSeconds
+        self.idle_seconds += point.idleSeconds
+        self.window_switches += point.windowSwitchCount
+        self.longest_active_seconds = max(self.longest_active_seconds, point.longestContinuousActiveSeconds)
+        self.focus_sum += point.focusScore
+        self.fragmentation_sum += point.fragmentationScore
+        self.task_completed_hours += point.taskCompleted
+
+    def add_values(self, values: dict):
+        """Fold in totals saved by values() (a retention-compacted day)."""
+        self.hours += int(values.get("hours", 0))
+        self.active_seconds += int(values.get("activeSeconds", 0))
+        self.idle_seconds += int(values.get("idleSeconds", 0))
+        self.window_switches += int(values.get("windowSwitchCount", 0))
+        self.longest_active_seconds = max(self.longest_active_seconds,
+                                          int(values.get("longestContinuousActiveSeconds", 0)))
+        self.focus_sum += values.get("focusSum", 0.0)
+        self.fragmentation_sum += values.get("fragmentationSum", 0.0)
+        self.task_completed_hours += int(values.get("taskCompletedHours", 0))
+
+    def values(self) -> dict:
+        """Raw running totals (what DailySummary stores for compacted ML points)."""
+        return {
+            "hours": self.hours,
+            "activeSeconds": self.active_seconds,
+            "idleSeconds": self.idle_seconds,
+            "windowSwitchCount": self.window_switches,
+            "longestContinuousActiveSeconds": self.longest_active_seconds,
+            "focusSum": self.focus_sum,
+            "fragmentationSum": self.fragmentation_sum,
+            "taskCompletedHours": self.task_completed_hours,
+        }
+
+    def as_dict(self, start: str) -> dict:
+        return {
+            "periodStart": start,
+            "hours": self.hours,
+            "activeSeconds": self.active_seconds,
+            "idleSeconds": self.idle_seconds,
+            "windowSwitchCount": self.window_switches,
+            "longestContinuousActiveSeconds": self.longest_active_seconds,
+            "meanFocusScore": round(self.focus_sum / self.hours, 1) if self.hours else 0.0,
+            "meanFragmentationScore": round(self.fragmentation_sum / self.hours, 1) if self.hours else 0.0,
+            "taskCompletedHours": self.task_completed_hours,
+        }
+
+
+class _Series:
+    """Buckets of one key and period, with period starts kept sorted for range reads."""
+
+    __slots__ = ("starts", "buckets")
+
+    def __init__(self):
+        self.starts: List[str] = []
+        self.buckets: Dict[str, RollupBucket] = {}
+
+    def bucket(self, start: str) -> RollupBucket:
+        b = self.buckets.get(start)
+        if b is None:
+            b = self.buckets[start] = RollupBucket()
+            if not self.starts or start > self.starts[-1]:
+                self.starts.append(start)  # The usual case: a new day/week
+            else:
+                insort(self.starts, start)
+        return b
+
+    def rows(self, first: Optional[str], last: Optional[str]) -> List[dict]:
+        lo = bisect_left(self.starts, first) if first else 0
+        hi = bisect_right(self.starts, last) if last else len(self.starts)
+        return [self.buckets[s].as_dict(s) for s in self.starts[lo:hi]]
+
+
+class RollupEngine:
+    """Daily/weekly rollups per employee and per role, maintained incrementally."""
+
+    def __init__(self, max_age_sec: float = ROLLUP_MAX_AGE_SEC):
+        self.max_age_sec = max_age_sec
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        # (scope, key, period) → series; scope is "employee" or "role"
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self.seeded = False
+        self.seeded_at = 0.0
+        self._seeding = False
+        # Points appended while the seed scan runs; applied afterwards if the scan missed them
+        self._pending: List[TimeWindowData] = []
+        # persistence.ml_journal_gaps() at the last seed
+        self._journal_gaps = 0
+
+    def fresh(self) -> bool:
+        """True while queries don't need a storage scan."""
+        if not self.seeded or self._journal_gaps != persistence.ml_journal_gaps():
+            return False
+        return not self.max_age_sec or time.monotonic() - self.seeded_at <= self.max_age_sec
+
+    def _buckets(self, series_map: Dict[Tuple[str, str, str], _Series], employee_id: str, role: str,
+                 day: str) -> Iterator[RollupBucket]:
+        for period in PERIODS:
+            start = period_start(day, period)
+            for scope, key in (("employee", employee_id), ("role", role)):
+                series = series_map.get((scope, key, period))
+                if series is None:
+                    series = series_map[(scope, key, period)] = _Series()
+                yield series.bucket(start)
+
+    def _add(self, series_map: Dict[Tuple[str, str, str], _Series], point: TimeWindowData):
+        for bucket in self._buckets(series_map, point.employeeId, point.role, point.date):
+            bucket.add(point)
+
+    def add_point(self, point: TimeWindowData):
+        """Fold in one new hourly point (persistence listener)."""
+        with self._lock:
+            if self._seeding:
+                self._pending.append(point)
+            elif self.seeded:
+                self._add(self._series, point)
+            # Before the first seed, the scan will read it from storage
+
+    def seed(self):
+        """(Re)build every rollup with one streaming scan of stored ML points."""
+        with self._seed_lock:
+            if self.fresh():
+                return  # Another request seeded while we waited
+            journal_gaps = persistence.ml_journal_gaps()
+            # Other workers' points journaled so far are in storage: deliver them before the scan
+            persistence.catch_up_ml_journal()
+            with self._lock:
+                self._seeding = True
+            series_map: Dict[Tuple[str, str, str], _Series] = {}
+            # Newest timestamp the scan saw per employee
+            seen: Dict[str, int] = {}
+            try:
+                # Days compacted by retention.py, then the raw points still stored
+                for employee_id, summary in persistence.iter_daily_summaries("ml"):
+                    for bucket in self._buckets(series_map, employee_id, summary.role, summary.date):
+                        bucket.add_values(summary.values)
+                for point in persistence.iter_all_ml_points():
+                    self._add(series_map, point)
+                    if point.timestamp > seen.get(point.employeeId, 0):
+                        seen[point.employeeId] = point.timestamp
+            except Exception:
+                with self._lock:
+                    # Keep serving the previous rollups plus what arrived meanwhile
+                    if self.seeded:
+                        for point in self._pending:
+                            self._add(self._series, point)
+                    self._pending.clear()
+                    self._seeding = False
+                raise
+            # Points other workers journaled during the scan land in _pending like local ones
+            persistence.catch_up_ml_journal()
+            with self._lock:
+                # Points appended during the scan that it did not already read
+                for point in self._pending:
+                    if point.timestamp > seen.get(point.employeeId, 0):
+                        self._add(series_map, point)
+                self._pending.clear()
+                self._series = series_map
+                self._seeding = False
+                self.seeded_at = time.monotonic()
+                self.seeded = True
+                self._journal_gaps = journal_gaps
+
+    def rows(self, scope: str, key: str, period: str, date_from: Optional[str] = None,
+             date_to: Optional[str] = None) -> List[dict]:
+        """Rows whose period overlaps [date_from, date_to], oldest first."""
+        first = period_start(date_from, period) if date_from else None
+        with self._lock:
+            series = self._series.get((scope, key, period))
+            return series.rows(first, date_to) if series else []
+
+    def roles(self) -> List[str]:
+        with self._lock:
+            return sorted({key for scope, key, period in self._series if scope == "role"})
+
+
+engine = RollupEngine()
+persistence.add_ml_point_listener(engine.add_point)
+
+
+def employee_rollups(employee_id: str, period: str, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> List[dict]:
+    if not engine.fresh():
+        engine.seed()
+    return engine.rows("employee", employee_id, period, date_from, date_to)
+
+
+def role_rollups(period: str, role: Optional[str] = None, date_from: Optional[str] = None,
+                 date_to: Optional[str] = None) -> Dict[str, List[dict]]:
+    if not engine.fresh():
+        engine.seed()
+    roles = [role] if role else engine.roles()
+    return {r: engine.rows("role", r, period, date_from, date_to) for r in roles}
+
+
+# ── Endpoints ───────────────────────────────────────────────
+
+def _check_query(period: str, date_from: Optional[str], date_to: Optional[str]):
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail="period must be 'day' or 'week'")
+    for value in (date_from, date_to):
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"invalid date: {value}")
+
+
+@router.get("/api/employee/{employee_id}/rollups")
+async def get_employee_rollups(
+    employee_id: str,
+    period: str = "day",
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    """Daily or weekly (ISO week, keyed by Monday) summaries of one employee's hourly ML data."""
+    _check_query(period, date_from, date_to)
+    # Only a (re)seed scans storage; reading materialized rows is cheap
+    if engine.fresh():
+        rows = employee_rollups(employee_id, period, date_from, date_to)
+    else:
+        rows = await run_aggregate(employee_rollups, employee_id, period, date_from, date_to)
+    return {"employeeId": employee_id, "period": period, "rows": rows}
+
+
+@router.get("/api/manager/rollups/roles")
+async def get_role_rollups(
+    period: str = "week",
+    role: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    """Daily or weekly summaries per role (all roles unless `role` is given)."""
+    _check_query(period, date_from, date_to)
+    if engine.fresh():
+        roles = role_rollups(period, role, date_from, date_to)
+    else:
+        roles = await run_aggregate(role_rollups, period, role, date_from, date_to)
+    return {"period": period, "roles": roles}
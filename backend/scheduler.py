@@ -0,0 +1,189 @@
+"""Shared event loop that drives every WindowTracker.
+
+All trackers on this host observe the same desktop, so one scheduler
+thread turns active-window changes into events for every registered
+tracker and fires their deadlines (idle timeout, aggregation, midnight)
+from one TimerWheel. Between those it sleeps:
+
+  * event-driven sources (XlibWindowSource) push changes, so with nothing
+    changing and no deadline due the thread just waits;
+  * polling sources (PollingWindowSource, FakeWindowSource) are probed
+    once per tick, but trackers only hear about actual changes.
+
+Each change is stamped when it is observed and each deadline fires with
+its own time, so session, active and idle durations are exact instead of
+rounded to tick boundaries. Thread and subprocess count stay flat no
+matter how many employees are tracked.
+
+Tuning (environment):
+  TRACKER_TICK_SEC         seconds between probes of a polling source (default 1)
+  TRACKER_TICK_JITTER_SEC  random +/- offset added to each probe (default 0)
+  TRACKER_WORKERS          worker threads to fan events out to (default 0 = inline)
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from metrics import SCHEDULER_WAKEUPS, TICK_DRIFT, TICK_DURATION, TICKS_SKIPPED, WINDOW_PROBE
+from timer_wheel import Timer, TimerWheel
+from window_sources import WindowSource
+
+TICK_SEC = float(os.environ.get("TRACKER_TICK_SEC", "1"))
+TICK_JITTER_SEC = float(os.environ.get("TRACKER_TICK_JITTER_SEC", "0"))
+TRACKER_WORKERS = int(os.environ.get("TRACKER_WORKERS", "0"))
+
+
+class SamplingScheduler:
+    """One loop: window-change events and timer-wheel deadlines, fanned out to all trackers."""
+
+    def __init__(self, source: WindowSource, tick_sec: float = TICK_SEC,
+                 jitter_sec: float = TICK_JITTER_SEC, workers: int = TRACKER_WORKERS,
+                 clock: Callable[[], float] = time.time):
+        self.source = source
+        self.tick_sec = tick_sec
+        self.jitter_sec = min(jitter_sec, tick_sec / 2)
+        self.workers = workers
+        self.clock = clock
+        self.wheel = TimerWheel(now=clock())
+        self._trackers: List = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+        # (observed_at, title) changes not yet delivered; the condition wakes the loop
+        self._events: deque = deque()
+        self._wakeup = threading.Condition()
+        self._probe_latency = WINDOW_PROBE.labels(type(source).__name__)
+        source.subscribe(self._on_title_change)
+
+    def register(self, tracker):
+        with self._lock:
+            if tracker not in self._trackers:
+                self._trackers.append(tracker)
+        self.start()
+
+    def unregister(self, tracker):
+        with self._lock:
+            if tracker in self._trackers:
+                self._trackers.remove(tracker)
+
+    @property
+    def tracker_count(self) -> int:
+        return len(self._trackers)
+
+    def call_at(self, deadline: float, callback: Callable[[float], None]) -> Timer:
+        """Run callback(deadline) on the scheduler thread at `deadline` (clock() seconds)."""
+        timer = self.wheel.schedule(deadline, callback)
+        self._wake()
+        return timer
+
+    def cancel(self, timer: Optional[Timer]):
+        if timer is not None:
+            self.wheel.cancel(timer)
+
+    def _wake(self):
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def _on_title_change(self, title: Optional[str]):
+        with self._wakeup:
+            self._events.append((self.clock(), title))
+            self._wakeup.notify()
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            if self.workers > 0 and self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tracker")
+            self._thread = threading.Thread(target=self._loop, name="sampling-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
+        if self._pool:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def probe(self):
+        """Read a polling source once; a changed title is queued as an event."""
+        probe_start = time.perf_counter()
+        self.source.current()
+        self._probe_latency.observe(time.perf_counter() - probe_start)
+
+    def dispatch(self):
+        """Deliver queued window changes and due deadlines in time order."""
+        with self._wakeup:
+            events = list(self._events)
+            self._events.clear()
+        due = self.wheel.expire(self.clock())
+        with self._lock:
+            trackers = list(self._trackers)
+        # Events sort before deadlines at the same instant: a window seen exactly at the idle timeout is not idle
+        items = [(at, 0, title) for at, title in events] + [(timer.deadline, 1, timer) for timer in due]
+        items.sort(key=lambda item: item[:2])
+        for at, kind, payload in items:
+            if kind == 1:
+                if not payload.cancelled:
+                    _safe_call(payload.callback, at)
+            elif self._pool:
+                list(self._pool.map(lambda t: _safe_call(t.on_window, at, payload), trackers))
+            else:
+                for tracker in trackers:
+                    _safe_call(tracker.on_window, at, payload)
+
+    def tick(self):
+        """Probe (polling sources) and dispatch once — what the loop does on each wake-up."""
+        if self.source.polls and self._trackers:
+            self.probe()
+        self.dispatch()
+
+    def _loop(self):
+        """Sleep until the next probe slot, deadline or pushed event; late probes are skipped, not bunched."""
+        next_probe = time.monotonic()
+        jitter = 0.0
+        while not self._stop.is_set():
+            start = time.monotonic()
+            SCHEDULER_WAKEUPS.inc()
+            if self.source.polls and start >= next_probe + jitter:
+                TICK_DRIFT.observe(max(0.0, start - next_probe - jitter))
+                if self._trackers:
+                    self.probe()
+                next_probe += self.tick_sec
+                now = time.monotonic()
+                if next_probe < now:
+                    # Overran: probe once more now (on the latest missed slot) and drop the slots before it
+                    missed = int((now - next_probe) // self.tick_sec)
+                    if missed:
+                        TICKS_SKIPPED.inc(missed)
+                    next_probe += missed * self.tick_sec
+                if self.jitter_sec:
+                    jitter = random.uniform(-self.jitter_sec, self.jitter_sec)
+            self.dispatch()
+            TICK_DURATION.observe(time.monotonic() - start)
+
+            timeout = max(0.0, next_probe + jitter - time.monotonic()) if self.source.polls else None
+            deadline = self.wheel.next_deadline()
+            if deadline is not None:
+                until_deadline = max(0.0, deadline - self.clock())
+                timeout = until_deadline if timeout is None else min(timeout, until_deadline)
+            with self._wakeup:
+                if not self._events and not self._stop.is_set():
+                    self._wakeup.wait(timeout)
+
+
+def _safe_call(callback, *args):
+    try:
+        callback(*args)
+    except Exception:
+        pass  # Never crash the scheduler
@@ -0,0 +1,53 @@
+"""Compact JSON encoding shared by storage, SSE and HTTP responses.
+
+Models are written straight to bytes by their pydantic-core serializer,
+skipping the intermediate dict tree and str, and read back with orjson +
+model_validate (model_validate_json without orjson). Plain data is
+encoded with orjson when it is installed and falls back to compact
+stdlib json otherwise; both produce the same documents.
+"""
+
+import json
+from typing import Any, Type, TypeVar
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes; non-string dict keys are stringified like json.dumps."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(raw: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dump_model(model: BaseModel, by_alias: bool = False) -> bytes:
+    return model.__pydantic_serializer__.to_json(model, by_alias=by_alias)
+
+
+def load_model(cls: Type[M], raw: bytes | str) -> M:
+    # orjson's parser + Python-mode validation measures faster than
+    # model_validate_json on large documents (see bench/serialization.py)
+    if orjson is not None:
+        return cls.model_validate(orjson.loads(raw))
+    return cls.model_validate_json(raw)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: renders with dumps() (orjson when available)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,117 @@
+"""Bulk session ingestion.
+
+The browser extension uploads sessions in bursts. A batch is categorized
+in one categorize_many pass, folded into Stats with one NumPy pass
+(per-category totals, deep-work counts, a single focus-score update) and
+saved with one update_employee write. Session ids are derived from the
+session itself (models.session_id), so a retried upload is a no-op
+instead of a duplicate. Days already compacted by retention.py no longer
+have their session ids, so a session dated on such a day can't be told
+apart from a retry: it is not stored, and reported as `compacted`
+(separately from duplicates) so a genuinely late upload isn't lost
+silently. The day's totals are final once it has a summary.
+
+stats.todaySessions stays sorted by pagination.session_key, which the
+/stats cursor pages rely on.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from categorizer import categorize_many
+from metrics import counter
+from models import EmployeeData, Session, SessionInput, Stats, session_id
+from pagination import session_key
+from persistence import update_employee
+
+# Largest batch accepted by one request
+SESSION_BATCH_MAX = 10_000
+# Work sessions longer than this count as deep work (same rule as EmployeeData.add_session)
+DEEP_WORK_MS = 25 * 60 * 1000
+
+_CATEGORIES = ("work", "distraction", "communication")
+
+LATE_SESSIONS = counter("signalpulse_sessions_compacted_total",
+                        "Uploaded sessions not stored because their day was already compacted")
+
+
+def build_sessions(inputs: List[SessionInput]) -> List[Session]:
+    """Sessions with derived categories, dates and deterministic ids."""
+    missing = [s.domain for s in inputs if not s.category]
+    derived = iter(categorize_many(missing))
+    sessions = []
+    for s in inputs:
+        category = s.category or next(derived)
+        day = s.date or datetime.fromtimestamp(s.startTime / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+        sessions.append(Session(
+            category=category, date=day, domain=s.domain, duration=s.endTime - s.startTime,
+            startTime=s.startTime, endTime=s.endTime, timestamp=s.endTime,
+            id=session_id(s.domain, s.startTime, s.endTime),
+        ))
+    return sessions
+
+
+def fold_into_stats(stats: Stats, sessions: List[Session]):
+    """Apply EmployeeData.add_session's bookkeeping for a whole batch at once."""
+    if not sessions:
+        return
+    durations = np.fromiter((s.duration for s in sessions), dtype=np.int64, count=len(sessions))
+    codes = np.fromiter(
+        (_CATEGORIES.index(s.category) if s.category in _CATEGORIES else len(_CATEGORIES) for s in sessions),
+        dtype=np.int64, count=len(sessions),
+    )
+    per_category = np.bincount(codes, weights=durations, minlength=len(_CATEGORIES) + 1).astype(np.int64)
+    deep = (codes == 0) & (durations > DEEP_WORK_MS)
+
+    stats.totalTime += int(durations.sum())
+    stats.switches += len(sessions)
+    stats.workTime += int(per_category[0])
+    stats.distractionTime += int(per_category[1])
+    stats.communicationTime += int(per_category[2])
+    stats.deepWorkTime += int(durations[deep].sum())
+    stats.deepWorkSessions += int(deep.sum())
+    if stats.totalTime > 0:
+        stats.focusScore = round((stats.workTime + stats.deepWorkTime) / stats.totalTime * 100)
+
+
+def merge_sessions(emp: EmployeeData, sessions: List[Session]) -> Tuple[int, int]:
+    """Add sessions not already stored (by id), keeping todaySessions sorted.
+
+    Returns (added, compacted): how many were new, and how many were
+    turned away because retention already compacted their day.
+    """
+    history = emp.stats.todaySessions
+    seen = {s.id for s in history}
+    compacted_days = {summary.date for summary in emp.summaries if summary.kind == "sessions"}
+    new = []
+    compacted = 0
+    for s in sessions:
+        if s.id in seen:
+            continue
+        seen.add(s.id)
+        if s.date in compacted_days:
+            compacted += 1
+        else:
+            new.append(s)
+    if not new:
+        return 0, compacted
+    new.sort(key=session_key)
+    in_order = not history or session_key(history[-1]) <= session_key(new[0])
+    history.extend(new)
+    if not in_order:
+        # Two sorted runs: Timsort merges them in linear time
+        history.sort(key=session_key)
+    fold_into_stats(emp.stats, new)
+    return len(new), compacted
+
+
+def ingest_sessions(employee_id: str, inputs: List[SessionInput]) -> Dict[str, int]:
+    """Categorize and store a batch with one write; retries of the same sessions are skipped."""
+    sessions = build_sessions(inputs)
+    added, compacted = update_employee(employee_id, lambda emp: merge_sessions(emp, sessions))
+    if compacted:
+        LATE_SESSIONS.inc(compacted)
+    return {"received": len(inputs), "added": added, "compacted": compacted,
+            "duplicates": len(inputs) - added - compacted}
@@ -0,0 +1,460 @@
+"""Embedded SQLite storage backend.
+
+Same interface as persistence.JsonFileStore, but ML data points, window
+switches and sessions live in indexed tables, so recent-N, date-range
+and team queries run as SQL instead of deserializing whole documents.
+Saving a document writes only what changed: new rows at the end of each
+history and rows retention trimmed from its front.
+
+Enable with STORAGE_BACKEND=sqlite. Migrate existing JSON files with:
+
+    python sqlite_store.py migrate
+"""
+
+import sqlite3
+import threading
+from bisect import bisect_right
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from models import DailySummary, EmployeeData, Session, Stats, TimeWindowData
+from pagination import date_to_epoch_ms, switch_position
+from serialization import dumps, loads
+from switch_log import SwitchLog
+
+ML_COLUMNS = [
+    "employee_id", "date", "time_window_start", "role", "active_seconds", "idle_seconds",
+    "window_switch_count", "unique_window_count", "longest_continuous_active_seconds",
+    "task_present", "task_completed", "fragmentation_score", "focus_score", "timestamp",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    employee_id TEXT PRIMARY KEY,
+    role TEXT NOT NULL,
+    stats TEXT NOT NULL  -- Stats JSON without todaySessions
+);
+CREATE TABLE IF NOT EXISTS ml_data_points (
+    employee_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time_window_start TEXT NOT NULL,
+    role TEXT NOT NULL,
+    active_seconds INTEGER NOT NULL,
+    idle_seconds INTEGER NOT NULL,
+    window_switch_count INTEGER NOT NULL,
+    unique_window_count INTEGER NOT NULL,
+    longest_continuous_active_seconds INTEGER NOT NULL,
+    task_present INTEGER NOT NULL,
+    task_completed INTEGER NOT NULL,
+    fragmentation_score REAL NOT NULL,
+    focus_score REAL NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+DROP INDEX IF EXISTS idx_ml_employee_date;
+CREATE INDEX IF NOT EXISTS idx_ml_employee_key
+    ON ml_data_points (employee_id, date, time_window_start, timestamp);
+CREATE TABLE IF NOT EXISTS window_switches (
+    employee_id TEXT NOT NULL,
+    switch_time INTEGER NOT NULL,
+    window_hash TEXT NOT NULL,
+    active_duration INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_switches_employee_time
+    ON window_switches (employee_id, switch_time);
+CREATE TABLE IF NOT EXISTS sessions (
+    employee_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    date TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+DROP INDEX IF EXISTS idx_sessions_employee_date;
+CREATE INDEX IF NOT EXISTS idx_sessions_employee_key
+    ON sessions (employee_id, date, start_time, id);
+CREATE TABLE IF NOT EXISTS daily_summaries (
+    employee_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    role TEXT NOT NULL,
+    summary_values TEXT NOT NULL  -- JSON object
+);
+CREATE INDEX IF NOT EXISTS idx_summaries_employee
+    ON daily_summaries (employee_id, kind, date);
+"""
+
+# Chronological order (pagination.ml_point_key) served by idx_ml_employee_key
+_ML_ORDER = "date, time_window_start, timestamp"
+_ML_ORDER_DESC = "date DESC, time_window_start DESC, timestamp DESC"
+# pagination.session_key order, served by idx_sessions_employee_key
+_SESSION_ORDER = "date, start_time, id"
+_SESSION_COLUMNS = "id, category, date, domain, duration, start_time, end_time, timestamp"
+
+_ML_INSERT = f"INSERT INTO ml_data_points ({', '.join(ML_COLUMNS)}) VALUES ({', '.join('?' * len(ML_COLUMNS))})"
+_SWITCH_INSERT = ("INSERT INTO window_switches (employee_id, switch_time, window_hash, active_duration) "
+                  "VALUES (?, ?, ?, ?)")
+_SESSION_INSERT = ("INSERT INTO sessions (employee_id, id, category, date, domain, duration, start_time, "
+                   "end_time, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def _ml_row(point: TimeWindowData) -> tuple:
+    return tuple(point.model_dump(by_alias=True)[c] for c in ML_COLUMNS)
+
+
+def _session_row(employee_id: str, s: Session) -> tuple:
+    return (employee_id, s.id, s.category, s.date, s.domain, s.duration, s.startTime, s.endTime, s.timestamp)
+
+
+def _ml_point(row: tuple) -> TimeWindowData:
+    data = dict(zip(ML_COLUMNS, row))
+    data["task_present"] = bool(data["task_present"])
+    data["task_completed"] = bool(data["task_completed"])
+    return TimeWindowData(**data)
+
+
+class SQLiteStore:
+    """Single-file SQLite store; one shared connection guarded by a lock."""
+
+    name = "sqlite"
+    # History pages are indexed queries, cheaper than loading the whole document
+    indexed_history = True
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _ensure_employee(self, employee_id: str, role: str):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO employees (employee_id, role, stats) VALUES (?, ?, ?)",
+            (employee_id, role, Stats().model_dump_json(exclude={"todaySessions"})),
+        )
+
+    def _load(self, employee_id: str, role: str, stats_json: str) -> EmployeeData:
+        c = self._conn
+        stats = loads(stats_json)
+        stats["todaySessions"] = [
+            Session(id=r[0], category=r[1], date=r[2], domain=r[3], duration=r[4],
+                    startTime=r[5], endTime=r[6], timestamp=r[7])
+            for r in c.execute(
+                f"SELECT {_SESSION_COLUMNS} FROM sessions WHERE employee_id = ? ORDER BY {_SESSION_ORDER}",
+                (employee_id,))
+        ]
+        ml_points = [
+            _ml_point(r) for r in c.execute(
+                f"SELECT {', '.join(ML_COLUMNS)} FROM ml_data_points WHERE employee_id = ? ORDER BY {_ML_ORDER}",
+                (employee_id,))
+        ]
+        switches = SwitchLog()
+        for r in c.execute(
+                "SELECT switch_time, window_hash, active_duration FROM window_switches "
+                "WHERE employee_id = ? ORDER BY switch_time, rowid", (employee_id,)):
+            switches.append(*r)
+        summaries = [
+            DailySummary(kind=r[0], date=r[1], role=r[2], values=loads(r[3])) for r in c.execute(
+                "SELECT kind, date, role, summary_values FROM daily_summaries WHERE employee_id = ? ORDER BY rowid",
+                (employee_id,))
+        ]
+        return EmployeeData(
+            employeeId=employee_id,
+            role=role,
+            stats=Stats(**stats),
+            mlDataPoints=ml_points,
+            windowSwitches=switches,
+            summaries=summaries,
+        )
+
+    def load_employee(self, employee_id: str) -> EmployeeData:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT role, stats FROM employees WHERE employee_id = ?", (employee_id,)
+            ).fetchone()
+            if row is None:
+                return EmployeeData(employeeId=employee_id)
+            return self._load(employee_id, row[0], row[1])
+
+    def save_employee(self, data: EmployeeData):
+        """Write the document's changes since the stored copy, in one transaction.
+
+        Stored history rows never change: a document only gains rows (usually
+        at the end) or loses its oldest ones to retention. Each history is
+        synced by its sort key, so a save costs O(changes), not O(history).
+        """
+        employee_id = data.employeeId
+        with self._lock, self._conn as c:
+            c.execute(
+                "INSERT INTO employees (employee_id, role, stats) VALUES (?, ?, ?) "
+                "ON CONFLICT (employee_id) DO UPDATE SET role = excluded.role, stats = excluded.stats",
+                (employee_id, data.role, data.stats.model_dump_json(exclude={"todaySessions"})),
+            )
+            points = data.mlDataPoints
+            self._sync_history(
+                c, "ml_data_points", ("date", "time_window_start", "timestamp"), employee_id, points,
+                lambda p: (p.date, p.timeWindowStart, p.timestamp), _ML_INSERT, lambda i: _ml_row(points[i]),
+            )
+            switches = data.windowSwitches
+            self._sync_history(
+                c, "window_switches", ("switch_time",), employee_id, switches.switch_times, lambda t: (t,),
+                _SWITCH_INSERT, lambda i: (employee_id, *next(switches.rows(i, i + 1))),
+            )
+            sessions = data.stats.todaySessions
+            self._sync_history(
+                c, "sessions", ("date", "start_time", "id"), employee_id, sessions,
+                lambda s: (s.date, s.startTime, s.id), _SESSION_INSERT,
+                lambda i: _session_row(employee_id, sessions[i]),
+            )
+            self._sync_summaries(c, employee_id, data.summaries)
+
+    @staticmethod
+    def _sync_history(c: sqlite3.Connection, table: str, key_columns: Tuple[str, ...], employee_id: str,
+                      items: Sequence, key: Callable[[Any], tuple], insert_sql: str, row: Callable[[int], tuple]):
+        """Make the employee's rows in `table` equal `items` (sorted by `key`) with the fewest writes.
+
+        The usual save only deletes stored rows before the first item and
+        inserts items after the last stored key. If the row count then
+        disagrees (items were inserted mid-history), the stored keys are
+        diffed against the items and only the differing keys are rewritten.
+        """
+        columns = ", ".join(key_columns)
+        where = "WHERE employee_id = ?"
+        if not items:
+            c.execute(f"DELETE FROM {table} {where}", (employee_id,))
+            return
+        match = f"({columns}) {{}} ({', '.join('?' * len(key_columns))})"
+        c.execute(f"DELETE FROM {table} {where} AND {match.format('<')}", (employee_id, *key(items[0])))
+        last = c.execute(
+            f"SELECT {columns} FROM {table} {where} ORDER BY {', '.join(k + ' DESC' for k in key_columns)} LIMIT 1",
+            (employee_id,)).fetchone()
+        start = bisect_right(items, tuple(last), key=key) if last else 0
+        c.executemany(insert_sql, (row(i) for i in range(start, len(items))))
+        if c.execute(f"SELECT COUNT(*) FROM {table} {where}", (employee_id,)).fetchone()[0] == len(items):
+            return
+        stored = Counter(c.execute(f"SELECT {columns} FROM {table} {where}", (employee_id,)))
+        wanted = Counter(key(item) for item in items)
+        changed = {k for k in stored.keys() | wanted.keys() if stored[k] != wanted[k]}
+        c.executemany(f"DELETE FROM {table} {where} AND {match.format('=')}", [(employee_id, *k) for k in changed])
+        c.executemany(insert_sql, (row(i) for i, item in enumerate(items) if key(item) in changed))
+
+    @staticmethod
+    def _sync_summaries(c: sqlite3.Connection, employee_id: str, summaries: List[DailySummary]):
+        """Rewrite only the daily summaries that were added, changed or removed."""
+        stored = {(r[0], r[1], r[2]): r[3] for r in c.execute(
+            "SELECT kind, date, role, summary_values FROM daily_summaries WHERE employee_id = ?", (employee_id,))}
+        wanted = {(s.kind, s.date, s.role): dumps(s.values).decode() for s in summaries}
+        stale = [k for k, v in stored.items() if wanted.get(k) != v]
+        c.executemany(
+            "DELETE FROM daily_summaries WHERE employee_id = ? AND kind = ? AND date = ? AND role = ?",
+            [(employee_id, *k) for k in stale],
+        )
+        c.executemany(
+            "INSERT INTO daily_summaries (employee_id, kind, date, role, summary_values) VALUES (?, ?, ?, ?, ?)",
+            [(employee_id, *k, v) for k, v in wanted.items() if stored.get(k) != v],
+        )
+
+    def append_ml_point(self, point: TimeWindowData):
+        self.append_ml_points(point.employeeId, [point])
+
+    def append_ml_points(self, employee_id: str, points: List[TimeWindowData]):
+        with self._lock, self._conn as c:
+            self._ensure_employee(employee_id, points[-1].role)
+            c.executemany(_ML_INSERT, [_ml_row(point) for point in points])
+
+    def list_all_employees(self) -> list[EmployeeData]:
+        with self._lock:
+            rows = self._conn.execute("SELECT employee_id, role, stats FROM employees").fetchall()
+            return [self._load(*row) for row in rows]
+
+    def list_employee_ids(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT employee_id FROM employees")]
+
+    def iter_daily_summaries(self, kind: str) -> Iterator[Tuple[str, DailySummary]]:
+        """(employeeId, summary) for every compacted day of the given kind."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT employee_id, date, role, summary_values FROM daily_summaries WHERE kind = ?", (kind,)
+            ).fetchall()
+        for employee_id, day, role, values in rows:
+            yield employee_id, DailySummary(kind=kind, date=day, role=role, values=loads(values))
+
+    def _newest_rows(self, columns: str, table: str, order: str, where: List[str], params: list,
+                     limit: Optional[int]) -> List[tuple]:
+        """The newest `limit` matching rows by `order` (all if None), oldest first.
+
+        Keyset pagination on the table's (employee_id, key...) index, so a page
+        costs the same at any depth.
+        """
+        sql = f"SELECT {columns} FROM {table} WHERE {' AND '.join(where)}"
+        if limit is not None:
+            sql += f" ORDER BY {', '.join(c + ' DESC' for c in order.split(', '))} LIMIT ?"
+            params = [*params, max(limit, 0)]
+        else:
+            sql += f" ORDER BY {order}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if limit is not None:
+            rows.reverse()
+        return rows
+
+    @staticmethod
+    def _key_filters(employee_id: str, key_columns: str, before: Optional[tuple],
+                     date_from: Optional[str], date_to: Optional[str]) -> Tuple[List[str], list]:
+        where = ["employee_id = ?"]
+        params: list = [employee_id]
+        if before is not None:
+            where.append(f"({key_columns}) < ({', '.join('?' * len(before))})")
+            params.extend(before)
+        if date_from:
+            where.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("date <= ?")
+            params.append(date_to)
+        return where, params
+
+    def query_ml_points(self, employee_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                        limit: Optional[int] = None, before: Optional[tuple] = None) -> List[TimeWindowData]:
+        """Most recent `limit` ML points in [date_from, date_to] keyed before `before`, oldest first."""
+        where, params = self._key_filters(employee_id, _ML_ORDER, before, date_from, date_to)
+        return [_ml_point(r) for r in self._newest_rows(
+            ", ".join(ML_COLUMNS), "ml_data_points", _ML_ORDER, where, params, limit)]
+
+    def query_sessions(self, employee_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       limit: Optional[int] = None, before: Optional[tuple] = None) -> List[Session]:
+        """Most recent `limit` sessions in [date_from, date_to] keyed before `before` (pagination.session_key)."""
+        where, params = self._key_filters(employee_id, _SESSION_ORDER, before, date_from, date_to)
+        return [
+            Session(id=r[0], category=r[1], date=r[2], domain=r[3], duration=r[4],
+                    startTime=r[5], endTime=r[6], timestamp=r[7])
+            for r in self._newest_rows(_SESSION_COLUMNS, "sessions", _SESSION_ORDER, where, params, limit)
+        ]
+
+    def query_switches(self, employee_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       limit: Optional[int] = None, before: Optional[tuple] = None) -> List[Tuple[int, str, int]]:
+        """Most recent `limit` (switchTime, windowHash, activeDuration) rows on UTC days [date_from, date_to].
+
+        `before` is a pagination.switch_position; switches sharing a
+        millisecond are told apart by rowid, their load order.
+        """
+        where = ["employee_id = ?"]
+        params: list = [employee_id]
+        for op, bound in ((">=", date_to_epoch_ms(date_from) if date_from else None),
+                          ("<", date_to_epoch_ms(date_to, end=True) if date_to else None)):
+            if bound is not None:
+                where.append(f"switch_time {op} ?")
+                params.append(bound)
+        if before is not None:
+            t, k = switch_position(before)
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT rowid FROM window_switches WHERE employee_id = ? AND switch_time = ? "
+                    "ORDER BY rowid LIMIT 1 OFFSET ?", (employee_id, t, k)
+                ).fetchone()
+            if row is None:
+                where.append("switch_time <= ?")
+                params.append(t)
+            else:
+                where.append("(switch_time, rowid) < (?, ?)")
+                params.extend((t, row[0]))
+        return self._newest_rows("switch_time, window_hash, active_duration", "window_switches",
+                                 "switch_time, rowid", where, params, limit)
+
+    def count_switches_at(self, employee_id: str, switch_time: int) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM window_switches WHERE employee_id = ? AND switch_time = ?",
+                (employee_id, switch_time),
+            ).fetchone()[0]
+
+    def load_employee_header(self, employee_id: str) -> EmployeeData:
+        """Role and stats only, histories left empty (see persistence.employee_history)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT role, stats FROM employees WHERE employee_id = ?", (employee_id,)
+            ).fetchone()
+        if row is None:
+            return EmployeeData(employeeId=employee_id)
+        return EmployeeData(employeeId=employee_id, role=row[0], stats=Stats(**loads(row[1])))
+
+    def latest_ml_points(self) -> Dict[str, Optional[TimeWindowData]]:
+        """Each stored employee's most recent ML point (None if they have none)."""
+        latest: Dict[str, Optional[TimeWindowData]] = {}
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute("SELECT employee_id FROM employees")]
+            for employee_id in ids:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(ML_COLUMNS)} FROM ml_data_points WHERE employee_id = ? "
+                    f"ORDER BY {_ML_ORDER_DESC} LIMIT 1", (employee_id,)
+                ).fetchone()
+                latest[employee_id] = _ml_point(row) if row else None
+        return latest
+
+    def iter_all_ml_points(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                           role: Optional[str] = None, batch_size: int = 5000) -> Iterator[TimeWindowData]:
+        """Matching ML points, streamed in rowid-keyed batches (lock held per batch only)."""
+        where = ["rowid > ?"]
+        filters: list = []
+        if date_from:
+            where.append("date >= ?")
+            filters.append(date_from)
+        if date_to:
+            where.append("date <= ?")
+            filters.append(date_to)
+        if role:
+            where.append("role = ?")
+            filters.append(role)
+        sql = (f"SELECT rowid, {', '.join(ML_COLUMNS)} FROM ml_data_points WHERE {' AND '.join(where)} "
+               f"ORDER BY rowid LIMIT ?")
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, (last_rowid, *filters, batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _ml_point(row[1:])
+            last_rowid = rows[-1][0]
+
+
+def migrate_json_to_sqlite(data_dir: Path, db_path: Optional[Path] = None) -> int:
+    """One-shot import of data/*.json (and their ML logs) into SQLite. Returns employees migrated."""
+    from persistence import JsonFileStore
+
+    data_dir = Path(data_dir)
+    source = JsonFileStore(data_dir)
+    target = SQLiteStore(db_path or data_dir / "signalpulse.db")
+    count = 0
+    for emp in source.list_all_employees():
+        target.save_employee(emp)
+        count += 1
+    target.close()
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import persistence
+
+    parser = argparse.ArgumentParser(description="Signal Pulse SQLite storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="import data/*.json into the SQLite store")
+    migrate.add_argument("--data-dir", type=Path, default=persistence.DATA_DIR)
+    migrate.add_argument("--db", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        n = migrate_json_to_sqlite(args.data_dir, args.db)
+        print(f"✅ Migrated {n} employees into {args.db or args.data_dir / 'signalpulse.db'}")
@@ -0,0 +1,143 @@
+"""Compact columnar storage for window switch events.
+
+A switch is two integers and an 8-char window hash, but as a dict or a
+Pydantic model it costs several hundred bytes. SwitchLog keeps parallel
+array('q') columns plus an interned hash table (~20 bytes per event),
+and serializes to the existing WindowSwitch JSON shape, so it can be used
+directly as EmployeeData.windowSwitches.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic_core import core_schema
+
+
+class SwitchView:
+    """Zero-copy, read-only view of one event (same attributes as WindowSwitch)."""
+
+    __slots__ = ("_log", "_i")
+
+    def __init__(self, log: "SwitchLog", i: int):
+        self._log = log
+        self._i = i
+
+    @property
+    def switchTime(self) -> int:
+        return self._log.switch_times[self._i]
+
+    @property
+    def windowHash(self) -> str:
+        return self._log.hashes[self._log.hash_ids[self._i]]
+
+    @property
+    def activeDuration(self) -> int:
+        return self._log.durations[self._i]
+
+    def as_dict(self) -> dict:
+        return {"switchTime": self.switchTime, "windowHash": self.windowHash, "activeDuration": self.activeDuration}
+
+    def __repr__(self) -> str:
+        return f"SwitchView({self.as_dict()})"
+
+
+class SwitchLog:
+    """Append-only switch events in parallel columns with interned window hashes."""
+
+    __slots__ = ("switch_times", "durations", "hash_ids", "hashes", "_hash_index")
+
+    def __init__(self, switches: Iterable[Union[dict, "SwitchView"]] = ()):
+        self.switch_times = array("q")
+        self.durations = array("q")
+        self.hash_ids = array("i")
+        self.hashes: List[str] = []
+        self._hash_index: Dict[str, int] = {}
+        for s in switches:
+            if isinstance(s, dict):
+                self.append(s["switchTime"], s["windowHash"], s["activeDuration"])
+            else:
+                self.append(s.switchTime, s.windowHash, s.activeDuration)
+
+    def _intern(self, window_hash: str) -> int:
+        hash_id = self._hash_index.get(window_hash)
+        if hash_id is None:
+            hash_id = len(self.hashes)
+            self.hashes.append(window_hash)
+            self._hash_index[window_hash] = hash_id
+        return hash_id
+
+    def append(self, switch_time: int, window_hash: str, active_duration: int):
+        self.switch_times.append(switch_time)
+        self.durations.append(active_duration)
+        self.hash_ids.append(self._intern(window_hash))
+
+    def __len__(self) -> int:
+        return len(self.switch_times)
+
+    def __getitem__(self, i: int) -> SwitchView:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("switch index out of range")
+        return SwitchView(self, i)
+
+    def __iter__(self) -> Iterator[SwitchView]:
+        for i in range(len(self)):
+            yield SwitchView(self, i)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SwitchLog) and self.to_list() == other.to_list()
+
+    def rows(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str, int]]:
+        """(switchTime, windowHash, activeDuration) tuples for events [start, end), oldest first."""
+        hashes = self.hashes
+        for t, h, d in zip(self.switch_times[start:end], self.hash_ids[start:end], self.durations[start:end]):
+            yield t, hashes[h], d
+
+    def to_list(self, start: int = 0, end: Optional[int] = None) -> List[dict]:
+        """Serialize events [start, end) to the WindowSwitch JSON shape."""
+        return [
+            {"switchTime": t, "windowHash": h, "activeDuration": d}
+            for t, h, d in self.rows(start, end)
+        ]
+
+    def unique_window_count(self) -> int:
+        return len(set(self.hash_ids))
+
+    def total_duration(self) -> int:
+        return sum(self.durations)
+
+    def drop_first(self, n: int):
+        """Remove the oldest n events (and window hashes no longer referenced)."""
+        if n <= 0:
+            return
+        remaining = list(self.rows(n))
+        self.clear()
+        for row in remaining:
+            self.append(*row)
+
+    def clear(self):
+        del self.switch_times[:]
+        del self.durations[:]
+        del self.hash_ids[:]
+        self.hashes.clear()
+        self._hash_index.clear()
+
+    def __repr__(self) -> str:
+        return f"SwitchLog({len(self)} events, {len(self.hashes)} windows)"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler) -> core_schema.CoreSchema:
+        item = core_schema.typed_dict_schema({
+            "switchTime": core_schema.typed_dict_field(core_schema.int_schema()),
+            "windowHash": core_schema.typed_dict_field(core_schema.str_schema()),
+            "activeDuration": core_schema.typed_dict_field(core_schema.int_schema()),
+        })
+        from_list = core_schema.no_info_after_validator_function(cls, core_schema.list_schema(item))
+        return core_schema.json_or_python_schema(
+            json_schema=from_list,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_list]),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda log: log.to_list(), return_schema=core_schema.list_schema(item)
+            ),
+        )
@@ -0,0 +1,86 @@
+"""Incrementally maintained team aggregate for the manager dashboard.
+
+Keeps one small summary per employee (their latest ML data point) plus
+running totals, so team stats can be answered without reading any
+employee file. Updated by persistence on every write; `version` changes
+whenever the totals do (response_cache keys team-stats responses on it).
+
+Score totals are kept as integers in millionths: float running sums pick up
+rounding error with every add/subtract pair and drift away from a fresh
+scan, while integer sums stay exact in any order.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from models import TimeWindowData
+
+# (windowSwitchCount, fragmentationScore, focusScore) of the latest point,
+# scores in SCORE_SCALE units
+_Summary = Optional[Tuple[int, int, int]]
+
+SCORE_SCALE = 1_000_000
+
+
+def _scaled(score: float) -> int:
+    return round(score * SCORE_SCALE)
+
+
+class TeamAggregate:
+    """Running team totals over each employee's most recent ML data point."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: Dict[str, _Summary] = {}
+        self.seeded = False
+        self.seeded_at = 0.0  # time.monotonic() of the seed scan
+        self.version = 0
+
+        self.total_switches = 0
+        self.total_fragmentation = 0  # SCORE_SCALE units
+        self.focus_sum = 0  # SCORE_SCALE units
+        self.focus_count = 0
+
+    def record(self, employee_id: str, latest: Optional[TimeWindowData]):
+        """Replace an employee's summary with their newest point (or None)."""
+        with self._lock:
+            self._apply(employee_id, latest)
+
+    def seed(self, employee_id: str, latest: Optional[TimeWindowData]):
+        """Record a point from a startup scan unless a newer write got there first."""
+        with self._lock:
+            if employee_id not in self._latest:
+                self._apply(employee_id, latest)
+
+    def _apply(self, employee_id: str, latest: Optional[TimeWindowData]):
+        new: _Summary = None
+        if latest is not None:
+            new = (latest.windowSwitchCount, _scaled(latest.fragmentationScore),
+                   _scaled(latest.focusScore))
+
+        old = self._latest.get(employee_id)
+        if employee_id in self._latest and old == new:
+            return
+        self.version += 1
+        if old is not None:
+            self.total_switches -= old[0]
+            self.total_fragmentation -= old[1]
+            self.focus_sum -= old[2]
+            self.focus_count -= 1
+        if new is not None:
+            self.total_switches += new[0]
+            self.total_fragmentation += new[1]
+            self.focus_sum += new[2]
+            self.focus_count += 1
+        self._latest[employee_id] = new
+
+    def snapshot(self) -> dict:
+        """Consistent copy of the running totals."""
+        with self._lock:
+            return {
+                "totalEmployees": len(self._latest),
+                "totalSwitches": self.total_switches,
+                "totalFragmentation": self.total_fragmentation / SCORE_SCALE,
+                "focusSum": self.focus_sum / SCORE_SCALE,
+                "focusCount": self.focus_count,
+            }
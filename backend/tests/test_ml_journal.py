@@ -0,0 +1,64 @@
+from ml_journal import MLJournal
+from models import TimeWindowData
+
+
+def _point(employee_id: str, hour: int) -> TimeWindowData:
+    return TimeWindowData(
+        employeeId=employee_id, date="2026-01-05", timeWindowStart=f"{hour:02d}:00",
+        role="developer", activeSeconds=3000, idleSeconds=600, windowSwitchCount=10,
+        uniqueWindowCount=5, longestContinuousActiveSeconds=900, taskPresent=False,
+        taskCompleted=False, fragmentationScore=20.0, focusScore=70.0, timestamp=hour,
+    )
+
+
+class _Received:
+    def __init__(self):
+        self.points = []
+
+    def __call__(self, employee_id, points):
+        assert all(p.employeeId == employee_id for p in points)
+        self.points.extend((p.employeeId, p.timestamp) for p in points)
+
+
+def test_follower_applies_only_other_workers_points(tmp_path):
+    got_a, got_b = _Received(), _Received()
+    a = MLJournal(tmp_path, "a", got_a)
+    b = MLJournal(tmp_path, "b", got_b)
+    a.append([_point("E1", 1), _point("E1", 2)])
+    b.append([_point("E2", 1)])
+    a.append([_point("E3", 1)])
+
+    assert b.poll() == 3
+    assert got_b.points == [("E1", 1), ("E1", 2), ("E3", 1)]
+    assert a.poll() == 1
+    assert got_a.points == [("E2", 1)]
+    # High-water mark: nothing is applied twice
+    assert b.poll() == 0 and a.poll() == 0
+
+
+def test_follower_starts_at_the_end(tmp_path):
+    MLJournal(tmp_path, "a", _Received()).append([_point("E1", 1)])
+    got = _Received()
+    late = MLJournal(tmp_path, "b", got)
+    assert late.poll() == 0
+    MLJournal(tmp_path, "a", _Received()).append([_point("E1", 2)])
+    assert late.poll() == 1 and got.points == [("E1", 2)]
+
+
+def test_follower_crosses_segments_and_counts_gaps(tmp_path):
+    got = _Received()
+    writer = MLJournal(tmp_path, "a", _Received(), segment_bytes=1, keep_segments=3)
+    follower = MLJournal(tmp_path, "b", got, segment_bytes=1, keep_segments=3)
+    for hour in range(3):
+        writer.append([_point("E1", hour)])
+    assert follower.poll() == 3
+    assert [t for _, t in got.points] == [0, 1, 2]
+    assert follower.gaps == 0
+
+    # Rotates past everything the follower has not read yet
+    for hour in range(3, 10):
+        writer.append([_point("E1", hour)])
+    follower.poll()
+    assert follower.gaps == 1
+    assert [t for _, t in got.points][-3:] == [7, 8, 9]
+    assert len(list(tmp_path.glob("*.jsonl"))) == 3
@@ -0,0 +1,69 @@
+import time
+
+from ml_sink import MLSink
+from models import TimeWindowData
+
+
+def _point(employee_id: str, hour: int) -> TimeWindowData:
+    return TimeWindowData(
+        employeeId=employee_id, date="2026-01-05", timeWindowStart=f"{hour:02d}:00",
+        role="developer", activeSeconds=3000, idleSeconds=600, windowSwitchCount=10,
+        uniqueWindowCount=5, longestContinuousActiveSeconds=900, taskPresent=False,
+        taskCompleted=False, fragmentationScore=20.0, focusScore=70.0, timestamp=hour,
+    )
+
+
+class _FlakyStore:
+    def __init__(self, failing):
+        self.failing = set(failing)
+        self.stored = {}
+        self.attempts = {}
+
+    def write(self, employee_id, points):
+        self.attempts[employee_id] = self.attempts.get(employee_id, 0) + 1
+        if employee_id in self.failing:
+            raise OSError("disk on fire")
+        self.stored.setdefault(employee_id, []).extend(p.timestamp for p in points)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_failing_employee_does_not_block_others():
+    store = _FlakyStore(failing={"bad"})
+    sink = MLSink(write=store.write, retry_backoff=(0.05,))
+    sink.start()
+    try:
+        for hour in range(5):
+            sink.submit(_point("bad", hour))
+            sink.submit(_point("good", hour))
+        _wait_for(lambda: len(store.stored.get("good", [])) == 5)
+        sink.submit(_point("good", 5))
+        _wait_for(lambda: len(store.stored["good"]) == 6)
+        _wait_for(lambda: store.attempts["bad"] >= 3)
+    finally:
+        store.failing.clear()
+        sink.stop()
+
+    assert store.stored["good"] == list(range(6))
+    # Parked points are written in order once storage recovers
+    assert store.stored["bad"] == list(range(5))
+    assert sink.stats()["parked"] == 0
+    assert sink.written == 11 and sink.dropped == 0
+
+
+def test_parked_buffer_is_bounded_and_lost_at_shutdown():
+    store = _FlakyStore(failing={"bad"})
+    sink = MLSink(write=store.write, parked_max=3, retry_backoff=(60.0,))
+    for hour in range(5):
+        sink.submit(_point("bad", hour))
+    sink.submit(_point("good", 0))
+    sink.stop()
+
+    assert store.stored == {"good": [0]}
+    assert sink.stats()["parked"] == 0
+    assert sink.written == 1 and sink.dropped == 5
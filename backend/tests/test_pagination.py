@@ -0,0 +1,51 @@
+import pytest
+
+import persistence
+from models import EmployeeData
+from pagination import EmployeeHistory, check_stats_cursor, decode_cursor, employee_stats_page
+
+# Several switches share a millisecond, including across page boundaries
+TIMES = [1000, 1000, 1000, 2000, 3000, 3000, 3000, 3000, 3000, 4000, 5000, 5000]
+
+
+def _employee() -> EmployeeData:
+    emp = EmployeeData(employeeId="A")
+    for i, t in enumerate(TIMES):
+        emp.windowSwitches.append(t, f"w{i}", i)
+    return emp
+
+
+def _walk(history, limit: int) -> list:
+    rows, cursor = [], None
+    while True:
+        page = employee_stats_page(history, fields=["windowSwitches"], limit=limit, cursor=cursor)
+        rows = page["windowSwitches"] + rows
+        if page["nextCursor"] is None:
+            return rows
+        cursor = decode_cursor(page["nextCursor"])
+        check_stats_cursor(cursor)
+
+
+def _histories(tmp_path):
+    yield EmployeeHistory(_employee())
+    persistence.configure("sqlite", tmp_path)
+    try:
+        persistence.save_employee(_employee())
+        persistence.shutdown()
+        yield persistence.StoreHistory(persistence._store, "A")
+    finally:
+        persistence.shutdown()
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 5])
+def test_switch_pages_keep_same_millisecond_switches(tmp_path, limit):
+    for history in _histories(tmp_path):
+        rows = _walk(history, limit)
+        assert [r["windowHash"] for r in rows] == [f"w{i}" for i in range(len(TIMES))]
+
+
+def test_legacy_switch_cursor_is_accepted():
+    page = employee_stats_page(EmployeeHistory(_employee()), fields=["windowSwitches"], limit=10,
+                               cursor={"w": 3000})
+    check_stats_cursor({"w": 3000})
+    assert [r["switchTime"] for r in page["windowSwitches"]] == TIMES[:4]
@@ -0,0 +1,45 @@
+import random
+
+from models import TimeWindowData
+from team_aggregate import TeamAggregate
+
+
+def _point(employee_id: str, rng: random.Random) -> TimeWindowData:
+    return TimeWindowData(
+        employeeId=employee_id, date="2026-01-05", timeWindowStart="09:00", role="developer",
+        activeSeconds=3000, idleSeconds=600, windowSwitchCount=rng.randint(0, 200),
+        uniqueWindowCount=5, longestContinuousActiveSeconds=900, taskPresent=False,
+        taskCompleted=False, fragmentationScore=rng.uniform(0, 100) / 3,
+        focusScore=rng.uniform(0, 100) / 7, timestamp=rng.randint(0, 10**12),
+    )
+
+
+def test_totals_match_fresh_scan_after_many_updates():
+    rng = random.Random(7)
+    employees = [f"emp{i}" for i in range(50)]
+    running = TeamAggregate()
+    latest = {}
+    for _ in range(20_000):
+        employee_id = rng.choice(employees)
+        point = None if rng.random() < 0.05 else _point(employee_id, rng)
+        running.record(employee_id, point)
+        latest[employee_id] = point
+
+    rescan = TeamAggregate()
+    for employee_id, point in latest.items():
+        rescan.seed(employee_id, point)
+
+    assert running.snapshot() == rescan.snapshot()
+
+
+def test_totals_return_to_zero():
+    rng = random.Random(11)
+    aggregate = TeamAggregate()
+    for i in range(1000):
+        aggregate.record("a", _point("a", rng))
+    aggregate.record("a", None)
+
+    snapshot = aggregate.snapshot()
+    assert snapshot["totalFragmentation"] == 0
+    assert snapshot["focusSum"] == 0
+    assert snapshot["focusCount"] == 0
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import tracker
+from scheduler import SamplingScheduler
+from window_sources import WindowSource
+
+MIDNIGHT = datetime(2026, 3, 2, tzinfo=timezone.utc).timestamp()
+
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Source(WindowSource):
+    def set(self, title):
+        self._set(title)
+
+
+class _ManualScheduler(SamplingScheduler):
+    """No thread of its own: the test dispatches events and deadlines."""
+
+    def start(self):
+        pass
+
+
+def _run(scheduler: _ManualScheduler, clock: _Clock, until: float):
+    clock.now = until
+    scheduler.dispatch()
+    # Deadlines scheduled by the events just delivered (e.g. the idle timeout)
+    scheduler.dispatch()
+
+
+def _tracker(start: float, title):
+    clock = _Clock(start)
+    source = _Source()
+    source.set(title)
+    scheduler = _ManualScheduler(source, clock=clock)
+    points = []
+    t = tracker.WindowTracker("A", scheduler=scheduler, on_ml_data_complete=points.append)
+    t.start()
+    return t, scheduler, source, clock, points
+
+
+def test_idle_timeout_across_midnight_charges_only_the_new_day():
+    # Aggregation windows start at :30, so midnight falls inside one
+    t, scheduler, source, clock, points = _tracker(MIDNIGHT - 90, "editor")
+    _run(scheduler, clock, MIDNIGHT - 30)
+    assert len(points) == 1
+
+    clock.now = MIDNIGHT - 10
+    source.set(None)
+    _run(scheduler, clock, MIDNIGHT + 25)  # midnight, then the idle timeout at 00:00:20
+    assert t.day_index == int(MIDNIGHT // 86400)
+    assert t.idle_ms_today == 20_000
+    assert t.active_ms_today == 0
+
+    _run(scheduler, clock, MIDNIGHT + 30)
+    # The window [23:59:30, 00:00:30) keeps both sides of midnight
+    assert points[-1].activeSeconds == 20
+    assert points[-1].idleSeconds == 40
+    t.stop()
+
+
+def test_idle_at_start_across_midnight():
+    t, scheduler, source, clock, points = _tracker(MIDNIGHT - 10, None)
+    _run(scheduler, clock, MIDNIGHT + 25)
+    assert t.idle_ms_today == 20_000
+    assert t.idle_ms_this_hour == 30_000
+    t.stop()
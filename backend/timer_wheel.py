@@ -0,0 +1,92 @@
+"""Hashed timer wheel for tracker deadlines (idle timeout, aggregation, midnight).
+
+Timers hash into `slots` buckets by deadline tick (`resolution` seconds),
+so scheduling and cancelling are O(1) and expire() only visits the
+buckets between its previous call and now. next_deadline() tells the
+scheduler how long it may sleep. Deadlines are kept exactly; the
+resolution only decides which bucket a timer lives in.
+"""
+
+import threading
+from typing import Callable, List, Optional, Set
+
+
+class Timer:
+    """A scheduled callback; callback(deadline) runs once unless cancelled."""
+
+    __slots__ = ("deadline", "callback", "tick", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable[[float], None], tick: int):
+        self.deadline = deadline
+        self.callback = callback
+        self.tick = tick
+        self.cancelled = False
+
+    def __repr__(self) -> str:
+        return f"Timer(deadline={self.deadline}, cancelled={self.cancelled})"
+
+
+class TimerWheel:
+    """O(1) schedule/cancel; expire(now) returns due timers in deadline order."""
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512, now: float = 0.0):
+        self.resolution = resolution
+        self._slots: List[Set[Timer]] = [set() for _ in range(slots)]
+        self._tick = self._to_tick(now)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _to_tick(self, t: float) -> int:
+        return int(t // self.resolution)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, deadline: float, callback: Callable[[float], None]) -> Timer:
+        """Run callback(deadline) once expire() reaches the deadline (next call if already past)."""
+        with self._lock:
+            timer = Timer(deadline, callback, max(self._to_tick(deadline), self._tick))
+            self._slots[timer.tick % len(self._slots)].add(timer)
+            self._count += 1
+        return timer
+
+    def cancel(self, timer: Timer):
+        """Drop a pending timer; also stops a timer already expired but not yet run."""
+        with self._lock:
+            timer.cancelled = True
+            slot = self._slots[timer.tick % len(self._slots)]
+            if timer in slot:
+                slot.remove(timer)
+                self._count -= 1
+
+    def expire(self, now: float) -> List[Timer]:
+        """Remove and return every timer with deadline <= now, earliest first."""
+        due = []
+        with self._lock:
+            target = self._to_tick(now)
+            if target >= self._tick:
+                # Visit each bucket at most once, however long we slept
+                span = min(target - self._tick, len(self._slots) - 1)
+                for tick in range(target - span, target + 1):
+                    slot = self._slots[tick % len(self._slots)]
+                    for timer in [t for t in slot if t.deadline <= now]:
+                        slot.remove(timer)
+                        due.append(timer)
+                self._tick = target
+            self._count -= len(due)
+        due.sort(key=lambda t: t.deadline)
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest pending deadline, or None when the wheel is empty."""
+        with self._lock:
+            if not self._count:
+                return None
+            n = len(self._slots)
+            for offset in range(n):
+                tick = self._tick + offset
+                deadlines = [t.deadline for t in self._slots[tick % n] if t.tick == tick]
+                if deadlines:
+                    return min(deadlines)
+            # Everything is more than one revolution away
+            return min(t.deadline for slot in self._slots for t in slot)
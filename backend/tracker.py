@@ -2,48 +2,30 @@
 
 Monitors active window changes (anonymous, no app names extracted).
 Tracks active/idle time and generates ML-ready data aggregates.
-Runs in background thread - never blocks FastAPI.
+Driven by window-change events and timer deadlines from the shared
+SamplingScheduler thread - never blocks FastAPI.
 """
 
 import hashlib
 import time
 import threading
-import platform
 from datetime import datetime, timezone
 from typing import Optional, Callable, Dict
-from collections import defaultdict
+from collections import defaultdict, deque
 
+from metrics import AGGREGATION
 from models import WindowSwitch, TimeWindowData, LiveMetrics
+from scheduler import SamplingScheduler
+from timer_wheel import Timer
+from switch_log import SwitchLog
+from window_sources import default_source
 
-# Idle timeout: if no window for 30 seconds, assume idle
+# Idle timeout: if no window for 30 seconds, idle since it disappeared
 IDLE_TIMEOUT_SEC = 30
 # Aggregate data every 60 seconds (for development/testing - change to 3600 for production)
 AGGREGATION_INTERVAL_SEC = 60
-
-
-def get_active_window_title() -> Optional[str]:
-    """Get the currently active window title (cross-platform)."""
-    system = platform.system()
-    try:
-        if system == "Windows":
-            import ctypes
-            hwnd = ctypes.windll.user32.GetForegroundWindow()
-            length = ctypes.windll.user32.GetWindowTextLengthW(hwnd)
-            buf = ctypes.create_unicode_buffer(length + 1)
-            ctypes.windll.user32.GetWindowTextW(hwnd, buf, length + 1)
-            return buf.value if buf.value else None
-        elif system == "Darwin":  # macOS
-            from subprocess import run
-            script = 'tell application "System Events" to get name of first application process whose frontmost is true'
-            result = run(["osascript", "-e", script], capture_output=True, text=True)
-            return result.stdout.strip() if result.returncode == 0 else None
-        elif system == "Linux":
-            from subprocess import run
-            result = run(["xdotool", "getactivewindow", "getwindowname"], capture_output=True, text=True)
-            return result.stdout.strip() if result.returncode == 0 else None
-    except Exception:
-        return None
-    return None
+# Switch events kept for the live UI's "recent switches" list
+RECENT_SWITCHES = 10
 
 
 def hash_window_title(title: Optional[str]) -> str:
@@ -54,87 +36,163 @@ def hash_window_title(title: Optional[str]) -> str:
     return hashlib.md5(title[:50].encode()).hexdigest()[:8]
 
 
+_scheduler: Optional[SamplingScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SamplingScheduler:
+    """Process-wide scheduler shared by all trackers."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SamplingScheduler(source=default_source())
+        return _scheduler
+
+
+def live_metrics_from_state(state: dict, now: int) -> LiveMetrics:
+    """LiveMetrics at `now` (epoch ms) from WindowTracker.live_state(); the open session keeps counting."""
+    session_start = state["sessionStart"]
+    current_session_duration = (now - session_start) if session_start else 0
+
+    # Calculate total active time: completed sessions + current session
+    total_active_time = state["activeMsToday"] + current_session_duration
+
+    # Calculate fragmentation score: switches per active minute
+    total_active_sec = total_active_time // 1000
+    fragmentation = 0.0
+    if total_active_sec > 0:
+        fragmentation = min(100, (state["switchesToday"] / (total_active_sec / 60)) * 10)
+
+    # Estimate focus score from activity patterns
+    focus_score = max(0, 100 - fragmentation)
+
+    return LiveMetrics(
+        employeeId=state["employeeId"],
+        windowSwitchCount=state["switchesToday"],
+        sessionStartTime=session_start,
+        currentSessionDuration=current_session_duration,
+        activeTimeToday=total_active_time,
+        idleTimeToday=state["idleMsToday"],
+        focusScore=int(focus_score),
+        uniqueWindowsCount=state["uniqueWindows"],
+        fragmentationScore=fragmentation,
+        recentSwitches=state["recentSwitches"],
+    )
+
+
 class WindowTracker:
-    """Background activity tracking engine - ML/analytics focused."""
+    """Background activity tracking engine - ML/analytics focused.
 
-    def __init__(self, employee_id: str, role: str = "developer", on_ml_data_complete: Optional[Callable] = None):
+    A state machine driven by the shared scheduler: on_window() for every
+    active-window change, plus timer-wheel deadlines for the idle timeout,
+    aggregation and UTC midnight. Nothing runs while nothing changes.
+    Times are epoch ms; open stretches are charged to the hourly and daily
+    totals up to each boundary, so active/idle splits are exact.
+    """
+
+    def __init__(self, employee_id: str, role: str = "developer", on_ml_data_complete: Optional[Callable] = None,
+                 scheduler: Optional[SamplingScheduler] = None, on_change: Optional[Callable] = None):
         self.employee_id = employee_id
         self.role = role
         self.on_ml_data_complete = on_ml_data_complete
+        # Called with the tracker after a switch, idle transition or aggregation
+        self.on_change = on_change
+        self.scheduler = scheduler
         self._running = False
-        self._thread: Optional[threading.Thread] = None
+        # Latest event time applied (ms); later events never move the clock backwards
+        self._last_event = 0
 
         # Current session state
         self.active_window_hash: Optional[str] = None
         self.session_start: Optional[int] = None
-        self.last_activity: Optional[int] = None
-        self.window_switches: list = []
+        # No window in focus since this time (ms); idle once it lasts IDLE_TIMEOUT_SEC
+        self.absent_since: Optional[int] = None
+        self.idle_since: Optional[int] = None
+        self.recent_switches: deque = deque(maxlen=RECENT_SWITCHES)
         self.unique_windows: set = set()
-        self.continuous_active_start: Optional[int] = None
+
+        # Running totals for today (UTC), reset at midnight
+        self.day_index = 0
+        self.switches_today = 0
+        self.active_ms_today = 0
+        self.idle_ms_today = 0
 
         # Aggregation state for ML data
         self.switches_this_hour = 0
-        self.active_seconds_this_hour = 0
-        self.idle_seconds_this_hour = 0
+        self.active_ms_this_hour = 0
+        self.idle_ms_this_hour = 0
         self.current_hour_start: Optional[int] = None
+        self._hour_start_ms = 0
         self.longest_continuous_active = 0
-        self.hour_window_switches: list = []
+        self.hour_window_switches = SwitchLog()
+        # Open session / idle time is in the totals up to these marks (ms)
+        self._active_charged_at = 0
+        self._idle_charged_at = 0
+
+        self._idle_timer: Optional[Timer] = None
+        self._aggregation_timer: Optional[Timer] = None
+        self._midnight_timer: Optional[Timer] = None
+
+    def live_state(self) -> dict:
+        """The counters LiveMetrics is derived from; only changes on switches/idle/rollover."""
+        return {
+            "employeeId": self.employee_id,
+            "sessionStart": self.session_start,
+            "activeMsToday": self.active_ms_today,
+            "idleMsToday": self.idle_ms_today,
+            "switchesToday": self.switches_today,
+            "uniqueWindows": len(self.unique_windows),
+            "recentSwitches": list(self.recent_switches),
+        }
 
     @property
     def live_metrics(self) -> LiveMetrics:
         """Current activity metrics for UI (anonymous)."""
-        now = int(time.time() * 1000)
-        current_session_duration = (now - self.session_start) if self.session_start else 0
-
-        # Calculate total active time: completed sessions + current session
-        completed_active_time = sum(s["activeDuration"] for s in self.window_switches)
-        total_active_time = completed_active_time + current_session_duration
+        return live_metrics_from_state(self.live_state(), self._now_ms())
 
-        # Calculate fragmentation score: switches per active minute
-        total_active_sec = total_active_time // 1000
-        fragmentation = 0.0
-        if total_active_sec > 0:
-            fragmentation = min(100, (len(self.window_switches) / (total_active_sec / 60)) * 10)
+    def _now_ms(self) -> int:
+        return int((self.scheduler.clock() if self.scheduler else time.time()) * 1000)
 
-        # Estimate focus score from activity patterns
-        focus_score = max(0, 100 - fragmentation)
+    def _event_time(self, at: float) -> int:
+        """Epoch ms for an event at `at` seconds, clamped so time never runs backwards."""
+        self._last_event = max(self._last_event, int(at * 1000))
+        return self._last_event
 
-        return LiveMetrics(
-            employeeId=self.employee_id,
-            windowSwitchCount=len(self.window_switches),
-            sessionStartTime=self.session_start,
-            currentSessionDuration=current_session_duration,
-            activeTimeToday=total_active_time,
-            idleTimeToday=0,  # Calculated separately from active time
-            focusScore=int(focus_score),
-            uniqueWindowsCount=len(self.unique_windows),
-            fragmentationScore=fragmentation,
-            recentSwitches=self.window_switches[-10:],  # Last 10 switches
-        )
+    @property
+    def _day_start_ms(self) -> int:
+        return self.day_index * 86_400_000
 
     def start(self):
         """Start background tracking."""
         if self._running:
             return
+        if self.scheduler is None:
+            self.scheduler = get_scheduler()
         self._running = True
-        self.current_hour_start = int(time.time())
-        
+        now = self._event_time(self.scheduler.clock())
+        self.current_hour_start = now // 1000
+        self._hour_start_ms = now
+        self.day_index = now // 86_400_000
+
         # Initialize with first window immediately
-        now = int(time.time())
-        window_title = get_active_window_title()
-        self.active_window_hash = hash_window_title(window_title)
-        self.session_start = now * 1000
-        self.last_activity = now
-        self.unique_windows.add(self.active_window_hash)
-        
-        self._thread = threading.Thread(target=self._track_loop, daemon=True)
-        self._thread.start()
+        window_title = self.scheduler.source.current()
+        if window_title:
+            self._open_session(now, hash_window_title(window_title))
+        else:
+            self._window_lost(now)
+        self._aggregation_timer = self.scheduler.call_at(now / 1000 + AGGREGATION_INTERVAL_SEC,
+                                                         self._on_aggregation_due)
+        self._midnight_timer = self.scheduler.call_at((self.day_index + 1) * 86400, self._on_midnight)
+        self.scheduler.register(self)
 
     def stop(self):
         """Stop background tracking."""
         self._running = False
-        if self._thread:
-            self._thread.join(timeout=3)
+        if self.scheduler:
+            self.scheduler.unregister(self)
+            for timer in (self._idle_timer, self._aggregation_timer, self._midnight_timer):
+                self.scheduler.cancel(timer)
+        self._idle_timer = self._aggregation_timer = self._midnight_timer = None
 
     def _get_hour_index(self, timestamp: Optional[int] = None) -> str:
         """Get hour index as HH:MM format from timestamp."""
@@ -143,25 +201,161 @@ class WindowTracker:
         dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
         return dt.strftime("%H:00")
 
-    def _generate_ml_data_point(self) -> Optional[TimeWindowData]:
-        """Generate ML-ready data for the completed hour."""
-        if not self.current_hour_start:
+    # ── Accounting ──────────────────────────────────────────────
+
+    def _charge_active(self, until: int):
+        """Add the open session's time up to `until` to this hour."""
+        if self.session_start is not None and until > self._active_charged_at:
+            self.active_ms_this_hour += until - self._active_charged_at
+            self._active_charged_at = until
+
+    def _charge_idle(self, until: int):
+        """Add open idle time up to `until` to today and this hour.
+
+        Idle found by the timeout starts when the window disappeared, which
+        may be before the current hour or day began; like a session's active
+        time, only the part inside each bucket is charged to it.
+        """
+        if self.idle_since is not None and until > self._idle_charged_at:
+            self.idle_ms_today += max(0, until - max(self._idle_charged_at, self._day_start_ms))
+            self.idle_ms_this_hour += max(0, until - max(self._idle_charged_at, self._hour_start_ms))
+            self._idle_charged_at = until
+
+    def _open_session(self, now: int, window_hash: str):
+        self.active_window_hash = window_hash
+        self.session_start = now
+        self._active_charged_at = now
+        self.unique_windows.add(window_hash)
+
+    def _close_session(self, end: int) -> int:
+        """End the open session at `end`; returns its full duration (ms)."""
+        self._charge_active(end)
+        duration = end - self.session_start
+        self.active_ms_today += max(0, end - max(self.session_start, self._day_start_ms))
+        in_hour = end - max(self.session_start, self._hour_start_ms)
+        self.longest_continuous_active = max(self.longest_continuous_active, in_hour // 1000)
+        self.session_start = None
+        return duration
+
+    def _switch(self, now: int, window_hash: str):
+        """Complete the previous session as a switch and start a new one."""
+        if self.session_start is not None:
+            switch_time, previous_hash = self.session_start, self.active_window_hash
+            duration_ms = self._close_session(now)
+            self.recent_switches.append({
+                "switchTime": switch_time,
+                "windowHash": previous_hash,
+                "activeDuration": duration_ms,
+            })
+            self.switches_today += 1
+            self.switches_this_hour += 1
+            self.hour_window_switches.append(switch_time, previous_hash, duration_ms)
+        self._open_session(now, window_hash)
+
+    def _window_lost(self, now: int):
+        """No window in focus: idle unless one comes back within IDLE_TIMEOUT_SEC."""
+        if self.absent_since is None and self.idle_since is None:
+            self.absent_since = now
+            self._idle_timer = self.scheduler.call_at(now / 1000 + IDLE_TIMEOUT_SEC, self._on_idle_due)
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self)
+
+    # ── Events and deadlines (scheduler thread) ─────────────────
+
+    def on_window(self, at: float, window_title: Optional[str]):
+        """Apply an active-window change observed at `at` (epoch seconds)."""
+        if not self._running:
+            return
+        now = self._event_time(at)
+        if not window_title:
+            self._window_lost(now)
+            return
+        window_hash = hash_window_title(window_title)
+        if self.absent_since is not None:
+            # Back before the idle timeout: the gap stays part of the session
+            self.scheduler.cancel(self._idle_timer)
+            self._idle_timer = None
+            self.absent_since = None
+        if self.idle_since is not None:
+            self._charge_idle(now)
+            self.idle_since = None
+            self._open_session(now, window_hash)
+        elif window_hash != self.active_window_hash:
+            self._switch(now, window_hash)
+        else:
+            return
+        self._changed()
+
+    def _on_idle_due(self, deadline: float):
+        """IDLE_TIMEOUT_SEC without a window: the session ended, and idle began, when it disappeared."""
+        if not self._running or self.absent_since is None:
+            return
+        now = self._event_time(deadline)
+        # Time already reported as active in an earlier ML point stays active
+        idle_start = self.absent_since
+        if self.session_start is not None:
+            idle_start = max(idle_start, self._active_charged_at)
+            self._close_session(idle_start)
+        self.active_window_hash = None
+        self.absent_since = None
+        self._idle_timer = None
+        self.idle_since = self._idle_charged_at = idle_start
+        self._charge_idle(now)
+        self._changed()
+
+    def _on_aggregation_due(self, deadline: float):
+        """Close the ML window: emit its data point and start the next one."""
+        if not self._running:
+            return
+        aggregation_start = time.perf_counter()
+        now = self._event_time(deadline)
+        self._charge_active(now)
+        self._charge_idle(now)
+        ml_point = self._generate_ml_data_point(now)
+        if ml_point and self.on_ml_data_complete:
+            self.on_ml_data_complete(ml_point)
+        self._reset_hour_tracking(now)
+        AGGREGATION.observe(time.perf_counter() - aggregation_start)
+        self._aggregation_timer = self.scheduler.call_at(deadline + AGGREGATION_INTERVAL_SEC,
+                                                         self._on_aggregation_due)
+        self._changed()
+
+    def _on_midnight(self, deadline: float):
+        if not self._running:
+            return
+        now = self._event_time(deadline)
+        self._charge_idle(now)
+        self._rollover_day(now // 86_400_000)
+        self._midnight_timer = self.scheduler.call_at((self.day_index + 1) * 86400, self._on_midnight)
+        self._changed()
+
+    # ── ML aggregation ──────────────────────────────────────────
+
+    def _generate_ml_data_point(self, now: Optional[int] = None) -> Optional[TimeWindowData]:
+        """Generate ML-ready data for the window since current_hour_start, up to `now` (ms)."""
+        if self.current_hour_start is None:
             return None
+        if now is None:
+            now = self._now_ms()
 
-        now = int(time.time())
         date = datetime.fromtimestamp(self.current_hour_start, tz=timezone.utc).strftime("%Y-%m-%d")
         hour_index = self._get_hour_index(self.current_hour_start)
 
-        # Include current session active time in calculation
-        current_session_active = 0
-        if self.session_start:
-            current_session_active = (now * 1000 - self.session_start) // 1000
+        # Include the ongoing session / idle stretch not charged yet
+        active_ms = self.active_ms_this_hour
+        longest = self.longest_continuous_active
+        if self.session_start is not None:
+            active_ms += max(0, now - self._active_charged_at)
+            longest = max(longest, (now - max(self.session_start, self._hour_start_ms)) // 1000)
+        idle_ms = self.idle_ms_this_hour
+        if self.idle_since is not None:
+            idle_ms += max(0, now - max(self._idle_charged_at, self._hour_start_ms))
+
+        total_active = active_ms // 1000
+        total_idle = idle_ms // 1000
 
-        # Calculate metrics (including current ongoing session)
-        total_active = self.active_seconds_this_hour + current_session_active
-        total_idle = self.idle_seconds_this_hour
-        total_time = total_active + total_idle
-        
         fragmentation_score = 0.0
         if total_active > 0:
             fragmentation_score = min(100, (self.switches_this_hour / (total_active / 60)) * 10)
@@ -176,81 +370,32 @@ class WindowTracker:
             activeSeconds=total_active,
             idleSeconds=total_idle,
             windowSwitchCount=self.switches_this_hour,
-            uniqueWindowCount=len(set(s["windowHash"] for s in self.hour_window_switches)),
-            longestContinuousActiveSeconds=self.longest_continuous_active,
+            uniqueWindowCount=self.hour_window_switches.unique_window_count(),
+            longestContinuousActiveSeconds=longest,
             taskPresent=False,  # Can be set by external system
             taskCompleted=False,  # Can be set by external system
             fragmentationScore=fragmentation_score,
             focusScore=focus_score,
-            timestamp=int(time.time() * 1000),
+            timestamp=now,
         )
 
         return ml_point
 
-    def _reset_hour_tracking(self):
-        """Reset hourly aggregation counters."""
+    def _reset_hour_tracking(self, now: int):
+        """Reset hourly aggregation counters; the next window starts at `now` (ms)."""
         self.switches_this_hour = 0
-        self.active_seconds_this_hour = 0
-        self.idle_seconds_this_hour = 0
-        self.hour_window_switches = []
+        self.active_ms_this_hour = 0
+        self.idle_ms_this_hour = 0
+        self.hour_window_switches = SwitchLog()
         self.longest_continuous_active = 0
-        self.current_hour_start = int(time.time())
-
-    def _track_loop(self):
-        """Main tracking loop — runs every 1 second."""
-        last_aggregation = int(time.time())
-
-        while self._running:
-            try:
-                now = int(time.time())
-                window_title = get_active_window_title()
-                window_hash = hash_window_title(window_title)
-
-                # Check if hour has changed - aggregate and save ML data
-                if now - last_aggregation >= AGGREGATION_INTERVAL_SEC:
-                    ml_point = self._generate_ml_data_point()
-                    if ml_point and self.on_ml_data_complete:
-                        self.on_ml_data_complete(ml_point)
-                    self._reset_hour_tracking()
-                    last_aggregation = now
-
-                # Detect window switch
-                if window_title and window_hash != self.active_window_hash:
-                    # Complete previous session
-                    if self.active_window_hash and self.session_start:
-                        duration_ms = (now * 1000) - self.session_start
-                        self.window_switches.append({
-                            "switchTime": self.session_start,
-                            "windowHash": self.active_window_hash,
-                            "activeDuration": duration_ms,
-                        })
-                        self.hour_window_switches.append({
-                            "windowHash": self.active_window_hash,
-                            "duration": duration_ms,
-                        })
-                        self.switches_this_hour += 1
-                        self.active_seconds_this_hour += duration_ms // 1000
-                        self.longest_continuous_active = max(self.longest_continuous_active, duration_ms // 1000)
-
-                    # Start new session
-                    self.active_window_hash = window_hash
-                    self.session_start = now * 1000
-                    self.last_activity = now
-                    self.unique_windows.add(window_hash)
-
-                # Detect idle (no activity for IDLE_TIMEOUT_SEC)
-                elif self.last_activity and (now - self.last_activity) >= IDLE_TIMEOUT_SEC:
-                    self.idle_seconds_this_hour += IDLE_TIMEOUT_SEC
-                    self.active_window_hash = None
-                    self.session_start = None
-                    self.last_activity = None
-
-                else:
-                    # Active - update last activity time
-                    if window_title:
-                        self.last_activity = now
-
-            except Exception:
-                pass  # Never crash the tracker
-
-            time.sleep(1)
+        self.current_hour_start = now // 1000
+        self._hour_start_ms = now
+
+    def _rollover_day(self, day_index: int):
+        """Start today's running totals from zero (the open session carries over)."""
+        self.day_index = day_index
+        self.switches_today = 0
+        self.active_ms_today = 0
+        self.idle_ms_today = 0
+        self.recent_switches.clear()
+        self.unique_windows = {self.active_window_hash} if self.active_window_hash else set()
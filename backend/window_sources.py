@@ -0,0 +1,219 @@
+"""Pluggable sources for the active window title.
+
+Sources notify subscribers only when the title actually changes. The
+scheduler probes sources with `polls = True` once per tick (the probe is
+what detects the change); the others push changes on their own.
+
+  PollingWindowSource  probes the OS on every call (ctypes/osascript/xdotool)
+  XlibWindowSource     long-lived X11 connection, event-driven via
+                       _NET_ACTIVE_WINDOW / _NET_WM_NAME property changes
+  FakeWindowSource     deterministic scripted titles for headless tests/benchmarks
+
+WINDOW_SOURCE=auto|poll|xlib selects the default (auto prefers Xlib on Linux).
+"""
+
+import os
+import platform
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+WINDOW_SOURCE = os.environ.get("WINDOW_SOURCE", "auto")
+
+
+def get_active_window_title() -> Optional[str]:
+    """Get the currently active window title (cross-platform)."""
+    system = platform.system()
+    try:
+        if system == "Windows":
+            import ctypes
+            hwnd = ctypes.windll.user32.GetForegroundWindow()
+            length = ctypes.windll.user32.GetWindowTextLengthW(hwnd)
+            buf = ctypes.create_unicode_buffer(length + 1)
+            ctypes.windll.user32.GetWindowTextW(hwnd, buf, length + 1)
+            return buf.value if buf.value else None
+        elif system == "Darwin":  # macOS
+            from subprocess import run
+            script = 'tell application "System Events" to get name of first application process whose frontmost is true'
+            result = run(["osascript", "-e", script], capture_output=True, text=True)
+            return result.stdout.strip() if result.returncode == 0 else None
+        elif system == "Linux":
+            from subprocess import run
+            result = run(["xdotool", "getactivewindow", "getwindowname"], capture_output=True, text=True)
+            return result.stdout.strip() if result.returncode == 0 else None
+    except Exception:
+        return None
+    return None
+
+
+class WindowSource:
+    """Base class: current() returns the active title, subscribers hear about changes."""
+
+    # True when changes are only noticed by calling current()
+    polls = False
+
+    def __init__(self):
+        self._title: Optional[str] = None
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+
+    def current(self) -> Optional[str]:
+        return self._title
+
+    def subscribe(self, callback: Callable[[Optional[str]], None]):
+        self._listeners.append(callback)
+
+    def _set(self, title: Optional[str]):
+        if title == self._title:
+            return
+        self._title = title
+        for callback in list(self._listeners):
+            try:
+                callback(title)
+            except Exception:
+                pass
+
+    def close(self):
+        pass
+
+
+class PollingWindowSource(WindowSource):
+    """Probes the OS on every current() call — one subprocess per call on macOS/Linux."""
+
+    polls = True
+
+    def __init__(self, probe: Callable[[], Optional[str]] = get_active_window_title):
+        super().__init__()
+        self.probe = probe
+
+    def current(self) -> Optional[str]:
+        self._set(self.probe())
+        return self._title
+
+
+class XlibWindowSource(WindowSource):
+    """Event-driven X11 source: one connection, no per-tick process spawning.
+
+    Listens for PropertyNotify on the root window (_NET_ACTIVE_WINDOW) and
+    on the active window (_NET_WM_NAME / WM_NAME, e.g. browser tab changes).
+    current() just returns the cached title.
+    """
+
+    def __init__(self):
+        super().__init__()
+        from Xlib import X, Xatom, display
+
+        self._X = X
+        self._display = display.Display()
+        self._root = self._display.screen().root
+        self._net_active_window = self._display.intern_atom("_NET_ACTIVE_WINDOW")
+        self._net_wm_name = self._display.intern_atom("_NET_WM_NAME")
+        self._wm_name = Xatom.WM_NAME
+        self._active_id: Optional[int] = None
+        self._active = None
+        self._closed = False
+
+        self._root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._refresh()
+        self._thread = threading.Thread(target=self._event_loop, name="xlib-window-source", daemon=True)
+        self._thread.start()
+
+    def _window_title(self) -> Optional[str]:
+        if self._active is None:
+            return None
+        for atom in (self._net_wm_name, self._wm_name):
+            prop = self._active.get_full_property(atom, self._X.AnyPropertyType)
+            if prop and prop.value:
+                value = prop.value
+                return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+        return None
+
+    def _refresh(self):
+        try:
+            prop = self._root.get_full_property(self._net_active_window, self._X.AnyPropertyType)
+            window_id = int(prop.value[0]) if prop and len(prop.value) else None
+            if window_id != self._active_id:
+                self._active_id = window_id
+                self._active = None
+                if window_id:
+                    self._active = self._display.create_resource_object("window", window_id)
+                    self._active.change_attributes(event_mask=self._X.PropertyChangeMask)
+            self._set(self._window_title())
+        except Exception:
+            # Active window vanished between the event and our query
+            self._active_id = None
+            self._active = None
+            self._set(None)
+
+    def _event_loop(self):
+        watched = (self._net_active_window, self._net_wm_name, self._wm_name)
+        while not self._closed:
+            try:
+                event = self._display.next_event()
+            except Exception:
+                if self._closed:
+                    return
+                time.sleep(1)
+                continue
+            if event.type == self._X.PropertyNotify and event.atom in watched:
+                self._refresh()
+
+    def close(self):
+        self._closed = True
+        try:
+            self._display.close()
+        except Exception:
+            pass
+
+
+class FakeWindowSource(WindowSource):
+    """Deterministic scripted source for headless tests and benchmarks.
+
+    `script` is a list of (offset_seconds, title) steps relative to the
+    first call; with loop=True the script repeats. `clock` defaults to
+    time.monotonic but can be any callable, e.g. a simulated clock.
+    """
+
+    polls = True
+
+    def __init__(self, script: Sequence[Tuple[float, Optional[str]]], loop: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        if not script:
+            raise ValueError("script must contain at least one step")
+        self.script = sorted(script, key=lambda step: step[0])
+        self.loop = loop
+        self.clock = clock
+        self._start: Optional[float] = None
+        # One step past the last offset so the final title holds for a while
+        self._period = self.script[-1][0] + (self.script[1][0] - self.script[0][0] if len(self.script) > 1 else 1)
+
+    @classmethod
+    def cycling(cls, titles: Sequence[str], dwell_sec: float, **kwargs) -> "FakeWindowSource":
+        """Visit each title for dwell_sec seconds in turn."""
+        return cls([(i * dwell_sec, t) for i, t in enumerate(titles)], **kwargs)
+
+    def current(self) -> Optional[str]:
+        now = self.clock()
+        if self._start is None:
+            self._start = now
+        elapsed = now - self._start
+        if self.loop:
+            elapsed %= self._period
+        title = self.script[0][1]
+        for offset, step_title in self.script:
+            if offset > elapsed:
+                break
+            title = step_title
+        self._set(title)
+        return self._title
+
+
+def default_source() -> WindowSource:
+    """Pick the best available source for this platform (see WINDOW_SOURCE)."""
+    if WINDOW_SOURCE in ("auto", "xlib") and platform.system() == "Linux" and os.environ.get("DISPLAY"):
+        try:
+            return XlibWindowSource()
+        except Exception as e:
+            if WINDOW_SOURCE == "xlib":
+                print(f"⚠️ Xlib window source unavailable ({e}) — falling back to polling")
+    return PollingWindowSource()
@@ -1,7 +1,11 @@
 import { useState, useEffect, useCallback } from "react";
-import { fetchEmployeeLive, type LiveMetrics } from "@/lib/api";
+import { fetchEmployeeLive, liveMetricsStreamUrl, type LiveMetrics } from "@/lib/api";
 
-const POLL_INTERVAL = 1000; // 1 second for real-time updates
+const POLL_INTERVAL = 1000; // 1 second polling fallback when streaming is unavailable
+const STREAM_RETRY_BASE = 1000; // first stream reconnect delay, doubled after each failure
+const STREAM_FAILURES_BEFORE_POLLING = 3; // consecutive stream failures before falling back to polling
+const STREAM_RETRY_WHILE_POLLING = 30000; // how often to try streaming again while polling
+const CLOCK_INTERVAL = 1000; // local re-render so running durations keep ticking between pushes
 
 // Default initial state - shows 0 values immediately on page load
 const DEFAULT_METRICS: LiveMetrics = {
@@ -18,26 +22,102 @@ const DEFAULT_METRICS: LiveMetrics = {
 };
 
 export function useLiveMetrics(employeeId: string = "EMP001") {
-  const [metrics, setMetrics] = useState<LiveMetrics>(DEFAULT_METRICS);
+  const [serverMetrics, setServerMetrics] = useState<{ data: LiveMetrics; receivedAt: number }>({
+    data: DEFAULT_METRICS,
+    receivedAt: Date.now(),
+  });
+  const [now, setNow] = useState(Date.now());
   const [backendConnected, setBackendConnected] = useState(false);
 
+  const setMetrics = useCallback((update: (prev: LiveMetrics) => LiveMetrics) => {
+    setServerMetrics((prev) => ({ data: update(prev.data), receivedAt: Date.now() }));
+  }, []);
+
   const poll = useCallback(async () => {
     const data = await fetchEmployeeLive(employeeId);
     if (data) {
-      setMetrics(data);
+      setMetrics(() => data);
       setBackendConnected(true);
     } else {
       setBackendConnected(false);
     }
-  }, [employeeId]);
+  }, [employeeId, setMetrics]);
+
+  useEffect(() => {
+    const clock = setInterval(() => setNow(Date.now()), CLOCK_INTERVAL);
+    return () => clearInterval(clock);
+  }, []);
 
   useEffect(() => {
-    // Poll immediately on mount
-    poll();
-    // Then poll every 1 second for real-time updates
-    const interval = setInterval(poll, POLL_INTERVAL);
-    return () => clearInterval(interval);
-  }, [poll]);
+    let interval: ReturnType<typeof setInterval> | undefined;
+    const startPolling = () => {
+      if (interval) return;
+      poll();
+      interval = setInterval(poll, POLL_INTERVAL);
+    };
+    const stopPolling = () => {
+      clearInterval(interval);
+      interval = undefined;
+    };
+
+    if (typeof EventSource === "undefined") {
+      startPolling();
+      return stopPolling;
+    }
+
+    let source: EventSource | undefined;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let failures = 0;
+
+    const connect = () => {
+      retry = undefined;
+      // Server pushes a full snapshot, then only the fields that changed
+      const stream = new EventSource(liveMetricsStreamUrl(employeeId));
+      source = stream;
+      stream.addEventListener("snapshot", (e) => {
+        const snapshot = JSON.parse((e as MessageEvent).data) as LiveMetrics;
+        setMetrics(() => snapshot);
+        setBackendConnected(true);
+        // Streaming works (again): no more polling, and a later drop starts the backoff over
+        failures = 0;
+        stopPolling();
+      });
+      stream.addEventListener("delta", (e) => {
+        const delta = JSON.parse((e as MessageEvent).data) as Partial<LiveMetrics>;
+        setMetrics((prev) => ({ ...prev, ...delta }));
+        setBackendConnected(true);
+      });
+      stream.onerror = () => {
+        // Reopen ourselves so the delay backs off (EventSource gives up for good on HTTP errors)
+        stream.close();
+        source = undefined;
+        failures += 1;
+        if (failures >= STREAM_FAILURES_BEFORE_POLLING) {
+          // Backend down or streaming unsupported: poll, and try the stream again now and then
+          startPolling();
+          retry = setTimeout(connect, STREAM_RETRY_WHILE_POLLING);
+        } else {
+          setBackendConnected(false);
+          retry = setTimeout(connect, STREAM_RETRY_BASE * 2 ** (failures - 1));
+        }
+      };
+    };
+    connect();
+
+    return () => {
+      source?.close();
+      clearTimeout(retry);
+      stopPolling();
+    };
+  }, [employeeId, poll, setMetrics]);
+
+  // Pushes only arrive on state changes, so advance the open session locally
+  const elapsed = serverMetrics.data.sessionStartTime ? Math.max(0, now - serverMetrics.receivedAt) : 0;
+  const metrics: LiveMetrics = {
+    ...serverMetrics.data,
+    currentSessionDuration: serverMetrics.data.currentSessionDuration + elapsed,
+    activeTimeToday: serverMetrics.data.activeTimeToday + elapsed,
+  };
 
   return { metrics, backendConnected };
 }
@@ -39,6 +39,18 @@ export interface MLDataPoint {
   timestamp: number;
 }
 
+export interface RollupRow {
+  periodStart: string;
+  hours: number;
+  activeSeconds: number;
+  idleSeconds: number;
+  windowSwitchCount: number;
+  longestContinuousActiveSeconds: number;
+  meanFocusScore: number;
+  meanFragmentationScore: number;
+  taskCompletedHours: number;
+}
+
 export interface TeamStats {
   totalEmployees: number;
   avgFocusScore: number;
@@ -63,12 +75,27 @@ export async function fetchEmployeeLive(employeeId: string): Promise<LiveMetrics
   return apiFetch<LiveMetrics>(`/employee/${employeeId}/live`);
 }
 
+/** Server-Sent Events stream: a `snapshot` event, then `delta` events with changed fields only. */
+export function liveMetricsStreamUrl(employeeId: string): string {
+  return `${API_BASE}/employee/${employeeId}/live/stream`;
+}
+
 export async function fetchEmployeeMLData(employeeId: string, limit: number = 168) {
   return apiFetch<{ employeeId: string; dataPoints: MLDataPoint[] }>(
     `/employee/${employeeId}/ml-data?limit=${limit}`
   );
 }
 
+/** Pre-aggregated daily or weekly rows — use for long ranges instead of hourly ml-data. */
+export async function fetchEmployeeRollups(employeeId: string, period: "day" | "week" = "day", from?: string, to?: string) {
+  const params = new URLSearchParams({ period });
+  if (from) params.set("from", from);
+  if (to) params.set("to", to);
+  return apiFetch<{ employeeId: string; period: string; rows: RollupRow[] }>(
+    `/employee/${employeeId}/rollups?${params}`
+  );
+}
+
 export async function setEmployeeRole(employeeId: string, role: string) {
   return apiFetch<{ status: string; employeeId: string; role: string }>(
     `/employee/${employeeId}/set-role?role=${role}`